@@ -18,24 +18,43 @@
 from collections import OrderedDict
 import functools
 import re
-from typing import Dict, Sequence, Tuple, Type, Union
+from typing import (
+    AsyncIterator,
+    Dict,
+    Iterable,
+    List,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
 import pkg_resources
 
+import grpc  # type: ignore
+
 import google.api_core.client_options as ClientOptions  # type: ignore
 from google.api_core import exceptions  # type: ignore
 from google.api_core import gapic_v1  # type: ignore
 from google.api_core import retry as retries  # type: ignore
+from google.api_core import retry_async  # type: ignore
 from google.auth import credentials  # type: ignore
 from google.oauth2 import service_account  # type: ignore
 
+from google.cloud.bigquery_reservation_v1.services.reservation_service import bulk
+from google.cloud.bigquery_reservation_v1.services.reservation_service import fanout
+from google.cloud.bigquery_reservation_v1.services.reservation_service import masks
 from google.cloud.bigquery_reservation_v1.services.reservation_service import pagers
+from google.cloud.bigquery_reservation_v1.services.reservation_service import polling
 from google.cloud.bigquery_reservation_v1.types import reservation
 from google.cloud.bigquery_reservation_v1.types import reservation as gcbr_reservation
 from google.protobuf import field_mask_pb2 as field_mask  # type: ignore
 from google.protobuf import timestamp_pb2 as timestamp  # type: ignore
 from google.rpc import status_pb2 as status  # type: ignore
 
+from .cache import ResourceCache
+from .coalescing import AsyncSingleFlight
 from .transports.base import ReservationServiceTransport, DEFAULT_CLIENT_INFO
+from .transports.channel_options import ChannelOptions
 from .transports.grpc_asyncio import ReservationServiceGrpcAsyncIOTransport
 from .client import ReservationServiceClient
 
@@ -135,6 +154,10 @@ class ReservationServiceAsyncClient:
         transport: Union[str, ReservationServiceTransport] = "grpc_asyncio",
         client_options: ClientOptions = None,
         client_info: gapic_v1.client_info.ClientInfo = DEFAULT_CLIENT_INFO,
+        cache: ResourceCache = None,
+        coalesce_reads: bool = False,
+        lazy: bool = False,
+        channel_options: ChannelOptions = None,
     ) -> None:
         """Instantiate the reservation service client.
 
@@ -163,6 +186,22 @@ class ReservationServiceAsyncClient:
                 not provided, the default SSL client certificate will be used if
                 present. If GOOGLE_API_USE_CLIENT_CERTIFICATE is "false" or not
                 set, no client certificate will be used.
+            cache (Optional[~.ResourceCache]): A cache to serve
+                ``get_reservation``, ``get_capacity_commitment`` and
+                ``get_bi_reservation`` from. It is populated by those methods
+                and the reservation and capacity commitment listings, and the
+                entries touched by writes issued through this client are
+                invalidated. If ``None``, every read is sent to the service.
+            coalesce_reads (bool): Whether concurrent identical read calls
+                share the response of a single RPC rather than each sending
+                their own. Callers then receive the same response object,
+                and each waits no longer than its own timeout.
+            lazy (bool): Whether to defer creating the transport until the
+                first call or the first access to :attr:`transport`.
+            channel_options (Optional[~.ChannelOptions]): Keepalive,
+                message size and compression settings of the channel the
+                transport opens. They cannot be given along with a
+                ``transport`` instance.
 
         Raises:
             google.auth.exceptions.MutualTlsChannelError: If mutual TLS transport
@@ -174,8 +213,23 @@ class ReservationServiceAsyncClient:
             transport=transport,
             client_options=client_options,
             client_info=client_info,
+            cache=cache,
+            lazy=lazy,
+            channel_options=channel_options,
+        )
+        self._single_flight = AsyncSingleFlight() if coalesce_reads else None
+
+    def _transport_method(self, name: str):
+        """Return the transport's stub for ``name``, hedged and rate limited."""
+        transport = self._client._transport
+        return transport._rate_limited(
+            name, transport._hedged(name, getattr(transport, name))
         )
 
+    def _budgeted_retry(self, retry: retries.Retry) -> retries.Retry:
+        """Return ``retry``, drawing from the transport's retry budget."""
+        return self._client._transport._budgeted_retry(retry)
+
     async def create_reservation(
         self,
         request: gcbr_reservation.CreateReservationRequest = None,
@@ -251,7 +305,7 @@ class ReservationServiceAsyncClient:
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
         rpc = gapic_v1.method_async.wrap_method(
-            self._client._transport.create_reservation,
+            self._transport_method("create_reservation"),
             default_timeout=60.0,
             client_info=DEFAULT_CLIENT_INFO,
         )
@@ -276,6 +330,9 @@ class ReservationServiceAsyncClient:
         retry: retries.Retry = gapic_v1.method.DEFAULT,
         timeout: float = None,
         metadata: Sequence[Tuple[str, str]] = (),
+        prefetch: int = 0,
+        checkpoint: pagers.PagerCheckpoint = None,
+        page_retry: retry_async.AsyncRetry = None,
     ) -> pagers.ListReservationsAsyncPager:
         r"""Lists all the reservations for the project in the
         specified location.
@@ -296,6 +353,17 @@ class ReservationServiceAsyncClient:
             timeout (float): The timeout for this request.
             metadata (Sequence[Tuple[str, str]]): Strings which should be
                 sent along with the request as metadata.
+            prefetch (int): The number of result pages to fetch ahead
+                of iteration in a separate task. Defaults to ``0``,
+                which fetches pages on demand.
+            checkpoint (:class:`~.pagers.PagerCheckpoint`): A checkpoint
+                taken from an earlier pager over the same request. The
+                listing resumes from the item after the last one that
+                pager consumed.
+            page_retry (google.api_core.retry_async.AsyncRetry): Designation of how
+                the fetch of a subsequent page should be retried once
+                ``retry`` has been exhausted. Only the failed page is
+                fetched again.
 
         Returns:
             ~.pagers.ListReservationsAsyncPager:
@@ -324,22 +392,36 @@ class ReservationServiceAsyncClient:
         if parent is not None:
             request.parent = parent
 
+        # Resume from the position recorded by an earlier pager, if any.
+        if checkpoint is not None:
+            request.page_token = checkpoint.page_token
+
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
         rpc = gapic_v1.method_async.wrap_method(
-            self._client._transport.list_reservations,
-            default_retry=retries.Retry(
-                initial=0.1,
-                maximum=60.0,
-                multiplier=1.3,
-                predicate=retries.if_exception_type(
-                    exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
-                ),
+            self._transport_method("list_reservations"),
+            default_retry=self._budgeted_retry(
+                retries.Retry(
+                    initial=0.1,
+                    maximum=60.0,
+                    multiplier=1.3,
+                    predicate=retries.if_exception_type(
+                        exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
+                    ),
+                )
             ),
             default_timeout=60.0,
             client_info=DEFAULT_CLIENT_INFO,
         )
 
+        # Populate the resource cache from every page of the listing.
+        if self._client._cache is not None:
+            rpc = self._client._cache.wrap_list_async(rpc, "reservations")
+
+        # Share one RPC among concurrent identical reads.
+        if self._single_flight is not None:
+            rpc = self._single_flight.wrap("list_reservations", rpc)
+
         # Certain fields should be provided within the metadata header;
         # add these here.
         metadata = tuple(metadata) + (
@@ -352,7 +434,13 @@ class ReservationServiceAsyncClient:
         # This method is paged; wrap the response in a pager, which provides
         # an `__aiter__` convenience method.
         response = pagers.ListReservationsAsyncPager(
-            method=rpc, request=request, response=response, metadata=metadata,
+            method=rpc,
+            request=request,
+            response=response,
+            metadata=metadata,
+            prefetch=prefetch,
+            checkpoint=checkpoint,
+            page_retry=page_retry,
         )
 
         # Done; return the response.
@@ -411,22 +499,35 @@ class ReservationServiceAsyncClient:
         if name is not None:
             request.name = name
 
+        # Serve the resource from the cache while it is fresh.
+        if self._client._cache is not None:
+            generation = self._client._cache.generation()
+            cached = self._client._cache.get(request.name)
+            if cached is not None:
+                return cached
+
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
         rpc = gapic_v1.method_async.wrap_method(
-            self._client._transport.get_reservation,
-            default_retry=retries.Retry(
-                initial=0.1,
-                maximum=60.0,
-                multiplier=1.3,
-                predicate=retries.if_exception_type(
-                    exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
-                ),
+            self._transport_method("get_reservation"),
+            default_retry=self._budgeted_retry(
+                retries.Retry(
+                    initial=0.1,
+                    maximum=60.0,
+                    multiplier=1.3,
+                    predicate=retries.if_exception_type(
+                        exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
+                    ),
+                )
             ),
             default_timeout=60.0,
             client_info=DEFAULT_CLIENT_INFO,
         )
 
+        # Share one RPC among concurrent identical reads.
+        if self._single_flight is not None:
+            rpc = self._single_flight.wrap("get_reservation", rpc)
+
         # Certain fields should be provided within the metadata header;
         # add these here.
         metadata = tuple(metadata) + (
@@ -435,6 +536,8 @@ class ReservationServiceAsyncClient:
 
         # Send the request.
         response = await rpc(request, retry=retry, timeout=timeout, metadata=metadata,)
+        if self._client._cache is not None:
+            self._client._cache.put(response, generation)
 
         # Done; return the response.
         return response
@@ -491,14 +594,16 @@ class ReservationServiceAsyncClient:
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
         rpc = gapic_v1.method_async.wrap_method(
-            self._client._transport.delete_reservation,
-            default_retry=retries.Retry(
-                initial=0.1,
-                maximum=60.0,
-                multiplier=1.3,
-                predicate=retries.if_exception_type(
-                    exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
-                ),
+            self._transport_method("delete_reservation"),
+            default_retry=self._budgeted_retry(
+                retries.Retry(
+                    initial=0.1,
+                    maximum=60.0,
+                    multiplier=1.3,
+                    predicate=retries.if_exception_type(
+                        exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
+                    ),
+                )
             ),
             default_timeout=60.0,
             client_info=DEFAULT_CLIENT_INFO,
@@ -511,9 +616,13 @@ class ReservationServiceAsyncClient:
         )
 
         # Send the request.
-        await rpc(
-            request, retry=retry, timeout=timeout, metadata=metadata,
-        )
+        try:
+            await rpc(
+                request, retry=retry, timeout=timeout, metadata=metadata,
+            )
+        finally:
+            # Drop any cached copy; the write may have changed it.
+            self._client._invalidate_cached(request.name)
 
     async def update_reservation(
         self,
@@ -578,7 +687,7 @@ class ReservationServiceAsyncClient:
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
         rpc = gapic_v1.method_async.wrap_method(
-            self._client._transport.update_reservation,
+            self._transport_method("update_reservation"),
             default_timeout=60.0,
             client_info=DEFAULT_CLIENT_INFO,
         )
@@ -592,7 +701,13 @@ class ReservationServiceAsyncClient:
         )
 
         # Send the request.
-        response = await rpc(request, retry=retry, timeout=timeout, metadata=metadata,)
+        try:
+            response = await rpc(
+                request, retry=retry, timeout=timeout, metadata=metadata,
+            )
+        finally:
+            # Drop any cached copy; the write may have changed it.
+            self._client._invalidate_cached(request.reservation.name)
 
         # Done; return the response.
         return response
@@ -673,7 +788,7 @@ class ReservationServiceAsyncClient:
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
         rpc = gapic_v1.method_async.wrap_method(
-            self._client._transport.create_capacity_commitment,
+            self._transport_method("create_capacity_commitment"),
             default_timeout=60.0,
             client_info=DEFAULT_CLIENT_INFO,
         )
@@ -698,6 +813,9 @@ class ReservationServiceAsyncClient:
         retry: retries.Retry = gapic_v1.method.DEFAULT,
         timeout: float = None,
         metadata: Sequence[Tuple[str, str]] = (),
+        prefetch: int = 0,
+        checkpoint: pagers.PagerCheckpoint = None,
+        page_retry: retry_async.AsyncRetry = None,
     ) -> pagers.ListCapacityCommitmentsAsyncPager:
         r"""Lists all the capacity commitments for the admin
         project.
@@ -718,6 +836,17 @@ class ReservationServiceAsyncClient:
             timeout (float): The timeout for this request.
             metadata (Sequence[Tuple[str, str]]): Strings which should be
                 sent along with the request as metadata.
+            prefetch (int): The number of result pages to fetch ahead
+                of iteration in a separate task. Defaults to ``0``,
+                which fetches pages on demand.
+            checkpoint (:class:`~.pagers.PagerCheckpoint`): A checkpoint
+                taken from an earlier pager over the same request. The
+                listing resumes from the item after the last one that
+                pager consumed.
+            page_retry (google.api_core.retry_async.AsyncRetry): Designation of how
+                the fetch of a subsequent page should be retried once
+                ``retry`` has been exhausted. Only the failed page is
+                fetched again.
 
         Returns:
             ~.pagers.ListCapacityCommitmentsAsyncPager:
@@ -746,22 +875,36 @@ class ReservationServiceAsyncClient:
         if parent is not None:
             request.parent = parent
 
+        # Resume from the position recorded by an earlier pager, if any.
+        if checkpoint is not None:
+            request.page_token = checkpoint.page_token
+
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
         rpc = gapic_v1.method_async.wrap_method(
-            self._client._transport.list_capacity_commitments,
-            default_retry=retries.Retry(
-                initial=0.1,
-                maximum=60.0,
-                multiplier=1.3,
-                predicate=retries.if_exception_type(
-                    exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
-                ),
+            self._transport_method("list_capacity_commitments"),
+            default_retry=self._budgeted_retry(
+                retries.Retry(
+                    initial=0.1,
+                    maximum=60.0,
+                    multiplier=1.3,
+                    predicate=retries.if_exception_type(
+                        exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
+                    ),
+                )
             ),
             default_timeout=60.0,
             client_info=DEFAULT_CLIENT_INFO,
         )
 
+        # Populate the resource cache from every page of the listing.
+        if self._client._cache is not None:
+            rpc = self._client._cache.wrap_list_async(rpc, "capacity_commitments")
+
+        # Share one RPC among concurrent identical reads.
+        if self._single_flight is not None:
+            rpc = self._single_flight.wrap("list_capacity_commitments", rpc)
+
         # Certain fields should be provided within the metadata header;
         # add these here.
         metadata = tuple(metadata) + (
@@ -774,7 +917,13 @@ class ReservationServiceAsyncClient:
         # This method is paged; wrap the response in a pager, which provides
         # an `__aiter__` convenience method.
         response = pagers.ListCapacityCommitmentsAsyncPager(
-            method=rpc, request=request, response=response, metadata=metadata,
+            method=rpc,
+            request=request,
+            response=response,
+            metadata=metadata,
+            prefetch=prefetch,
+            checkpoint=checkpoint,
+            page_retry=page_retry,
         )
 
         # Done; return the response.
@@ -845,22 +994,35 @@ class ReservationServiceAsyncClient:
         if name is not None:
             request.name = name
 
+        # Serve the resource from the cache while it is fresh.
+        if self._client._cache is not None:
+            generation = self._client._cache.generation()
+            cached = self._client._cache.get(request.name)
+            if cached is not None:
+                return cached
+
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
         rpc = gapic_v1.method_async.wrap_method(
-            self._client._transport.get_capacity_commitment,
-            default_retry=retries.Retry(
-                initial=0.1,
-                maximum=60.0,
-                multiplier=1.3,
-                predicate=retries.if_exception_type(
-                    exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
-                ),
+            self._transport_method("get_capacity_commitment"),
+            default_retry=self._budgeted_retry(
+                retries.Retry(
+                    initial=0.1,
+                    maximum=60.0,
+                    multiplier=1.3,
+                    predicate=retries.if_exception_type(
+                        exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
+                    ),
+                )
             ),
             default_timeout=60.0,
             client_info=DEFAULT_CLIENT_INFO,
         )
 
+        # Share one RPC among concurrent identical reads.
+        if self._single_flight is not None:
+            rpc = self._single_flight.wrap("get_capacity_commitment", rpc)
+
         # Certain fields should be provided within the metadata header;
         # add these here.
         metadata = tuple(metadata) + (
@@ -869,6 +1031,8 @@ class ReservationServiceAsyncClient:
 
         # Send the request.
         response = await rpc(request, retry=retry, timeout=timeout, metadata=metadata,)
+        if self._client._cache is not None:
+            self._client._cache.put(response, generation)
 
         # Done; return the response.
         return response
@@ -925,14 +1089,16 @@ class ReservationServiceAsyncClient:
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
         rpc = gapic_v1.method_async.wrap_method(
-            self._client._transport.delete_capacity_commitment,
-            default_retry=retries.Retry(
-                initial=0.1,
-                maximum=60.0,
-                multiplier=1.3,
-                predicate=retries.if_exception_type(
-                    exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
-                ),
+            self._transport_method("delete_capacity_commitment"),
+            default_retry=self._budgeted_retry(
+                retries.Retry(
+                    initial=0.1,
+                    maximum=60.0,
+                    multiplier=1.3,
+                    predicate=retries.if_exception_type(
+                        exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
+                    ),
+                )
             ),
             default_timeout=60.0,
             client_info=DEFAULT_CLIENT_INFO,
@@ -945,9 +1111,13 @@ class ReservationServiceAsyncClient:
         )
 
         # Send the request.
-        await rpc(
-            request, retry=retry, timeout=timeout, metadata=metadata,
-        )
+        try:
+            await rpc(
+                request, retry=retry, timeout=timeout, metadata=metadata,
+            )
+        finally:
+            # Drop any cached copy; the write may have changed it.
+            self._client._invalidate_cached(request.name)
 
     async def update_capacity_commitment(
         self,
@@ -1032,7 +1202,7 @@ class ReservationServiceAsyncClient:
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
         rpc = gapic_v1.method_async.wrap_method(
-            self._client._transport.update_capacity_commitment,
+            self._transport_method("update_capacity_commitment"),
             default_timeout=60.0,
             client_info=DEFAULT_CLIENT_INFO,
         )
@@ -1046,7 +1216,13 @@ class ReservationServiceAsyncClient:
         )
 
         # Send the request.
-        response = await rpc(request, retry=retry, timeout=timeout, metadata=metadata,)
+        try:
+            response = await rpc(
+                request, retry=retry, timeout=timeout, metadata=metadata,
+            )
+        finally:
+            # Drop any cached copy; the write may have changed it.
+            self._client._invalidate_cached(request.capacity_commitment.name)
 
         # Done; return the response.
         return response
@@ -1123,7 +1299,7 @@ class ReservationServiceAsyncClient:
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
         rpc = gapic_v1.method_async.wrap_method(
-            self._client._transport.split_capacity_commitment,
+            self._transport_method("split_capacity_commitment"),
             default_timeout=60.0,
             client_info=DEFAULT_CLIENT_INFO,
         )
@@ -1135,7 +1311,13 @@ class ReservationServiceAsyncClient:
         )
 
         # Send the request.
-        response = await rpc(request, retry=retry, timeout=timeout, metadata=metadata,)
+        try:
+            response = await rpc(
+                request, retry=retry, timeout=timeout, metadata=metadata,
+            )
+        finally:
+            # Drop any cached copy; the write may have changed it.
+            self._client._invalidate_cached(request.name)
 
         # Done; return the response.
         return response
@@ -1231,7 +1413,7 @@ class ReservationServiceAsyncClient:
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
         rpc = gapic_v1.method_async.wrap_method(
-            self._client._transport.merge_capacity_commitments,
+            self._transport_method("merge_capacity_commitments"),
             default_timeout=60.0,
             client_info=DEFAULT_CLIENT_INFO,
         )
@@ -1243,7 +1425,18 @@ class ReservationServiceAsyncClient:
         )
 
         # Send the request.
-        response = await rpc(request, retry=retry, timeout=timeout, metadata=metadata,)
+        try:
+            response = await rpc(
+                request, retry=retry, timeout=timeout, metadata=metadata,
+            )
+        finally:
+            # Drop any cached copies of the merged commitments.
+            self._client._invalidate_cached(
+                *(
+                    "{}/capacityCommitments/{}".format(request.parent, commitment_id)
+                    for commitment_id in request.capacity_commitment_ids
+                )
+            )
 
         # Done; return the response.
         return response
@@ -1346,7 +1539,7 @@ class ReservationServiceAsyncClient:
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
         rpc = gapic_v1.method_async.wrap_method(
-            self._client._transport.create_assignment,
+            self._transport_method("create_assignment"),
             default_timeout=60.0,
             client_info=DEFAULT_CLIENT_INFO,
         )
@@ -1371,6 +1564,10 @@ class ReservationServiceAsyncClient:
         retry: retries.Retry = gapic_v1.method.DEFAULT,
         timeout: float = None,
         metadata: Sequence[Tuple[str, str]] = (),
+        prefetch: int = 0,
+        checkpoint: pagers.PagerCheckpoint = None,
+        page_retry: retry_async.AsyncRetry = None,
+        compression: grpc.Compression = None,
     ) -> pagers.ListAssignmentsAsyncPager:
         r"""Lists assignments.
 
@@ -1416,6 +1613,20 @@ class ReservationServiceAsyncClient:
             timeout (float): The timeout for this request.
             metadata (Sequence[Tuple[str, str]]): Strings which should be
                 sent along with the request as metadata.
+            prefetch (int): The number of result pages to fetch ahead
+                of iteration in a separate task. Defaults to ``0``,
+                which fetches pages on demand.
+            checkpoint (:class:`~.pagers.PagerCheckpoint`): A checkpoint
+                taken from an earlier pager over the same request. The
+                listing resumes from the item after the last one that
+                pager consumed.
+            page_retry (google.api_core.retry_async.AsyncRetry): Designation of how
+                the fetch of a subsequent page should be retried once
+                ``retry`` has been exhausted. Only the failed page is
+                fetched again.
+            compression (grpc.Compression): The compression of the
+                requests of this call and of the later pages. If ``None``,
+                the compression of the channel is used.
 
         Returns:
             ~.pagers.ListAssignmentsAsyncPager:
@@ -1444,22 +1655,36 @@ class ReservationServiceAsyncClient:
         if parent is not None:
             request.parent = parent
 
+        # Resume from the position recorded by an earlier pager, if any.
+        if checkpoint is not None:
+            request.page_token = checkpoint.page_token
+
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
         rpc = gapic_v1.method_async.wrap_method(
-            self._client._transport.list_assignments,
-            default_retry=retries.Retry(
-                initial=0.1,
-                maximum=60.0,
-                multiplier=1.3,
-                predicate=retries.if_exception_type(
-                    exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
-                ),
+            self._transport_method("list_assignments"),
+            default_retry=self._budgeted_retry(
+                retries.Retry(
+                    initial=0.1,
+                    maximum=60.0,
+                    multiplier=1.3,
+                    predicate=retries.if_exception_type(
+                        exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
+                    ),
+                )
             ),
             default_timeout=60.0,
             client_info=DEFAULT_CLIENT_INFO,
         )
 
+        # Share one RPC among concurrent identical reads.
+        if self._single_flight is not None:
+            rpc = self._single_flight.wrap("list_assignments", rpc)
+
+        # Send this request and those of the later pages compressed.
+        if compression is not None:
+            rpc = functools.partial(rpc, compression=compression)
+
         # Certain fields should be provided within the metadata header;
         # add these here.
         metadata = tuple(metadata) + (
@@ -1472,7 +1697,13 @@ class ReservationServiceAsyncClient:
         # This method is paged; wrap the response in a pager, which provides
         # an `__aiter__` convenience method.
         response = pagers.ListAssignmentsAsyncPager(
-            method=rpc, request=request, response=response, metadata=metadata,
+            method=rpc,
+            request=request,
+            response=response,
+            metadata=metadata,
+            prefetch=prefetch,
+            checkpoint=checkpoint,
+            page_retry=page_retry,
         )
 
         # Done; return the response.
@@ -1544,14 +1775,16 @@ class ReservationServiceAsyncClient:
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
         rpc = gapic_v1.method_async.wrap_method(
-            self._client._transport.delete_assignment,
-            default_retry=retries.Retry(
-                initial=0.1,
-                maximum=60.0,
-                multiplier=1.3,
-                predicate=retries.if_exception_type(
-                    exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
-                ),
+            self._transport_method("delete_assignment"),
+            default_retry=self._budgeted_retry(
+                retries.Retry(
+                    initial=0.1,
+                    maximum=60.0,
+                    multiplier=1.3,
+                    predicate=retries.if_exception_type(
+                        exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
+                    ),
+                )
             ),
             default_timeout=60.0,
             client_info=DEFAULT_CLIENT_INFO,
@@ -1577,6 +1810,10 @@ class ReservationServiceAsyncClient:
         retry: retries.Retry = gapic_v1.method.DEFAULT,
         timeout: float = None,
         metadata: Sequence[Tuple[str, str]] = (),
+        prefetch: int = 0,
+        checkpoint: pagers.PagerCheckpoint = None,
+        page_retry: retry_async.AsyncRetry = None,
+        compression: grpc.Compression = None,
     ) -> pagers.SearchAssignmentsAsyncPager:
         r"""Looks up assignments for a specified resource for a particular
         region. If the request is about a project:
@@ -1635,6 +1872,20 @@ class ReservationServiceAsyncClient:
             timeout (float): The timeout for this request.
             metadata (Sequence[Tuple[str, str]]): Strings which should be
                 sent along with the request as metadata.
+            prefetch (int): The number of result pages to fetch ahead
+                of iteration in a separate task. Defaults to ``0``,
+                which fetches pages on demand.
+            checkpoint (:class:`~.pagers.PagerCheckpoint`): A checkpoint
+                taken from an earlier pager over the same request. The
+                listing resumes from the item after the last one that
+                pager consumed.
+            page_retry (google.api_core.retry_async.AsyncRetry): Designation of how
+                the fetch of a subsequent page should be retried once
+                ``retry`` has been exhausted. Only the failed page is
+                fetched again.
+            compression (grpc.Compression): The compression of the
+                requests of this call and of the later pages. If ``None``,
+                the compression of the channel is used.
 
         Returns:
             ~.pagers.SearchAssignmentsAsyncPager:
@@ -1665,22 +1916,36 @@ class ReservationServiceAsyncClient:
         if query is not None:
             request.query = query
 
+        # Resume from the position recorded by an earlier pager, if any.
+        if checkpoint is not None:
+            request.page_token = checkpoint.page_token
+
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
         rpc = gapic_v1.method_async.wrap_method(
-            self._client._transport.search_assignments,
-            default_retry=retries.Retry(
-                initial=0.1,
-                maximum=60.0,
-                multiplier=1.3,
-                predicate=retries.if_exception_type(
-                    exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
-                ),
+            self._transport_method("search_assignments"),
+            default_retry=self._budgeted_retry(
+                retries.Retry(
+                    initial=0.1,
+                    maximum=60.0,
+                    multiplier=1.3,
+                    predicate=retries.if_exception_type(
+                        exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
+                    ),
+                )
             ),
             default_timeout=60.0,
             client_info=DEFAULT_CLIENT_INFO,
         )
 
+        # Share one RPC among concurrent identical reads.
+        if self._single_flight is not None:
+            rpc = self._single_flight.wrap("search_assignments", rpc)
+
+        # Send this request and those of the later pages compressed.
+        if compression is not None:
+            rpc = functools.partial(rpc, compression=compression)
+
         # Certain fields should be provided within the metadata header;
         # add these here.
         metadata = tuple(metadata) + (
@@ -1693,7 +1958,13 @@ class ReservationServiceAsyncClient:
         # This method is paged; wrap the response in a pager, which provides
         # an `__aiter__` convenience method.
         response = pagers.SearchAssignmentsAsyncPager(
-            method=rpc, request=request, response=response, metadata=metadata,
+            method=rpc,
+            request=request,
+            response=response,
+            metadata=metadata,
+            prefetch=prefetch,
+            checkpoint=checkpoint,
+            page_retry=page_retry,
         )
 
         # Done; return the response.
@@ -1774,7 +2045,7 @@ class ReservationServiceAsyncClient:
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
         rpc = gapic_v1.method_async.wrap_method(
-            self._client._transport.move_assignment,
+            self._transport_method("move_assignment"),
             default_timeout=60.0,
             client_info=DEFAULT_CLIENT_INFO,
         )
@@ -1842,22 +2113,35 @@ class ReservationServiceAsyncClient:
         if name is not None:
             request.name = name
 
+        # Serve the resource from the cache while it is fresh.
+        if self._client._cache is not None:
+            generation = self._client._cache.generation()
+            cached = self._client._cache.get(request.name)
+            if cached is not None:
+                return cached
+
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
         rpc = gapic_v1.method_async.wrap_method(
-            self._client._transport.get_bi_reservation,
-            default_retry=retries.Retry(
-                initial=0.1,
-                maximum=60.0,
-                multiplier=1.3,
-                predicate=retries.if_exception_type(
-                    exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
-                ),
+            self._transport_method("get_bi_reservation"),
+            default_retry=self._budgeted_retry(
+                retries.Retry(
+                    initial=0.1,
+                    maximum=60.0,
+                    multiplier=1.3,
+                    predicate=retries.if_exception_type(
+                        exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
+                    ),
+                )
             ),
             default_timeout=60.0,
             client_info=DEFAULT_CLIENT_INFO,
         )
 
+        # Share one RPC among concurrent identical reads.
+        if self._single_flight is not None:
+            rpc = self._single_flight.wrap("get_bi_reservation", rpc)
+
         # Certain fields should be provided within the metadata header;
         # add these here.
         metadata = tuple(metadata) + (
@@ -1866,6 +2150,8 @@ class ReservationServiceAsyncClient:
 
         # Send the request.
         response = await rpc(request, retry=retry, timeout=timeout, metadata=metadata,)
+        if self._client._cache is not None:
+            self._client._cache.put(response, generation)
 
         # Done; return the response.
         return response
@@ -1938,7 +2224,7 @@ class ReservationServiceAsyncClient:
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
         rpc = gapic_v1.method_async.wrap_method(
-            self._client._transport.update_bi_reservation,
+            self._transport_method("update_bi_reservation"),
             default_timeout=60.0,
             client_info=DEFAULT_CLIENT_INFO,
         )
@@ -1952,11 +2238,455 @@ class ReservationServiceAsyncClient:
         )
 
         # Send the request.
-        response = await rpc(request, retry=retry, timeout=timeout, metadata=metadata,)
+        try:
+            response = await rpc(
+                request, retry=retry, timeout=timeout, metadata=metadata,
+            )
+        finally:
+            # Drop any cached copy; the write may have changed it.
+            self._client._invalidate_cached(request.bi_reservation.name)
 
         # Done; return the response.
         return response
 
+    def fan_out_list(
+        self,
+        method: str,
+        *,
+        projects: Iterable[str],
+        locations: Iterable[str],
+        max_concurrency: int = 8,
+        retry: retries.Retry = gapic_v1.method.DEFAULT,
+        timeout: float = None,
+        metadata: Sequence[Tuple[str, str]] = (),
+    ) -> AsyncIterator[fanout.FanOutResult]:
+        r"""Lists resources across several projects and locations at once.
+
+        The listing under each project and location is walked in its own
+        task, with at most ``max_concurrency`` listings in flight, so an
+        inventory spanning many locations takes about as long as its
+        slowest location rather than the sum of all of them.
+
+        Args:
+            method (str): The paged method to fan out; one of
+                ``list_reservations``, ``list_capacity_commitments`` or
+                ``list_assignments``. Assignments are listed across all
+                reservations of each location.
+            projects (Iterable[str]): The admin projects to list.
+            locations (Iterable[str]): The locations to list in each
+                project, e.g. ``US`` or ``europe-west2``.
+            max_concurrency (int): The number of listings walked at once.
+
+            retry (google.api_core.retry.Retry): Designation of what errors, if any,
+                should be retried.
+            timeout (float): The timeout for each request.
+            metadata (Sequence[Tuple[str, str]]): Strings which should be
+                sent along with each request as metadata.
+
+        Returns:
+            AsyncIterator[~.fanout.FanOutResult]:
+                The listed resources, merged in the order they arrive
+                and tagged with the parent they were listed under.
+
+        Raises:
+            ValueError: If ``method`` is not one of the methods above.
+        """
+        parents = [
+            self._client._fan_out_parent(method, project, location)
+            for project in projects
+            for location in locations
+        ]
+        list_method = getattr(self, method)
+
+        def list_parent(parent):
+            return list_method(
+                parent=parent, retry=retry, timeout=timeout, metadata=metadata,
+            )
+
+        return fanout.fan_out_async(
+            list_parent, parents, max_concurrency=max_concurrency
+        )
+
+    def watch(
+        self,
+        method: str,
+        parent: str,
+        *,
+        interval: polling.AdaptiveInterval = None,
+        retry: retries.Retry = gapic_v1.method.DEFAULT,
+        timeout: float = None,
+        metadata: Sequence[Tuple[str, str]] = (),
+    ) -> AsyncIterator[polling.ResourceChanges]:
+        r"""Watches the resources under a parent for changes.
+
+        The listing is polled, and only the resources that were added,
+        removed or modified since the previous poll are reported. The
+        resources present at the first poll are reported as added. The
+        polling interval lengthens while nothing changes and drops back to
+        its minimum after a change, so quiet parents cost few requests.
+
+        Args:
+            method (str): The paged method to poll; one of
+                ``list_reservations``, ``list_capacity_commitments`` or
+                ``list_assignments``.
+            parent (str): The parent resource to list under.
+            interval (~.polling.AdaptiveInterval): Paces the polls.
+                Defaults to an interval between one second and one
+                minute.
+
+            retry (google.api_core.retry.Retry): Designation of what errors, if any,
+                should be retried.
+            timeout (float): The timeout for each request.
+            metadata (Sequence[Tuple[str, str]]): Strings which should be
+                sent along with each request as metadata.
+
+        Returns:
+            AsyncIterator[~.polling.ResourceChanges]:
+                The changes, one entry per poll that observed any. The
+                iterator does not end by itself; stop consuming it to stop
+                watching.
+
+        Raises:
+            ValueError: If ``method`` is not one of the methods above.
+        """
+        if method not in self._client._WATCHABLE_METHODS:
+            raise ValueError("Cannot watch {!r}.".format(method))
+        list_method = getattr(self, method)
+
+        async def poll():
+            pager = await list_method(
+                parent=parent, retry=retry, timeout=timeout, metadata=metadata,
+            )
+            return [item async for item in pager]
+
+        return polling.watch_async(poll, interval)
+
+    def bulk_create_assignments(
+        self,
+        assignments: Iterable[Tuple[str, reservation.Assignment]],
+        *,
+        max_concurrency: int = 8,
+        concurrency: bulk.AdaptiveConcurrency = None,
+        ordered: bool = True,
+        retry: retries.Retry = gapic_v1.method.DEFAULT,
+        timeout: float = None,
+        metadata: Sequence[Tuple[str, str]] = (),
+    ) -> AsyncIterator[bulk.BulkResult]:
+        r"""Creates many assignments concurrently.
+
+        One ``create_assignment`` call is made per pair, as concurrent tasks,
+        with at most ``max_concurrency`` calls in flight. Pairs are drawn from
+        ``assignments`` lazily. A failed call is reported in its result
+        and does not stop the others.
+
+        Args:
+            assignments (Iterable[Tuple[str, ~.reservation.Assignment]]):
+                The ``(parent, assignment)`` pairs to create, where
+                ``parent`` is the name of the reservation.
+            max_concurrency (int): The number of calls in flight at once.
+            concurrency (Optional[~.bulk.AdaptiveConcurrency]): If set,
+                its adaptive limit replaces ``max_concurrency``.
+            ordered (bool): If true, results are yielded in the order of
+                ``assignments``, each as soon as it and every earlier one
+                completed. Otherwise they are yielded as they complete.
+
+            retry (google.api_core.retry.Retry): Designation of what errors, if any,
+                should be retried.
+            timeout (float): The timeout for each request.
+            metadata (Sequence[Tuple[str, str]]): Strings which should be
+                sent along with each request as metadata.
+
+        Returns:
+            AsyncIterator[bulk.BulkResult]:
+                One result per pair, holding either the created
+                assignment or the error raised by its call.
+        """
+
+        def create(item):
+            parent, assignment = item
+            return self.create_assignment(
+                parent=parent,
+                assignment=assignment,
+                retry=retry,
+                timeout=timeout,
+                metadata=metadata,
+            )
+
+        return bulk.run_async(
+            create,
+            assignments,
+            max_concurrency=max_concurrency,
+            ordered=ordered,
+            concurrency=concurrency,
+        )
+
+    async def bulk_delete_assignments(
+        self,
+        names: Iterable[str],
+        *,
+        max_concurrency: int = 8,
+        concurrency: bulk.AdaptiveConcurrency = None,
+        retry: retries.Retry = gapic_v1.method.DEFAULT,
+        timeout: float = None,
+        metadata: Sequence[Tuple[str, str]] = (),
+    ) -> Dict[str, List[bulk.BulkResult]]:
+        r"""Deletes many assignments concurrently.
+
+        One ``delete_assignment`` call is made per name, with at most
+        ``max_concurrency`` calls in flight. A failed call is reported in its
+        result and does not stop the others.
+
+        Args:
+            names (Iterable[str]): The names of the assignments to delete.
+            max_concurrency (int): The number of calls in flight at once.
+            concurrency (Optional[~.bulk.AdaptiveConcurrency]): If set,
+                its adaptive limit replaces ``max_concurrency``.
+
+            retry (google.api_core.retry.Retry): Designation of what errors, if any,
+                should be retried.
+            timeout (float): The timeout for each request.
+            metadata (Sequence[Tuple[str, str]]): Strings which should be
+                sent along with each request as metadata.
+
+        Returns:
+            Dict[str, List[~.bulk.BulkResult]]:
+                The result of each call, grouped by the name of the
+                reservation the assignment belonged to.
+
+        Raises:
+            ValueError: If a name is not an assignment name; no call is
+                made in that case.
+        """
+        names = list(names)
+        reservations = [self._client._assignment_reservation(name) for name in names]
+
+        async def delete(name):
+            return await self.delete_assignment(
+                name=name, retry=retry, timeout=timeout, metadata=metadata,
+            )
+
+        results = [
+            result
+            async for result in bulk.run_async(
+                delete, names, max_concurrency=max_concurrency, concurrency=concurrency,
+            )
+        ]
+        return bulk.group(results, lambda result: reservations[result.index])
+
+    async def bulk_move_assignments(
+        self,
+        names: Iterable[str],
+        destination_id: str,
+        *,
+        max_concurrency: int = 8,
+        concurrency: bulk.AdaptiveConcurrency = None,
+        retry: retries.Retry = gapic_v1.method.DEFAULT,
+        timeout: float = None,
+        metadata: Sequence[Tuple[str, str]] = (),
+    ) -> Dict[str, List[bulk.BulkResult]]:
+        r"""Moves many assignments to another reservation concurrently.
+
+        One ``move_assignment`` call is made per name, with at most
+        ``max_concurrency`` calls in flight. A failed call is reported in its
+        result and does not stop the others.
+
+        Args:
+            names (Iterable[str]): The names of the assignments to move.
+            destination_id (str): The name of the reservation to move
+                them to.
+            max_concurrency (int): The number of calls in flight at once.
+            concurrency (Optional[~.bulk.AdaptiveConcurrency]): If set,
+                its adaptive limit replaces ``max_concurrency``.
+
+            retry (google.api_core.retry.Retry): Designation of what errors, if any,
+                should be retried.
+            timeout (float): The timeout for each request.
+            metadata (Sequence[Tuple[str, str]]): Strings which should be
+                sent along with each request as metadata.
+
+        Returns:
+            Dict[str, List[~.bulk.BulkResult]]:
+                The result of each call, holding the moved assignment or
+                the error raised, grouped by the name of the reservation
+                the assignment was moved from.
+
+        Raises:
+            ValueError: If a name is not an assignment name; no call is
+                made in that case.
+        """
+        names = list(names)
+        reservations = [self._client._assignment_reservation(name) for name in names]
+
+        async def move(name):
+            return await self.move_assignment(
+                name=name,
+                destination_id=destination_id,
+                retry=retry,
+                timeout=timeout,
+                metadata=metadata,
+            )
+
+        results = [
+            result
+            async for result in bulk.run_async(
+                move, names, max_concurrency=max_concurrency, concurrency=concurrency,
+            )
+        ]
+        return bulk.group(results, lambda result: reservations[result.index])
+
+    async def update_reservation_if_changed(
+        self,
+        current: gcbr_reservation.Reservation,
+        desired: gcbr_reservation.Reservation,
+        *,
+        retry: retries.Retry = gapic_v1.method.DEFAULT,
+        timeout: float = None,
+        metadata: Sequence[Tuple[str, str]] = (),
+    ) -> gcbr_reservation.Reservation:
+        r"""Updates a reservation only if it differs from its current state.
+
+        The update mask names only the updatable fields that differ
+        between ``current`` and ``desired``. When none differ, no call is
+        made and ``current`` is returned.
+
+        Args:
+            current (~.gcbr_reservation.Reservation):
+                The resource as it is, e.g. as returned by
+                ``get_reservation``.
+            desired (~.gcbr_reservation.Reservation):
+                The resource as it should be.
+
+            retry (google.api_core.retry.Retry): Designation of what errors, if any,
+                should be retried.
+            timeout (float): The timeout for this request.
+            metadata (Sequence[Tuple[str, str]]): Strings which should be
+                sent along with the request as metadata.
+
+        Returns:
+            ~.gcbr_reservation.Reservation:
+                The updated resource, or ``current`` if nothing needed
+                updating.
+        """
+        update_mask = masks.minimal_field_mask(current, desired)
+        if not update_mask.paths:
+            return current
+        return await self.update_reservation(
+            reservation=desired,
+            update_mask=update_mask,
+            retry=retry,
+            timeout=timeout,
+            metadata=metadata,
+        )
+
+    async def update_capacity_commitment_if_changed(
+        self,
+        current: reservation.CapacityCommitment,
+        desired: reservation.CapacityCommitment,
+        *,
+        retry: retries.Retry = gapic_v1.method.DEFAULT,
+        timeout: float = None,
+        metadata: Sequence[Tuple[str, str]] = (),
+    ) -> reservation.CapacityCommitment:
+        r"""Updates a capacity commitment only if it differs from its current state.
+
+        The update mask names only the updatable fields that differ
+        between ``current`` and ``desired``. When none differ, no call is
+        made and ``current`` is returned.
+
+        Args:
+            current (~.reservation.CapacityCommitment):
+                The resource as it is, e.g. as returned by
+                ``get_capacity_commitment``.
+            desired (~.reservation.CapacityCommitment):
+                The resource as it should be.
+
+            retry (google.api_core.retry.Retry): Designation of what errors, if any,
+                should be retried.
+            timeout (float): The timeout for this request.
+            metadata (Sequence[Tuple[str, str]]): Strings which should be
+                sent along with the request as metadata.
+
+        Returns:
+            ~.reservation.CapacityCommitment:
+                The updated resource, or ``current`` if nothing needed
+                updating.
+        """
+        update_mask = masks.minimal_field_mask(current, desired)
+        if not update_mask.paths:
+            return current
+        return await self.update_capacity_commitment(
+            capacity_commitment=desired,
+            update_mask=update_mask,
+            retry=retry,
+            timeout=timeout,
+            metadata=metadata,
+        )
+
+    async def update_bi_reservation_if_changed(
+        self,
+        current: reservation.BiReservation,
+        desired: reservation.BiReservation,
+        *,
+        retry: retries.Retry = gapic_v1.method.DEFAULT,
+        timeout: float = None,
+        metadata: Sequence[Tuple[str, str]] = (),
+    ) -> reservation.BiReservation:
+        r"""Updates a BI reservation only if it differs from its current state.
+
+        The update mask names only the updatable fields that differ
+        between ``current`` and ``desired``. When none differ, no call is
+        made and ``current`` is returned.
+
+        Args:
+            current (~.reservation.BiReservation):
+                The resource as it is, e.g. as returned by
+                ``get_bi_reservation``.
+            desired (~.reservation.BiReservation):
+                The resource as it should be.
+
+            retry (google.api_core.retry.Retry): Designation of what errors, if any,
+                should be retried.
+            timeout (float): The timeout for this request.
+            metadata (Sequence[Tuple[str, str]]): Strings which should be
+                sent along with the request as metadata.
+
+        Returns:
+            ~.reservation.BiReservation:
+                The updated resource, or ``current`` if nothing needed
+                updating.
+        """
+        update_mask = masks.minimal_field_mask(current, desired)
+        if not update_mask.paths:
+            return current
+        return await self.update_bi_reservation(
+            bi_reservation=desired,
+            update_mask=update_mask,
+            retry=retry,
+            timeout=timeout,
+            metadata=metadata,
+        )
+
+    async def warm_up(
+        self, timeout: float = None, *, fetch_token: bool = False
+    ) -> None:
+        r"""Prepares the client for its first call.
+
+        Builds the stub of every RPC method, waits for the transport's
+        channel to connect and, optionally, fetches an access token, so
+        that cold-start latency is paid here rather than by the first
+        call.
+
+        Args:
+            timeout (float): How long to wait for the channel to connect,
+                in seconds. If ``None``, wait indefinitely.
+            fetch_token (bool): Whether to also fetch an access token.
+
+        Raises:
+            google.api_core.exceptions.DeadlineExceeded: If the channel
+                did not connect within ``timeout``.
+        """
+        await self._client._transport.warm_up(timeout, fetch_token=fetch_token)
+
 
 try:
     DEFAULT_CLIENT_INFO = gapic_v1.client_info.ClientInfo(
@@ -0,0 +1,315 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+from collections import OrderedDict
+from concurrent import futures
+import itertools
+import threading
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Tuple,
+)
+
+from google.api_core import exceptions  # type: ignore
+
+
+class BulkResult(NamedTuple):
+    """The outcome of one call made by a bulk operation.
+
+    Attributes:
+        index (int): The position of the item among the items given to
+            the bulk operation.
+        item (Any): The item the call was made for.
+        result (Any): The response of the call, if it succeeded.
+        error (Exception): The error raised by the call, if it failed.
+    """
+
+    index: int
+    item: Any
+    result: Any = None
+    error: Exception = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the call succeeded."""
+        return self.error is None
+
+
+class _Reorder:
+    """Releases results in index order as the gaps before them fill."""
+
+    def __init__(self):
+        self._next_index = 0
+        self._held = {}  # type: Dict[int, BulkResult]
+
+    def push(self, result: BulkResult) -> Iterator[BulkResult]:
+        self._held[result.index] = result
+        while self._next_index in self._held:
+            yield self._held.pop(self._next_index)
+            self._next_index += 1
+
+
+class AdaptiveConcurrency:
+    """An additive-increase, multiplicative-decrease concurrency limit.
+
+    Each successful call raises the limit by ``increase`` divided by the
+    current limit, i.e. by about ``increase`` per limit-full of calls.
+    A call that fails with one of the ``throttled`` errors cuts the limit
+    by the factor ``decrease``. Only one cut is made per round of calls:
+    calls that were started before the last cut do not cut it again.
+
+    A controller may be shared by several bulk operations, which then
+    learn a common limit; each operation keeps at most that many of its
+    own calls in flight. Safe to share across threads.
+    """
+
+    def __init__(
+        self,
+        initial: float = 8,
+        *,
+        minimum: int = 1,
+        maximum: int = 64,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        throttled: Tuple[type, ...] = (
+            exceptions.ResourceExhausted,
+            exceptions.ServiceUnavailable,
+        )
+    ):
+        """Instantiate the controller.
+
+        Args:
+            initial (float): The starting limit.
+            minimum (int): The lowest the limit is cut to.
+            maximum (int): The highest the limit is raised to.
+            increase (float): How much the limit grows per limit-full of
+                successful calls.
+            decrease (float): The factor the limit is multiplied by when
+                a call is throttled.
+            throttled (Tuple[type, ...]): The errors that signal overload.
+        """
+        if not 1 <= minimum <= initial <= maximum:
+            raise ValueError("Expected 1 <= minimum <= initial <= maximum.")
+        if not 0 < decrease < 1:
+            raise ValueError("The decrease factor must be between 0 and 1.")
+        self._limit = float(initial)
+        self._minimum = minimum
+        self._maximum = maximum
+        self._increase = increase
+        self._decrease = decrease
+        self._throttled = throttled
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> int:
+        """The number of calls currently allowed in flight."""
+        return int(self._limit)
+
+    @property
+    def maximum(self) -> int:
+        """The highest the limit can grow to."""
+        return self._maximum
+
+    def start(self) -> int:
+        """Note that a call is starting.
+
+        Returns:
+            int: A token to pass to :meth:`record` when the call ends.
+        """
+        return self._generation
+
+    def record(self, token: int, error: Exception = None) -> None:
+        """Adjust the limit to the outcome of a call.
+
+        Args:
+            token (int): The token returned by :meth:`start` for the call.
+            error (Exception): The error raised by the call, if any.
+        """
+        with self._lock:
+            if error is None:
+                self._limit = min(
+                    self._maximum, self._limit + self._increase / self._limit
+                )
+            elif isinstance(error, self._throttled) and token == self._generation:
+                self._limit = max(self._minimum, self._limit * self._decrease)
+                self._generation += 1
+
+
+def _result(index, item, error, get_result) -> BulkResult:
+    if error is None:
+        return BulkResult(index, item, result=get_result())
+    return BulkResult(index, item, error=error)
+
+
+def run(
+    call: Callable[[Any], Any],
+    items: Iterable[Any],
+    max_workers: int = 8,
+    ordered: bool = True,
+    concurrency: AdaptiveConcurrency = None,
+) -> Iterator[BulkResult]:
+    """Call ``call`` once per item on a bounded pool of threads.
+
+    Items are drawn from ``items`` lazily, so at most ``max_workers``
+    calls are in flight and a large iterable is never materialized. A
+    failed call is reported in its result and does not stop the others.
+
+    Args:
+        call (Callable[[Any], Any]): Makes the call for an item.
+        items (Iterable[Any]): The items to make calls for.
+        max_workers (int): The number of calls in flight at once.
+        ordered (bool): If true, results are yielded in the order of
+            ``items``, each as soon as it and every earlier one completed.
+            Otherwise they are yielded as they complete.
+        concurrency (Optional[~.AdaptiveConcurrency]): If set, its limit
+            replaces ``max_workers`` and adapts to the outcome of the calls.
+
+    Returns:
+        Iterator[~.BulkResult]: One result per item.
+    """
+    pending = enumerate(items)
+    reorder = _Reorder() if ordered else None
+    in_flight = {}  # type: Dict[futures.Future, Tuple[int, Any, int]]
+    executor = futures.ThreadPoolExecutor(
+        max_workers=concurrency.maximum if concurrency else max_workers
+    )
+
+    def refill():
+        room = (concurrency.limit if concurrency else max_workers) - len(in_flight)
+        for index, item in itertools.islice(pending, max(room, 0)):
+            token = concurrency.start() if concurrency else 0
+            in_flight[executor.submit(call, item)] = (index, item, token)
+
+    try:
+        refill()
+        while in_flight:
+            done, _ = futures.wait(in_flight, return_when=futures.FIRST_COMPLETED)
+            results = []
+            for future in done:
+                index, item, token = in_flight.pop(future)
+                error = future.exception()
+                if concurrency is not None:
+                    concurrency.record(token, error)
+                results.append(_result(index, item, error, future.result))
+            refill()
+            for result in results:
+                if reorder is None:
+                    yield result
+                else:
+                    yield from reorder.push(result)
+    finally:
+        for future in in_flight:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+async def run_async(
+    call: Callable[[Any], Awaitable[Any]],
+    items: Iterable[Any],
+    max_concurrency: int = 8,
+    ordered: bool = True,
+    concurrency: AdaptiveConcurrency = None,
+) -> AsyncIterator[BulkResult]:
+    """Await ``call`` once per item with bounded concurrency.
+
+    The asyncio counterpart of :func:`run`: calls run as tasks, at most
+    ``max_concurrency`` at once.
+
+    Args:
+        call (Callable[[Any], Awaitable[Any]]): Makes the call for an item.
+        items (Iterable[Any]): The items to make calls for.
+        max_concurrency (int): The number of calls in flight at once.
+        ordered (bool): If true, results are yielded in the order of
+            ``items``. Otherwise they are yielded as they complete.
+        concurrency (Optional[~.AdaptiveConcurrency]): If set, its limit
+            replaces ``max_concurrency`` and adapts to the outcome of the
+            calls.
+
+    Returns:
+        AsyncIterator[~.BulkResult]: One result per item.
+    """
+    pending = enumerate(items)
+    reorder = _Reorder() if ordered else None
+    in_flight = {}  # type: Dict[asyncio.Future, Tuple[int, Any, int]]
+
+    def refill():
+        limit = concurrency.limit if concurrency else max_concurrency
+        for index, item in itertools.islice(pending, max(limit - len(in_flight), 0)):
+            token = concurrency.start() if concurrency else 0
+            in_flight[asyncio.ensure_future(call(item))] = (index, item, token)
+
+    try:
+        refill()
+        while in_flight:
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            results = []
+            for task in done:
+                index, item, token = in_flight.pop(task)
+                error = task.exception()
+                if concurrency is not None:
+                    concurrency.record(token, error)
+                results.append(_result(index, item, error, task.result))
+            refill()
+            for result in results:
+                if reorder is None:
+                    yield result
+                else:
+                    for ready in reorder.push(result):
+                        yield ready
+    finally:
+        for task in in_flight:
+            task.cancel()
+
+
+def group(
+    results: Iterable[BulkResult], key: Callable[[BulkResult], Hashable]
+) -> Dict[Hashable, List[BulkResult]]:
+    """Group bulk results, keeping their order within each group.
+
+    Args:
+        results (Iterable[~.BulkResult]): The results to group.
+        key (Callable[[~.BulkResult], Hashable]): Returns the group of a
+            result.
+
+    Returns:
+        Dict[Hashable, List[~.BulkResult]]: The results of each group,
+            with groups in the order they were first seen.
+    """
+    groups = OrderedDict()  # type: Dict[Hashable, List[BulkResult]]
+    for result in results:
+        groups.setdefault(key(result), []).append(result)
+    return groups
+
+
+__all__ = (
+    "AdaptiveConcurrency",
+    "BulkResult",
+    "group",
+    "run",
+    "run_async",
+)
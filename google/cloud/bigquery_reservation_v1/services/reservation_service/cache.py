@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from collections import OrderedDict
+import threading
+import time
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+import proto  # type: ignore
+
+
+class ResourceCache:
+    """A client-side cache of resources keyed by resource name.
+
+    Entries expire ``ttl`` seconds after they were stored, and the least
+    recently used entry is evicted once ``max_size`` entries are held.
+    Resources are copied on the way in and out, so callers may modify
+    what they get back. The cache is safe to share across threads.
+
+    A client constructed with a cache serves ``get_reservation``,
+    ``get_capacity_commitment`` and ``get_bi_reservation`` from it,
+    populates it from those methods and from the reservation and capacity
+    commitment list pagers, and invalidates the entries touched by the
+    writes it issues.
+
+    A read takes a :meth:`generation` before it is sent and hands it to
+    :meth:`put`, which drops the response if the resource was invalidated
+    meanwhile, so a slow read cannot cache what a write just replaced.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 60.0,
+        max_size: int = 1024,
+        *,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """Instantiate the cache.
+
+        Args:
+            ttl (float): The number of seconds an entry stays fresh.
+            max_size (int): The maximum number of entries held.
+            clock (Callable[[], float]): The source of the current time,
+                in seconds.
+        """
+        self._ttl = ttl
+        self._max_size = max_size
+        self._clock = clock
+        self._entries = OrderedDict()  # type: OrderedDict[str, Any]
+        # The generation each name was last invalidated at. Names evicted
+        # from it, and every name after a clear, count as invalidated at
+        # the floor.
+        self._generation = 0
+        self._invalidated = OrderedDict()  # type: OrderedDict[str, int]
+        self._floor = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, name: str) -> Optional[proto.Message]:
+        """Return a copy of the fresh resource cached under ``name``, if any."""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return None
+            stored_at, resource = entry
+            if self._clock() - stored_at >= self._ttl:
+                del self._entries[name]
+                return None
+            self._entries.move_to_end(name)
+        return type(resource)(resource)
+
+    def generation(self) -> int:
+        """Return the current generation, to take before sending a read."""
+        with self._lock:
+            return self._generation
+
+    def put(self, resource: proto.Message, generation: int = None) -> None:
+        """Cache a copy of ``resource`` under its ``name``.
+
+        Args:
+            resource (proto.Message): The resource to cache.
+            generation (Optional[int]): The :meth:`generation` taken
+                before ``resource`` was read. If its name was invalidated
+                since, the resource may be stale and is not cached.
+        """
+        if not resource.name:
+            return
+        entry = (self._clock(), type(resource)(resource))
+        with self._lock:
+            if generation is not None and generation < max(
+                self._floor, self._invalidated.get(resource.name, 0)
+            ):
+                return
+            self._entries[resource.name] = entry
+            self._entries.move_to_end(resource.name)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def put_all(
+        self, resources: Iterable[proto.Message], generation: int = None
+    ) -> None:
+        """Cache a copy of each of ``resources``, as :meth:`put` does."""
+        for resource in resources:
+            self.put(resource, generation)
+
+    def invalidate(self, *names: str) -> None:
+        """Drop the entries cached under ``names``.
+
+        Reads of these names already in flight are not cached either.
+        """
+        with self._lock:
+            self._generation += 1
+            for name in names:
+                self._entries.pop(name, None)
+                self._invalidated[name] = self._generation
+                self._invalidated.move_to_end(name)
+            while len(self._invalidated) > self._max_size:
+                _, generation = self._invalidated.popitem(last=False)
+                self._floor = max(self._floor, generation)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self._floor = self._generation
+            self._invalidated.clear()
+
+    def wrap_list(self, method: Callable[..., Any], field: str) -> Callable[..., Any]:
+        """Wrap a list method so that each page it returns populates the cache.
+
+        Args:
+            method (Callable): The wrapped RPC method.
+            field (str): The name of the repeated field holding the
+                resources on each response page.
+        """
+
+        def wrapped(request, **kwargs):
+            generation = self.generation()
+            response = method(request, **kwargs)
+            self.put_all(getattr(response, field), generation)
+            return response
+
+        return wrapped
+
+    def wrap_list_async(
+        self, method: Callable[..., Awaitable[Any]], field: str
+    ) -> Callable[..., Awaitable[Any]]:
+        """Wrap an async list method so that each page populates the cache.
+
+        Args:
+            method (Callable): The wrapped RPC method.
+            field (str): The name of the repeated field holding the
+                resources on each response page.
+        """
+
+        async def wrapped(request, **kwargs):
+            generation = self.generation()
+            response = await method(request, **kwargs)
+            self.put_all(getattr(response, field), generation)
+            return response
+
+        return wrapped
+
+
+__all__ = ("ResourceCache",)
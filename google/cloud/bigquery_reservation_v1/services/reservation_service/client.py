@@ -17,11 +17,26 @@
 
 from collections import OrderedDict
 from distutils import util
+import functools
 import os
 import re
-from typing import Callable, Dict, Optional, Sequence, Tuple, Type, Union
+import threading
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
 import pkg_resources
 
+import grpc  # type: ignore
+
 from google.api_core import client_options as client_options_lib  # type: ignore
 from google.api_core import exceptions  # type: ignore
 from google.api_core import gapic_v1  # type: ignore
@@ -32,16 +47,25 @@ from google.auth.transport.grpc import SslCredentials  # type: ignore
 from google.auth.exceptions import MutualTLSChannelError  # type: ignore
 from google.oauth2 import service_account  # type: ignore
 
+from google.cloud.bigquery_reservation_v1.services.reservation_service import bulk
+from google.cloud.bigquery_reservation_v1.services.reservation_service import fanout
+from google.cloud.bigquery_reservation_v1.services.reservation_service import masks
 from google.cloud.bigquery_reservation_v1.services.reservation_service import pagers
+from google.cloud.bigquery_reservation_v1.services.reservation_service import polling
 from google.cloud.bigquery_reservation_v1.types import reservation
 from google.cloud.bigquery_reservation_v1.types import reservation as gcbr_reservation
 from google.protobuf import field_mask_pb2 as field_mask  # type: ignore
 from google.protobuf import timestamp_pb2 as timestamp  # type: ignore
 from google.rpc import status_pb2 as status  # type: ignore
 
+from .cache import ResourceCache
+from .coalescing import SingleFlight
 from .transports.base import ReservationServiceTransport, DEFAULT_CLIENT_INFO
+from .transports.channel_options import ChannelOptions
 from .transports.grpc import ReservationServiceGrpcTransport
 from .transports.grpc_asyncio import ReservationServiceGrpcAsyncIOTransport
+from .transports.pool import ReservationServicePooledGrpcTransport
+from .transports.pool import ReservationServicePooledGrpcAsyncIOTransport
 
 
 class ReservationServiceClientMeta(type):
@@ -57,6 +81,10 @@ class ReservationServiceClientMeta(type):
     )  # type: Dict[str, Type[ReservationServiceTransport]]
     _transport_registry["grpc"] = ReservationServiceGrpcTransport
     _transport_registry["grpc_asyncio"] = ReservationServiceGrpcAsyncIOTransport
+    _transport_registry["grpc_pool"] = ReservationServicePooledGrpcTransport
+    _transport_registry[
+        "grpc_asyncio_pool"
+    ] = ReservationServicePooledGrpcAsyncIOTransport
 
     def get_transport_class(
         cls, label: str = None,
@@ -299,6 +327,10 @@ class ReservationServiceClient(metaclass=ReservationServiceClientMeta):
         transport: Union[str, ReservationServiceTransport, None] = None,
         client_options: Optional[client_options_lib.ClientOptions] = None,
         client_info: gapic_v1.client_info.ClientInfo = DEFAULT_CLIENT_INFO,
+        cache: Optional[ResourceCache] = None,
+        coalesce_reads: bool = False,
+        lazy: bool = False,
+        channel_options: Optional[ChannelOptions] = None,
     ) -> None:
         """Instantiate the reservation service client.
 
@@ -332,16 +364,72 @@ class ReservationServiceClient(metaclass=ReservationServiceClientMeta):
                 API requests. If ``None``, then default info will be used.
                 Generally, you only need to set this if you're developing
                 your own client library.
+            cache (Optional[~.ResourceCache]): A cache to serve
+                ``get_reservation``, ``get_capacity_commitment`` and
+                ``get_bi_reservation`` from. It is populated by those methods
+                and the reservation and capacity commitment listings, and the
+                entries touched by writes issued through this client are
+                invalidated. If ``None``, every read is sent to the service.
+            coalesce_reads (bool): Whether concurrent identical read calls
+                share the response of a single RPC rather than each sending
+                their own. Callers then receive the same response object,
+                and each waits no longer than its own timeout.
+            lazy (bool): Whether to defer creating the transport, and with it
+                the mutual TLS setup, credential discovery and channel, until
+                the first call or the first access to :attr:`transport`.
+                Errors raised while creating it are then raised there. It has
+                no effect if a ``transport`` instance is provided.
+            channel_options (Optional[~.ChannelOptions]): Keepalive,
+                message size and compression settings of the channel the
+                transport opens. They cannot be given along with a
+                ``transport`` instance.
 
         Raises:
             google.auth.exceptions.MutualTLSChannelError: If mutual TLS transport
                 creation failed for any reason.
         """
+        self._cache = cache
+        self._single_flight = SingleFlight() if coalesce_reads else None
+
         if isinstance(client_options, dict):
             client_options = client_options_lib.from_dict(client_options)
         if client_options is None:
             client_options = client_options_lib.ClientOptions()
 
+        self._transport_lock = threading.Lock()
+        self._transport_factory = None
+        if lazy and not isinstance(transport, ReservationServiceTransport):
+            self._transport_factory = functools.partial(
+                self._create_transport,
+                credentials,
+                transport,
+                client_options,
+                client_info,
+                channel_options,
+            )
+        else:
+            self._created_transport = self._create_transport(
+                credentials, transport, client_options, client_info, channel_options
+            )
+
+    @property
+    def _transport(self) -> ReservationServiceTransport:
+        # A lazy client creates its transport once, on first use.
+        if self._transport_factory is not None:
+            with self._transport_lock:
+                if self._transport_factory is not None:
+                    self._created_transport = self._transport_factory()
+                    self._transport_factory = None
+        return self._created_transport
+
+    def _create_transport(
+        self,
+        credentials: Optional[credentials.Credentials],
+        transport: Union[str, ReservationServiceTransport, None],
+        client_options: client_options_lib.ClientOptions,
+        client_info: gapic_v1.client_info.ClientInfo,
+        channel_options: Optional[ChannelOptions] = None,
+    ) -> ReservationServiceTransport:
         # Create SSL credentials for mutual TLS if needed.
         use_client_cert = bool(
             util.strtobool(os.getenv("GOOGLE_API_USE_CLIENT_CERTIFICATE", "false"))
@@ -351,8 +439,6 @@ class ReservationServiceClient(metaclass=ReservationServiceClientMeta):
         is_mtls = False
         if use_client_cert:
             if client_options.client_cert_source:
-                import grpc  # type: ignore
-
                 cert, key = client_options.client_cert_source()
                 ssl_credentials = grpc.ssl_channel_credentials(
                     certificate_chain=cert, private_key=key
@@ -396,10 +482,20 @@ class ReservationServiceClient(metaclass=ReservationServiceClientMeta):
                     "When providing a transport instance, "
                     "provide its scopes directly."
                 )
-            self._transport = transport
+            if channel_options is not None:
+                raise ValueError(
+                    "When providing a transport instance, "
+                    "provide its channel options directly."
+                )
+            return transport
         else:
             Transport = type(self).get_transport_class(transport)
-            self._transport = Transport(
+            # Only pass the channel options on when given, so that custom
+            # transports without the argument keep working.
+            kwargs = {}
+            if channel_options is not None:
+                kwargs["channel_options"] = channel_options
+            return Transport(
                 credentials=credentials,
                 credentials_file=client_options.credentials_file,
                 host=api_endpoint,
@@ -407,8 +503,14 @@ class ReservationServiceClient(metaclass=ReservationServiceClientMeta):
                 ssl_channel_credentials=ssl_credentials,
                 quota_project_id=client_options.quota_project_id,
                 client_info=client_info,
+                **kwargs,
             )
 
+    def _invalidate_cached(self, *names: str) -> None:
+        """Drop the resources cached under ``names``, if there is a cache."""
+        if self._cache is not None:
+            self._cache.invalidate(*names)
+
     def create_reservation(
         self,
         request: gcbr_reservation.CreateReservationRequest = None,
@@ -510,6 +612,9 @@ class ReservationServiceClient(metaclass=ReservationServiceClientMeta):
         retry: retries.Retry = gapic_v1.method.DEFAULT,
         timeout: float = None,
         metadata: Sequence[Tuple[str, str]] = (),
+        prefetch: int = 0,
+        checkpoint: pagers.PagerCheckpoint = None,
+        page_retry: retries.Retry = None,
     ) -> pagers.ListReservationsPager:
         r"""Lists all the reservations for the project in the
         specified location.
@@ -530,6 +635,17 @@ class ReservationServiceClient(metaclass=ReservationServiceClientMeta):
             timeout (float): The timeout for this request.
             metadata (Sequence[Tuple[str, str]]): Strings which should be
                 sent along with the request as metadata.
+            prefetch (int): The number of result pages to fetch ahead
+                of iteration on a background thread. Defaults to ``0``,
+                which fetches pages on demand.
+            checkpoint (:class:`~.pagers.PagerCheckpoint`): A checkpoint
+                taken from an earlier pager over the same request. The
+                listing resumes from the item after the last one that
+                pager consumed.
+            page_retry (google.api_core.retry.Retry): Designation of how
+                the fetch of a subsequent page should be retried once
+                ``retry`` has been exhausted. Only the failed page is
+                fetched again.
 
         Returns:
             ~.pagers.ListReservationsPager:
@@ -563,10 +679,24 @@ class ReservationServiceClient(metaclass=ReservationServiceClientMeta):
             if parent is not None:
                 request.parent = parent
 
+        # Resume from the position recorded by an earlier pager, if any.
+        # Copy the request first so a caller-provided one is not modified.
+        if checkpoint is not None:
+            request = reservation.ListReservationsRequest(request)
+            request.page_token = checkpoint.page_token
+
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
         rpc = self._transport._wrapped_methods[self._transport.list_reservations]
 
+        # Populate the resource cache from every page of the listing.
+        if self._cache is not None:
+            rpc = self._cache.wrap_list(rpc, "reservations")
+
+        # Share one RPC among concurrent identical reads.
+        if self._single_flight is not None:
+            rpc = self._single_flight.wrap("list_reservations", rpc)
+
         # Certain fields should be provided within the metadata header;
         # add these here.
         metadata = tuple(metadata) + (
@@ -579,7 +709,13 @@ class ReservationServiceClient(metaclass=ReservationServiceClientMeta):
         # This method is paged; wrap the response in a pager, which provides
         # an `__iter__` convenience method.
         response = pagers.ListReservationsPager(
-            method=rpc, request=request, response=response, metadata=metadata,
+            method=rpc,
+            request=request,
+            response=response,
+            metadata=metadata,
+            prefetch=prefetch,
+            checkpoint=checkpoint,
+            page_retry=page_retry,
         )
 
         # Done; return the response.
@@ -643,10 +779,21 @@ class ReservationServiceClient(metaclass=ReservationServiceClientMeta):
             if name is not None:
                 request.name = name
 
+        # Serve the resource from the cache while it is fresh.
+        if self._cache is not None:
+            generation = self._cache.generation()
+            cached = self._cache.get(request.name)
+            if cached is not None:
+                return cached
+
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
         rpc = self._transport._wrapped_methods[self._transport.get_reservation]
 
+        # Share one RPC among concurrent identical reads.
+        if self._single_flight is not None:
+            rpc = self._single_flight.wrap("get_reservation", rpc)
+
         # Certain fields should be provided within the metadata header;
         # add these here.
         metadata = tuple(metadata) + (
@@ -655,6 +802,8 @@ class ReservationServiceClient(metaclass=ReservationServiceClientMeta):
 
         # Send the request.
         response = rpc(request, retry=retry, timeout=timeout, metadata=metadata,)
+        if self._cache is not None:
+            self._cache.put(response, generation)
 
         # Done; return the response.
         return response
@@ -724,9 +873,13 @@ class ReservationServiceClient(metaclass=ReservationServiceClientMeta):
         )
 
         # Send the request.
-        rpc(
-            request, retry=retry, timeout=timeout, metadata=metadata,
-        )
+        try:
+            rpc(
+                request, retry=retry, timeout=timeout, metadata=metadata,
+            )
+        finally:
+            # Drop any cached copy; the write may have changed it.
+            self._invalidate_cached(request.name)
 
     def update_reservation(
         self,
@@ -806,7 +959,11 @@ class ReservationServiceClient(metaclass=ReservationServiceClientMeta):
         )
 
         # Send the request.
-        response = rpc(request, retry=retry, timeout=timeout, metadata=metadata,)
+        try:
+            response = rpc(request, retry=retry, timeout=timeout, metadata=metadata,)
+        finally:
+            # Drop any cached copy; the write may have changed it.
+            self._invalidate_cached(request.reservation.name)
 
         # Done; return the response.
         return response
@@ -915,6 +1072,9 @@ class ReservationServiceClient(metaclass=ReservationServiceClientMeta):
         retry: retries.Retry = gapic_v1.method.DEFAULT,
         timeout: float = None,
         metadata: Sequence[Tuple[str, str]] = (),
+        prefetch: int = 0,
+        checkpoint: pagers.PagerCheckpoint = None,
+        page_retry: retries.Retry = None,
     ) -> pagers.ListCapacityCommitmentsPager:
         r"""Lists all the capacity commitments for the admin
         project.
@@ -935,6 +1095,17 @@ class ReservationServiceClient(metaclass=ReservationServiceClientMeta):
             timeout (float): The timeout for this request.
             metadata (Sequence[Tuple[str, str]]): Strings which should be
                 sent along with the request as metadata.
+            prefetch (int): The number of result pages to fetch ahead
+                of iteration on a background thread. Defaults to ``0``,
+                which fetches pages on demand.
+            checkpoint (:class:`~.pagers.PagerCheckpoint`): A checkpoint
+                taken from an earlier pager over the same request. The
+                listing resumes from the item after the last one that
+                pager consumed.
+            page_retry (google.api_core.retry.Retry): Designation of how
+                the fetch of a subsequent page should be retried once
+                ``retry`` has been exhausted. Only the failed page is
+                fetched again.
 
         Returns:
             ~.pagers.ListCapacityCommitmentsPager:
@@ -968,12 +1139,26 @@ class ReservationServiceClient(metaclass=ReservationServiceClientMeta):
             if parent is not None:
                 request.parent = parent
 
+        # Resume from the position recorded by an earlier pager, if any.
+        # Copy the request first so a caller-provided one is not modified.
+        if checkpoint is not None:
+            request = reservation.ListCapacityCommitmentsRequest(request)
+            request.page_token = checkpoint.page_token
+
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
         rpc = self._transport._wrapped_methods[
             self._transport.list_capacity_commitments
         ]
 
+        # Populate the resource cache from every page of the listing.
+        if self._cache is not None:
+            rpc = self._cache.wrap_list(rpc, "capacity_commitments")
+
+        # Share one RPC among concurrent identical reads.
+        if self._single_flight is not None:
+            rpc = self._single_flight.wrap("list_capacity_commitments", rpc)
+
         # Certain fields should be provided within the metadata header;
         # add these here.
         metadata = tuple(metadata) + (
@@ -986,7 +1171,13 @@ class ReservationServiceClient(metaclass=ReservationServiceClientMeta):
         # This method is paged; wrap the response in a pager, which provides
         # an `__iter__` convenience method.
         response = pagers.ListCapacityCommitmentsPager(
-            method=rpc, request=request, response=response, metadata=metadata,
+            method=rpc,
+            request=request,
+            response=response,
+            metadata=metadata,
+            prefetch=prefetch,
+            checkpoint=checkpoint,
+            page_retry=page_retry,
         )
 
         # Done; return the response.
@@ -1062,10 +1253,21 @@ class ReservationServiceClient(metaclass=ReservationServiceClientMeta):
             if name is not None:
                 request.name = name
 
+        # Serve the resource from the cache while it is fresh.
+        if self._cache is not None:
+            generation = self._cache.generation()
+            cached = self._cache.get(request.name)
+            if cached is not None:
+                return cached
+
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
         rpc = self._transport._wrapped_methods[self._transport.get_capacity_commitment]
 
+        # Share one RPC among concurrent identical reads.
+        if self._single_flight is not None:
+            rpc = self._single_flight.wrap("get_capacity_commitment", rpc)
+
         # Certain fields should be provided within the metadata header;
         # add these here.
         metadata = tuple(metadata) + (
@@ -1074,6 +1276,8 @@ class ReservationServiceClient(metaclass=ReservationServiceClientMeta):
 
         # Send the request.
         response = rpc(request, retry=retry, timeout=timeout, metadata=metadata,)
+        if self._cache is not None:
+            self._cache.put(response, generation)
 
         # Done; return the response.
         return response
@@ -1145,9 +1349,13 @@ class ReservationServiceClient(metaclass=ReservationServiceClientMeta):
         )
 
         # Send the request.
-        rpc(
-            request, retry=retry, timeout=timeout, metadata=metadata,
-        )
+        try:
+            rpc(
+                request, retry=retry, timeout=timeout, metadata=metadata,
+            )
+        finally:
+            # Drop any cached copy; the write may have changed it.
+            self._invalidate_cached(request.name)
 
     def update_capacity_commitment(
         self,
@@ -1249,7 +1457,11 @@ class ReservationServiceClient(metaclass=ReservationServiceClientMeta):
         )
 
         # Send the request.
-        response = rpc(request, retry=retry, timeout=timeout, metadata=metadata,)
+        try:
+            response = rpc(request, retry=retry, timeout=timeout, metadata=metadata,)
+        finally:
+            # Drop any cached copy; the write may have changed it.
+            self._invalidate_cached(request.capacity_commitment.name)
 
         # Done; return the response.
         return response
@@ -1341,7 +1553,11 @@ class ReservationServiceClient(metaclass=ReservationServiceClientMeta):
         )
 
         # Send the request.
-        response = rpc(request, retry=retry, timeout=timeout, metadata=metadata,)
+        try:
+            response = rpc(request, retry=retry, timeout=timeout, metadata=metadata,)
+        finally:
+            # Drop any cached copy; the write may have changed it.
+            self._invalidate_cached(request.name)
 
         # Done; return the response.
         return response
@@ -1452,7 +1668,16 @@ class ReservationServiceClient(metaclass=ReservationServiceClientMeta):
         )
 
         # Send the request.
-        response = rpc(request, retry=retry, timeout=timeout, metadata=metadata,)
+        try:
+            response = rpc(request, retry=retry, timeout=timeout, metadata=metadata,)
+        finally:
+            # Drop any cached copies of the merged commitments.
+            self._invalidate_cached(
+                *(
+                    "{}/capacityCommitments/{}".format(request.parent, commitment_id)
+                    for commitment_id in request.capacity_commitment_ids
+                )
+            )
 
         # Done; return the response.
         return response
@@ -1581,6 +1806,10 @@ class ReservationServiceClient(metaclass=ReservationServiceClientMeta):
         retry: retries.Retry = gapic_v1.method.DEFAULT,
         timeout: float = None,
         metadata: Sequence[Tuple[str, str]] = (),
+        prefetch: int = 0,
+        checkpoint: pagers.PagerCheckpoint = None,
+        page_retry: retries.Retry = None,
+        compression: grpc.Compression = None,
     ) -> pagers.ListAssignmentsPager:
         r"""Lists assignments.
 
@@ -1626,6 +1855,20 @@ class ReservationServiceClient(metaclass=ReservationServiceClientMeta):
             timeout (float): The timeout for this request.
             metadata (Sequence[Tuple[str, str]]): Strings which should be
                 sent along with the request as metadata.
+            prefetch (int): The number of result pages to fetch ahead
+                of iteration on a background thread. Defaults to ``0``,
+                which fetches pages on demand.
+            checkpoint (:class:`~.pagers.PagerCheckpoint`): A checkpoint
+                taken from an earlier pager over the same request. The
+                listing resumes from the item after the last one that
+                pager consumed.
+            page_retry (google.api_core.retry.Retry): Designation of how
+                the fetch of a subsequent page should be retried once
+                ``retry`` has been exhausted. Only the failed page is
+                fetched again.
+            compression (grpc.Compression): The compression of the
+                requests of this call and of the later pages. If ``None``,
+                the compression of the channel is used.
 
         Returns:
             ~.pagers.ListAssignmentsPager:
@@ -1659,10 +1902,24 @@ class ReservationServiceClient(metaclass=ReservationServiceClientMeta):
             if parent is not None:
                 request.parent = parent
 
+        # Resume from the position recorded by an earlier pager, if any.
+        # Copy the request first so a caller-provided one is not modified.
+        if checkpoint is not None:
+            request = reservation.ListAssignmentsRequest(request)
+            request.page_token = checkpoint.page_token
+
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
         rpc = self._transport._wrapped_methods[self._transport.list_assignments]
 
+        # Share one RPC among concurrent identical reads.
+        if self._single_flight is not None:
+            rpc = self._single_flight.wrap("list_assignments", rpc)
+
+        # Send this request and those of the later pages compressed.
+        if compression is not None:
+            rpc = functools.partial(rpc, compression=compression)
+
         # Certain fields should be provided within the metadata header;
         # add these here.
         metadata = tuple(metadata) + (
@@ -1675,7 +1932,13 @@ class ReservationServiceClient(metaclass=ReservationServiceClientMeta):
         # This method is paged; wrap the response in a pager, which provides
         # an `__iter__` convenience method.
         response = pagers.ListAssignmentsPager(
-            method=rpc, request=request, response=response, metadata=metadata,
+            method=rpc,
+            request=request,
+            response=response,
+            metadata=metadata,
+            prefetch=prefetch,
+            checkpoint=checkpoint,
+            page_retry=page_retry,
         )
 
         # Done; return the response.
@@ -1773,6 +2036,10 @@ class ReservationServiceClient(metaclass=ReservationServiceClientMeta):
         retry: retries.Retry = gapic_v1.method.DEFAULT,
         timeout: float = None,
         metadata: Sequence[Tuple[str, str]] = (),
+        prefetch: int = 0,
+        checkpoint: pagers.PagerCheckpoint = None,
+        page_retry: retries.Retry = None,
+        compression: grpc.Compression = None,
     ) -> pagers.SearchAssignmentsPager:
         r"""Looks up assignments for a specified resource for a particular
         region. If the request is about a project:
@@ -1831,6 +2098,20 @@ class ReservationServiceClient(metaclass=ReservationServiceClientMeta):
             timeout (float): The timeout for this request.
             metadata (Sequence[Tuple[str, str]]): Strings which should be
                 sent along with the request as metadata.
+            prefetch (int): The number of result pages to fetch ahead
+                of iteration on a background thread. Defaults to ``0``,
+                which fetches pages on demand.
+            checkpoint (:class:`~.pagers.PagerCheckpoint`): A checkpoint
+                taken from an earlier pager over the same request. The
+                listing resumes from the item after the last one that
+                pager consumed.
+            page_retry (google.api_core.retry.Retry): Designation of how
+                the fetch of a subsequent page should be retried once
+                ``retry`` has been exhausted. Only the failed page is
+                fetched again.
+            compression (grpc.Compression): The compression of the
+                requests of this call and of the later pages. If ``None``,
+                the compression of the channel is used.
 
         Returns:
             ~.pagers.SearchAssignmentsPager:
@@ -1866,10 +2147,24 @@ class ReservationServiceClient(metaclass=ReservationServiceClientMeta):
             if query is not None:
                 request.query = query
 
+        # Resume from the position recorded by an earlier pager, if any.
+        # Copy the request first so a caller-provided one is not modified.
+        if checkpoint is not None:
+            request = reservation.SearchAssignmentsRequest(request)
+            request.page_token = checkpoint.page_token
+
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
         rpc = self._transport._wrapped_methods[self._transport.search_assignments]
 
+        # Share one RPC among concurrent identical reads.
+        if self._single_flight is not None:
+            rpc = self._single_flight.wrap("search_assignments", rpc)
+
+        # Send this request and those of the later pages compressed.
+        if compression is not None:
+            rpc = functools.partial(rpc, compression=compression)
+
         # Certain fields should be provided within the metadata header;
         # add these here.
         metadata = tuple(metadata) + (
@@ -1882,7 +2177,13 @@ class ReservationServiceClient(metaclass=ReservationServiceClientMeta):
         # This method is paged; wrap the response in a pager, which provides
         # an `__iter__` convenience method.
         response = pagers.SearchAssignmentsPager(
-            method=rpc, request=request, response=response, metadata=metadata,
+            method=rpc,
+            request=request,
+            response=response,
+            metadata=metadata,
+            prefetch=prefetch,
+            checkpoint=checkpoint,
+            page_retry=page_retry,
         )
 
         # Done; return the response.
@@ -2037,10 +2338,21 @@ class ReservationServiceClient(metaclass=ReservationServiceClientMeta):
             if name is not None:
                 request.name = name
 
+        # Serve the resource from the cache while it is fresh.
+        if self._cache is not None:
+            generation = self._cache.generation()
+            cached = self._cache.get(request.name)
+            if cached is not None:
+                return cached
+
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
         rpc = self._transport._wrapped_methods[self._transport.get_bi_reservation]
 
+        # Share one RPC among concurrent identical reads.
+        if self._single_flight is not None:
+            rpc = self._single_flight.wrap("get_bi_reservation", rpc)
+
         # Certain fields should be provided within the metadata header;
         # add these here.
         metadata = tuple(metadata) + (
@@ -2049,6 +2361,8 @@ class ReservationServiceClient(metaclass=ReservationServiceClientMeta):
 
         # Send the request.
         response = rpc(request, retry=retry, timeout=timeout, metadata=metadata,)
+        if self._cache is not None:
+            self._cache.put(response, generation)
 
         # Done; return the response.
         return response
@@ -2136,11 +2450,469 @@ class ReservationServiceClient(metaclass=ReservationServiceClientMeta):
         )
 
         # Send the request.
-        response = rpc(request, retry=retry, timeout=timeout, metadata=metadata,)
+        try:
+            response = rpc(request, retry=retry, timeout=timeout, metadata=metadata,)
+        finally:
+            # Drop any cached copy; the write may have changed it.
+            self._invalidate_cached(request.bi_reservation.name)
 
         # Done; return the response.
         return response
 
+    @classmethod
+    def _fan_out_parent(cls, method: str, project: str, location: str) -> str:
+        """Return the parent ``method`` lists under for a project and location."""
+        if method == "list_assignments":
+            # List the assignments of every reservation in the location.
+            return cls.reservation_path(project, location, "-")
+        if method in ("list_reservations", "list_capacity_commitments"):
+            return cls.common_location_path(project, location)
+        raise ValueError("Method {!r} cannot be fanned out.".format(method))
+
+    def fan_out_list(
+        self,
+        method: str,
+        *,
+        projects: Iterable[str],
+        locations: Iterable[str],
+        max_workers: int = 8,
+        retry: retries.Retry = gapic_v1.method.DEFAULT,
+        timeout: float = None,
+        metadata: Sequence[Tuple[str, str]] = (),
+    ) -> Iterator[fanout.FanOutResult]:
+        r"""Lists resources across several projects and locations at once.
+
+        The listing under each project and location is walked on a
+        bounded pool of threads, so an inventory spanning many locations
+        takes about as long as its slowest location rather than the sum
+        of all of them.
+
+        Args:
+            method (str): The paged method to fan out; one of
+                ``list_reservations``, ``list_capacity_commitments`` or
+                ``list_assignments``. Assignments are listed across all
+                reservations of each location.
+            projects (Iterable[str]): The admin projects to list.
+            locations (Iterable[str]): The locations to list in each
+                project, e.g. ``US`` or ``europe-west2``.
+            max_workers (int): The number of listings walked at once.
+
+            retry (google.api_core.retry.Retry): Designation of what errors, if any,
+                should be retried.
+            timeout (float): The timeout for each request.
+            metadata (Sequence[Tuple[str, str]]): Strings which should be
+                sent along with each request as metadata.
+
+        Returns:
+            Iterator[~.fanout.FanOutResult]:
+                The listed resources, merged in the order they arrive
+                and tagged with the parent they were listed under.
+
+        Raises:
+            ValueError: If ``method`` is not one of the methods above.
+        """
+        parents = [
+            self._fan_out_parent(method, project, location)
+            for project in projects
+            for location in locations
+        ]
+        list_method = getattr(self, method)
+
+        def list_parent(parent):
+            return list_method(
+                parent=parent, retry=retry, timeout=timeout, metadata=metadata,
+            )
+
+        return fanout.fan_out(list_parent, parents, max_workers=max_workers)
+
+    _WATCHABLE_METHODS = (
+        "list_reservations",
+        "list_capacity_commitments",
+        "list_assignments",
+    )
+
+    def watch(
+        self,
+        method: str,
+        parent: str,
+        *,
+        interval: polling.AdaptiveInterval = None,
+        retry: retries.Retry = gapic_v1.method.DEFAULT,
+        timeout: float = None,
+        metadata: Sequence[Tuple[str, str]] = (),
+    ) -> Iterator[polling.ResourceChanges]:
+        r"""Watches the resources under a parent for changes.
+
+        The listing is polled, and only the resources that were added,
+        removed or modified since the previous poll are reported. The
+        resources present at the first poll are reported as added. The
+        polling interval lengthens while nothing changes and drops back to
+        its minimum after a change, so quiet parents cost few requests.
+
+        Args:
+            method (str): The paged method to poll; one of
+                ``list_reservations``, ``list_capacity_commitments`` or
+                ``list_assignments``.
+            parent (str): The parent resource to list under.
+            interval (~.polling.AdaptiveInterval): Paces the polls.
+                Defaults to an interval between one second and one
+                minute.
+
+            retry (google.api_core.retry.Retry): Designation of what errors, if any,
+                should be retried.
+            timeout (float): The timeout for each request.
+            metadata (Sequence[Tuple[str, str]]): Strings which should be
+                sent along with each request as metadata.
+
+        Returns:
+            Iterator[~.polling.ResourceChanges]:
+                The changes, one entry per poll that observed any. The
+                iterator does not end by itself; stop consuming it to stop
+                watching.
+
+        Raises:
+            ValueError: If ``method`` is not one of the methods above.
+        """
+        if method not in self._WATCHABLE_METHODS:
+            raise ValueError("Cannot watch {!r}.".format(method))
+        list_method = getattr(self, method)
+
+        def poll():
+            return list(
+                list_method(
+                    parent=parent, retry=retry, timeout=timeout, metadata=metadata,
+                )
+            )
+
+        return polling.watch(poll, interval)
+
+    def bulk_create_assignments(
+        self,
+        assignments: Iterable[Tuple[str, reservation.Assignment]],
+        *,
+        max_workers: int = 8,
+        concurrency: bulk.AdaptiveConcurrency = None,
+        ordered: bool = True,
+        retry: retries.Retry = gapic_v1.method.DEFAULT,
+        timeout: float = None,
+        metadata: Sequence[Tuple[str, str]] = (),
+    ) -> Iterator[bulk.BulkResult]:
+        r"""Creates many assignments concurrently.
+
+        One ``create_assignment`` call is made per pair, on a bounded pool of threads,
+        with at most ``max_workers`` calls in flight. Pairs are drawn from
+        ``assignments`` lazily. A failed call is reported in its result
+        and does not stop the others.
+
+        Args:
+            assignments (Iterable[Tuple[str, ~.reservation.Assignment]]):
+                The ``(parent, assignment)`` pairs to create, where
+                ``parent`` is the name of the reservation.
+            max_workers (int): The number of calls in flight at once.
+            concurrency (Optional[~.bulk.AdaptiveConcurrency]): If set,
+                its adaptive limit replaces ``max_workers``.
+            ordered (bool): If true, results are yielded in the order of
+                ``assignments``, each as soon as it and every earlier one
+                completed. Otherwise they are yielded as they complete.
+
+            retry (google.api_core.retry.Retry): Designation of what errors, if any,
+                should be retried.
+            timeout (float): The timeout for each request.
+            metadata (Sequence[Tuple[str, str]]): Strings which should be
+                sent along with each request as metadata.
+
+        Returns:
+            Iterator[bulk.BulkResult]:
+                One result per pair, holding either the created
+                assignment or the error raised by its call.
+        """
+
+        def create(item):
+            parent, assignment = item
+            return self.create_assignment(
+                parent=parent,
+                assignment=assignment,
+                retry=retry,
+                timeout=timeout,
+                metadata=metadata,
+            )
+
+        return bulk.run(
+            create,
+            assignments,
+            max_workers=max_workers,
+            ordered=ordered,
+            concurrency=concurrency,
+        )
+
+    @classmethod
+    def _assignment_reservation(cls, name: str) -> str:
+        segments = cls.parse_assignment_path(name)
+        if not segments:
+            raise ValueError("Invalid assignment name: {!r}".format(name))
+        return cls.reservation_path(
+            segments["project"], segments["location"], segments["reservation"]
+        )
+
+    def bulk_delete_assignments(
+        self,
+        names: Iterable[str],
+        *,
+        max_workers: int = 8,
+        concurrency: bulk.AdaptiveConcurrency = None,
+        retry: retries.Retry = gapic_v1.method.DEFAULT,
+        timeout: float = None,
+        metadata: Sequence[Tuple[str, str]] = (),
+    ) -> Dict[str, List[bulk.BulkResult]]:
+        r"""Deletes many assignments concurrently.
+
+        One ``delete_assignment`` call is made per name, with at most
+        ``max_workers`` calls in flight. A failed call is reported in its
+        result and does not stop the others.
+
+        Args:
+            names (Iterable[str]): The names of the assignments to delete.
+            max_workers (int): The number of calls in flight at once.
+            concurrency (Optional[~.bulk.AdaptiveConcurrency]): If set,
+                its adaptive limit replaces ``max_workers``.
+
+            retry (google.api_core.retry.Retry): Designation of what errors, if any,
+                should be retried.
+            timeout (float): The timeout for each request.
+            metadata (Sequence[Tuple[str, str]]): Strings which should be
+                sent along with each request as metadata.
+
+        Returns:
+            Dict[str, List[~.bulk.BulkResult]]:
+                The result of each call, grouped by the name of the
+                reservation the assignment belonged to.
+
+        Raises:
+            ValueError: If a name is not an assignment name; no call is
+                made in that case.
+        """
+        names = list(names)
+        reservations = [self._assignment_reservation(name) for name in names]
+
+        def delete(name):
+            return self.delete_assignment(
+                name=name, retry=retry, timeout=timeout, metadata=metadata,
+            )
+
+        results = bulk.run(
+            delete, names, max_workers=max_workers, concurrency=concurrency
+        )
+        return bulk.group(results, lambda result: reservations[result.index])
+
+    def bulk_move_assignments(
+        self,
+        names: Iterable[str],
+        destination_id: str,
+        *,
+        max_workers: int = 8,
+        concurrency: bulk.AdaptiveConcurrency = None,
+        retry: retries.Retry = gapic_v1.method.DEFAULT,
+        timeout: float = None,
+        metadata: Sequence[Tuple[str, str]] = (),
+    ) -> Dict[str, List[bulk.BulkResult]]:
+        r"""Moves many assignments to another reservation concurrently.
+
+        One ``move_assignment`` call is made per name, with at most
+        ``max_workers`` calls in flight. A failed call is reported in its
+        result and does not stop the others.
+
+        Args:
+            names (Iterable[str]): The names of the assignments to move.
+            destination_id (str): The name of the reservation to move
+                them to.
+            max_workers (int): The number of calls in flight at once.
+            concurrency (Optional[~.bulk.AdaptiveConcurrency]): If set,
+                its adaptive limit replaces ``max_workers``.
+
+            retry (google.api_core.retry.Retry): Designation of what errors, if any,
+                should be retried.
+            timeout (float): The timeout for each request.
+            metadata (Sequence[Tuple[str, str]]): Strings which should be
+                sent along with each request as metadata.
+
+        Returns:
+            Dict[str, List[~.bulk.BulkResult]]:
+                The result of each call, holding the moved assignment or
+                the error raised, grouped by the name of the reservation
+                the assignment was moved from.
+
+        Raises:
+            ValueError: If a name is not an assignment name; no call is
+                made in that case.
+        """
+        names = list(names)
+        reservations = [self._assignment_reservation(name) for name in names]
+
+        def move(name):
+            return self.move_assignment(
+                name=name,
+                destination_id=destination_id,
+                retry=retry,
+                timeout=timeout,
+                metadata=metadata,
+            )
+
+        results = bulk.run(
+            move, names, max_workers=max_workers, concurrency=concurrency
+        )
+        return bulk.group(results, lambda result: reservations[result.index])
+
+    def update_reservation_if_changed(
+        self,
+        current: gcbr_reservation.Reservation,
+        desired: gcbr_reservation.Reservation,
+        *,
+        retry: retries.Retry = gapic_v1.method.DEFAULT,
+        timeout: float = None,
+        metadata: Sequence[Tuple[str, str]] = (),
+    ) -> gcbr_reservation.Reservation:
+        r"""Updates a reservation only if it differs from its current state.
+
+        The update mask names only the updatable fields that differ
+        between ``current`` and ``desired``. When none differ, no call is
+        made and ``current`` is returned.
+
+        Args:
+            current (~.gcbr_reservation.Reservation):
+                The resource as it is, e.g. as returned by
+                ``get_reservation``.
+            desired (~.gcbr_reservation.Reservation):
+                The resource as it should be.
+
+            retry (google.api_core.retry.Retry): Designation of what errors, if any,
+                should be retried.
+            timeout (float): The timeout for this request.
+            metadata (Sequence[Tuple[str, str]]): Strings which should be
+                sent along with the request as metadata.
+
+        Returns:
+            ~.gcbr_reservation.Reservation:
+                The updated resource, or ``current`` if nothing needed
+                updating.
+        """
+        update_mask = masks.minimal_field_mask(current, desired)
+        if not update_mask.paths:
+            return current
+        return self.update_reservation(
+            reservation=desired,
+            update_mask=update_mask,
+            retry=retry,
+            timeout=timeout,
+            metadata=metadata,
+        )
+
+    def update_capacity_commitment_if_changed(
+        self,
+        current: reservation.CapacityCommitment,
+        desired: reservation.CapacityCommitment,
+        *,
+        retry: retries.Retry = gapic_v1.method.DEFAULT,
+        timeout: float = None,
+        metadata: Sequence[Tuple[str, str]] = (),
+    ) -> reservation.CapacityCommitment:
+        r"""Updates a capacity commitment only if it differs from its current state.
+
+        The update mask names only the updatable fields that differ
+        between ``current`` and ``desired``. When none differ, no call is
+        made and ``current`` is returned.
+
+        Args:
+            current (~.reservation.CapacityCommitment):
+                The resource as it is, e.g. as returned by
+                ``get_capacity_commitment``.
+            desired (~.reservation.CapacityCommitment):
+                The resource as it should be.
+
+            retry (google.api_core.retry.Retry): Designation of what errors, if any,
+                should be retried.
+            timeout (float): The timeout for this request.
+            metadata (Sequence[Tuple[str, str]]): Strings which should be
+                sent along with the request as metadata.
+
+        Returns:
+            ~.reservation.CapacityCommitment:
+                The updated resource, or ``current`` if nothing needed
+                updating.
+        """
+        update_mask = masks.minimal_field_mask(current, desired)
+        if not update_mask.paths:
+            return current
+        return self.update_capacity_commitment(
+            capacity_commitment=desired,
+            update_mask=update_mask,
+            retry=retry,
+            timeout=timeout,
+            metadata=metadata,
+        )
+
+    def update_bi_reservation_if_changed(
+        self,
+        current: reservation.BiReservation,
+        desired: reservation.BiReservation,
+        *,
+        retry: retries.Retry = gapic_v1.method.DEFAULT,
+        timeout: float = None,
+        metadata: Sequence[Tuple[str, str]] = (),
+    ) -> reservation.BiReservation:
+        r"""Updates a BI reservation only if it differs from its current state.
+
+        The update mask names only the updatable fields that differ
+        between ``current`` and ``desired``. When none differ, no call is
+        made and ``current`` is returned.
+
+        Args:
+            current (~.reservation.BiReservation):
+                The resource as it is, e.g. as returned by
+                ``get_bi_reservation``.
+            desired (~.reservation.BiReservation):
+                The resource as it should be.
+
+            retry (google.api_core.retry.Retry): Designation of what errors, if any,
+                should be retried.
+            timeout (float): The timeout for this request.
+            metadata (Sequence[Tuple[str, str]]): Strings which should be
+                sent along with the request as metadata.
+
+        Returns:
+            ~.reservation.BiReservation:
+                The updated resource, or ``current`` if nothing needed
+                updating.
+        """
+        update_mask = masks.minimal_field_mask(current, desired)
+        if not update_mask.paths:
+            return current
+        return self.update_bi_reservation(
+            bi_reservation=desired,
+            update_mask=update_mask,
+            retry=retry,
+            timeout=timeout,
+            metadata=metadata,
+        )
+
+    def warm_up(self, timeout: float = None, *, fetch_token: bool = False) -> None:
+        r"""Prepares the client for its first call.
+
+        Builds the stub of every RPC method, waits for the transport's
+        channel to connect and, optionally, fetches an access token, so
+        that cold-start latency is paid here rather than by the first
+        call.
+
+        Args:
+            timeout (float): How long to wait for the channel to connect,
+                in seconds. If ``None``, wait indefinitely.
+            fetch_token (bool): Whether to also fetch an access token.
+
+        Raises:
+            google.api_core.exceptions.DeadlineExceeded: If the channel
+                did not connect within ``timeout``.
+        """
+        self._transport.warm_up(timeout, fetch_token=fetch_token)
+
 
 try:
     DEFAULT_CLIENT_INFO = gapic_v1.client_info.ClientInfo(
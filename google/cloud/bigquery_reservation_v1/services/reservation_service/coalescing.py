@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+from concurrent import futures
+import functools
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from google.api_core import exceptions  # type: ignore
+
+
+def _call_key(name: str, request: Any, kwargs: Dict[str, Any]) -> Tuple:
+    # Calls are identical when they target the same method with the same
+    # request, metadata and other per-call options, such as compression;
+    # retry and timeout settings are not compared.
+    options = sorted(
+        (option, value)
+        for option, value in kwargs.items()
+        if option not in ("metadata", "retry", "timeout")
+    )
+    return (
+        name,
+        type(request).serialize(request),
+        tuple(kwargs.get("metadata", ())),
+        tuple(options),
+    )
+
+
+def _wait_timeout(kwargs: Dict[str, Any]) -> Optional[float]:
+    # How long a caller waits for a call made by another: the deadline of
+    # its retry if it has one, otherwise its timeout.
+    for value in (
+        getattr(kwargs.get("retry"), "deadline", None),
+        kwargs.get("timeout"),
+    ):
+        if isinstance(value, (int, float)):
+            return value
+    return None
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls into a single call.
+
+    While a call for a key is in flight, further calls for the same key
+    wait for it and receive its result, or its exception, instead of
+    being made themselves. Every caller receives the same response
+    object. Safe to share across threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # type: Dict[Hashable, futures.Future]
+        self._waiting = 0
+
+    @property
+    def waiting(self) -> int:
+        """The number of callers waiting for a call made by another."""
+        with self._lock:
+            return self._waiting
+
+    def do(self, key: Hashable, func: Callable[[], Any], timeout: float = None) -> Any:
+        """Call ``func``, unless a call for ``key`` is already in flight.
+
+        Args:
+            key (Hashable): Identifies calls that are interchangeable.
+            func (Callable[[], Any]): Makes the call.
+            timeout (float): How long to wait for a call already in
+                flight, in seconds. If ``None``, wait until it completes.
+
+        Returns:
+            Any: The result of the call made for ``key``.
+
+        Raises:
+            google.api_core.exceptions.DeadlineExceeded: If the call in
+                flight did not complete within ``timeout``.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = futures.Future()
+            else:
+                self._waiting += 1
+        if not leader:
+            try:
+                return future.result(timeout)
+            except futures.TimeoutError:
+                raise exceptions.DeadlineExceeded(
+                    "The call in flight did not complete within {}s.".format(timeout)
+                )
+            finally:
+                with self._lock:
+                    self._waiting -= 1
+
+        try:
+            result = func()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def wrap(self, name: str, method: Callable[..., Any]) -> Callable[..., Any]:
+        """Wrap an RPC method so that identical concurrent calls are coalesced.
+
+        Args:
+            name (str): The name of the method, used as part of the key.
+            method (Callable): The wrapped RPC method.
+        """
+
+        def wrapped(request, **kwargs):
+            return self.do(
+                _call_key(name, request, kwargs),
+                functools.partial(method, request, **kwargs),
+                _wait_timeout(kwargs),
+            )
+
+        return wrapped
+
+
+class AsyncSingleFlight:
+    """Coalesces concurrent identical calls into a single call.
+
+    The asyncio counterpart of :class:`SingleFlight`. The shared call runs
+    in its own task, so a caller that is cancelled does not cancel it for
+    the others.
+    """
+
+    def __init__(self):
+        self._calls = {}  # type: Dict[Hashable, asyncio.Future]
+
+    async def do(
+        self, key: Hashable, func: Callable[[], Awaitable[Any]], timeout: float = None
+    ) -> Any:
+        """Await ``func()``, unless a call for ``key`` is already in flight.
+
+        Args:
+            key (Hashable): Identifies calls that are interchangeable.
+            func (Callable[[], Awaitable[Any]]): Makes the call.
+            timeout (float): How long to wait for the call, in seconds. If
+                ``None``, wait until it completes. The call itself goes on
+                for the other callers.
+
+        Returns:
+            Any: The result of the call made for ``key``.
+
+        Raises:
+            google.api_core.exceptions.DeadlineExceeded: If the call did
+                not complete within ``timeout``.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(func())
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            raise exceptions.DeadlineExceeded(
+                "The call in flight did not complete within {}s.".format(timeout)
+            )
+
+    def wrap(
+        self, name: str, method: Callable[..., Awaitable[Any]]
+    ) -> Callable[..., Awaitable[Any]]:
+        """Wrap an RPC method so that identical concurrent calls are coalesced.
+
+        Args:
+            name (str): The name of the method, used as part of the key.
+            method (Callable): The wrapped RPC method.
+        """
+
+        async def wrapped(request, **kwargs):
+            return await self.do(
+                _call_key(name, request, kwargs),
+                functools.partial(method, request, **kwargs),
+                _wait_timeout(kwargs),
+            )
+
+        return wrapped
+
+
+__all__ = (
+    "SingleFlight",
+    "AsyncSingleFlight",
+)
@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import collections
+import itertools
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from google.api_core import gapic_v1  # type: ignore
+from google.api_core import retry as retries  # type: ignore
+
+from google.cloud.bigquery_reservation_v1.services.reservation_service import bulk
+from google.cloud.bigquery_reservation_v1.types import reservation
+
+from .client import ReservationServiceClient
+
+
+class LayoutStep(NamedTuple):
+    """A split or merge planned by :func:`plan_layout`.
+
+    Commitments are referred to by handle: the name of an existing
+    commitment, or a placeholder such as ``$1`` for one produced by an
+    earlier step.
+
+    Attributes:
+        method (str): ``split_capacity_commitment`` or
+            ``merge_capacity_commitments``.
+        sources (Tuple[str, ...]): The handles of the commitments the step
+            consumes; one for a split.
+        outputs (Tuple[str, ...]): The handles of the commitments the step
+            produces; the ``first`` and ``second`` commitments of a split,
+            or the merged commitment.
+        slot_count (int): For a split, the slot count of the ``first``
+            commitment.
+    """
+
+    method: str
+    sources: Tuple[str, ...]
+    outputs: Tuple[str, ...]
+    slot_count: int = 0
+
+
+class LayoutPlan(NamedTuple):
+    """The splits and merges that reach a target commitment layout.
+
+    Attributes:
+        parent (str): The admin project and location of the commitments.
+        steps (Tuple[~.LayoutStep, ...]): The planned steps; a step only
+            consumes commitments produced by steps before it.
+    """
+
+    parent: str
+    steps: Tuple[LayoutStep, ...] = ()
+
+    def waves(self) -> List[List[LayoutStep]]:
+        """Split the steps into waves that may each run in parallel.
+
+        Returns:
+            List[List[~.LayoutStep]]: The waves, in the order they must run.
+        """
+        wave_of = {}  # type: Dict[str, int]
+        waves = []  # type: List[List[LayoutStep]]
+        for step in self.steps:
+            wave = max((wave_of.get(source, -1) + 1 for source in step.sources))
+            if wave == len(waves):
+                waves.append([])
+            waves[wave].append(step)
+            for output in step.outputs:
+                wave_of[output] = wave
+        return waves
+
+
+class LayoutResult(NamedTuple):
+    """The outcome of applying a :class:`LayoutPlan`.
+
+    Attributes:
+        results (Tuple[~.bulk.BulkResult, ...]): The result of each step
+            that ran; the item of each result is its :class:`LayoutStep`.
+        skipped (Tuple[~.LayoutStep, ...]): The steps that did not run
+            because an earlier wave had failures.
+        names (Mapping[str, str]): The commitment name each handle
+            resolved to.
+    """
+
+    results: Tuple[bulk.BulkResult, ...] = ()
+    skipped: Tuple[LayoutStep, ...] = ()
+    names: Mapping[str, str] = {}
+
+    @property
+    def ok(self) -> bool:
+        """Whether every planned step ran and succeeded."""
+        return not self.skipped and all(result.ok for result in self.results)
+
+
+def _find_subset(values: Sequence[int], total: int) -> Optional[List[int]]:
+    """Return the indices of some values adding up to ``total``, if any."""
+    reachable = {0: ()}  # type: Dict[int, Tuple[int, ...]]
+    for index, value in enumerate(values):
+        for subtotal, indices in list(reachable.items()):
+            candidate = subtotal + value
+            if candidate <= total and candidate not in reachable:
+                reachable[candidate] = indices + (index,)
+        if total in reachable:
+            return list(reachable[total])
+    return None
+
+
+class _Planner:
+    def __init__(self):
+        self.steps = []  # type: List[LayoutStep]
+        self._handles = itertools.count(1)
+
+    def _new_handle(self) -> str:
+        return "${}".format(next(self._handles))
+
+    def merge(self, sources: Sequence[str]) -> str:
+        if len(sources) == 1:
+            return sources[0]
+        output = self._new_handle()
+        self.steps.append(
+            LayoutStep("merge_capacity_commitments", tuple(sources), (output,))
+        )
+        return output
+
+    def split(self, source: str, sizes: Sequence[int]) -> None:
+        # Halving the sizes at each split lets both halves proceed in
+        # parallel, so n pieces take n - 1 splits in log2(n) waves.
+        if len(sizes) == 1:
+            return
+        middle = len(sizes) // 2
+        first, second = self._new_handle(), self._new_handle()
+        self.steps.append(
+            LayoutStep(
+                "split_capacity_commitment",
+                (source,),
+                (first, second),
+                slot_count=sum(sizes[:middle]),
+            )
+        )
+        self.split(first, sizes[:middle])
+        self.split(second, sizes[middle:])
+
+    def plan(self, current: Dict[str, int], target: List[int]) -> None:
+        current = dict(current)
+        target = sorted(target, reverse=True)
+
+        # Commitments that already have a target size are left alone.
+        for size in list(target):
+            match = next((n for n, s in current.items() if s == size), None)
+            if match is not None:
+                del current[match]
+                target.remove(size)
+
+        # A commitment that adds up to several target sizes is split.
+        for name, size in sorted(current.items(), key=lambda item: -item[1]):
+            indices = _find_subset(target, size)
+            if indices:
+                self.split(name, [target[i] for i in indices])
+                del current[name]
+                target = [s for i, s in enumerate(target) if i not in indices]
+
+        # Commitments that add up to a target size are merged.
+        for size in list(target):
+            names = list(current)
+            indices = _find_subset([current[n] for n in names], size)
+            if indices:
+                self.merge([names[i] for i in indices])
+                for i in indices:
+                    del current[names[i]]
+                target.remove(size)
+
+        # Whatever is left is merged into one commitment and split again.
+        if current:
+            self.split(self.merge(sorted(current)), target)
+
+
+def plan_layout(
+    commitments: Iterable[reservation.CapacityCommitment],
+    target: Mapping[reservation.CapacityCommitment.CommitmentPlan, Sequence[int]],
+) -> LayoutPlan:
+    """Plan the splits and merges that reach a target commitment layout.
+
+    Only active commitments can be split or merged, and only commitments
+    of the same plan can be merged, so the active commitments of each
+    plan in ``target`` are rearranged among themselves. Commitments that
+    already have a target size are left untouched. The rest are grouped
+    greedily, largest first: a commitment whose size adds up to several
+    target sizes is split, commitments that add up to a target size are
+    merged, and whatever is left is merged and split again. This is a
+    heuristic; it keeps the number of splits and merges low but does not
+    guarantee the fewest possible, as finding those is NP-hard. A merged
+    commitment takes the latest ``commitment_end_time`` of the merged
+    ones.
+
+    Args:
+        commitments (Iterable[~.reservation.CapacityCommitment]): The
+            current commitments of one admin project and location.
+        target (Mapping[~.reservation.CapacityCommitment.CommitmentPlan, Sequence]):
+            The slot counts the active commitments of each plan should
+            have.
+
+    Returns:
+        ~.LayoutPlan: The planned steps.
+
+    Raises:
+        ValueError: If the commitments span several admin projects or
+            locations, or if the target slot counts of a plan do not add
+            up to the slots of its active commitments.
+    """
+    by_plan = collections.defaultdict(dict)  # type: Dict[int, Dict[str, int]]
+    parents = set()
+    for commitment in commitments:
+        parents.add(commitment.name.rsplit("/capacityCommitments/", 1)[0])
+        if commitment.state == reservation.CapacityCommitment.State.ACTIVE:
+            by_plan[commitment.plan][commitment.name] = commitment.slot_count
+    if len(parents) > 1:
+        raise ValueError("Commitments of several admin projects or locations.")
+
+    planner = _Planner()
+    for plan, sizes in target.items():
+        current = by_plan.get(plan, {})
+        if any(size <= 0 for size in sizes):
+            raise ValueError("Slot counts must be positive.")
+        if sum(sizes) != sum(current.values()):
+            raise ValueError(
+                "The {} target adds up to {} slots, but its active commitments "
+                "hold {}.".format(
+                    reservation.CapacityCommitment.CommitmentPlan(plan).name,
+                    sum(sizes),
+                    sum(current.values()),
+                )
+            )
+        planner.plan(current, list(sizes))
+    return LayoutPlan(parents.pop() if parents else "", tuple(planner.steps))
+
+
+def apply_layout(
+    client: ReservationServiceClient,
+    plan: LayoutPlan,
+    *,
+    max_workers: int = 8,
+    retry: retries.Retry = gapic_v1.method.DEFAULT,
+    timeout: float = None,
+    metadata: Sequence[Tuple[str, str]] = (),
+) -> LayoutResult:
+    """Make the splits and merges of ``plan``, one wave at a time.
+
+    The steps of a wave run in parallel. If any of them fails, the wave
+    is completed but the following waves are skipped.
+
+    Args:
+        client (~.ReservationServiceClient): The client to call with.
+        plan (~.LayoutPlan): The plan to apply.
+        max_workers (int): The number of calls in flight at once.
+
+        retry (google.api_core.retry.Retry): Designation of what errors, if any,
+            should be retried.
+        timeout (float): The timeout for each request.
+        metadata (Sequence[Tuple[str, str]]): Strings which should be
+            sent along with each request as metadata.
+
+    Returns:
+        ~.LayoutResult: The outcome of each step.
+    """
+    names = {}  # type: Dict[str, str]
+
+    def resolve(handle):
+        return names.get(handle, handle)
+
+    def call(step):
+        options = dict(retry=retry, timeout=timeout, metadata=metadata)
+        if step.method == "split_capacity_commitment":
+            response = client.split_capacity_commitment(
+                name=resolve(step.sources[0]), slot_count=step.slot_count, **options
+            )
+            produced = (response.first.name, response.second.name)
+        else:
+            response = client.merge_capacity_commitments(
+                parent=plan.parent,
+                capacity_commitment_ids=[
+                    resolve(source).rsplit("/", 1)[1] for source in step.sources
+                ],
+                **options,
+            )
+            produced = (response.name,)
+        names.update(zip(step.outputs, produced))
+        return response
+
+    results = []  # type: List[bulk.BulkResult]
+    waves = plan.waves()
+    for position, wave in enumerate(waves):
+        wave_results = list(bulk.run(call, wave, max_workers=max_workers))
+        results.extend(wave_results)
+        if not all(result.ok for result in wave_results):
+            skipped = [step for later in waves[position + 1 :] for step in later]
+            return LayoutResult(tuple(results), tuple(skipped), names)
+    return LayoutResult(tuple(results), names=names)
+
+
+__all__ = (
+    "LayoutPlan",
+    "LayoutResult",
+    "LayoutStep",
+    "apply_layout",
+    "plan_layout",
+)
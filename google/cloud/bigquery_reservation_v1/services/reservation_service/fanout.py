@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+from concurrent import futures
+import queue
+import threading
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    Iterator,
+    NamedTuple,
+)
+
+# The number of items buffered between the listing workers and the consumer.
+_BUFFER_SIZE = 1024
+
+# How long a worker waits on a full buffer before re-checking whether the
+# consumer has gone away.
+_POLL_INTERVAL = 0.1
+
+_DONE = object()
+
+
+class FanOutResult(NamedTuple):
+    """An item produced by a fanned-out listing.
+
+    Attributes:
+        parent (str): The parent resource the item was listed under.
+        item (Any): The listed resource.
+    """
+
+    parent: str
+    item: Any
+
+
+def fan_out(
+    list_parent: Callable[[str], Iterable[Any]],
+    parents: Iterable[str],
+    max_workers: int = 8,
+) -> Iterator[FanOutResult]:
+    """Walk the listings of several parents concurrently.
+
+    Args:
+        list_parent (Callable[[str], Iterable]): Returns an iterable, such
+            as a pager, over the resources under the given parent.
+        parents (Iterable[str]): The parents to list.
+        max_workers (int): The number of listings walked at once.
+
+    Returns:
+        Iterator[FanOutResult]: The items of all listings, merged in the
+            order they arrive and tagged with their parent. The first error
+            raised by a listing is re-raised and stops the others.
+    """
+    parents = list(parents)
+    results = queue.Queue(maxsize=_BUFFER_SIZE)
+    stop = threading.Event()
+
+    def put(entry):
+        while not stop.is_set():
+            try:
+                results.put(entry, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def walk(parent):
+        if stop.is_set():
+            return
+        try:
+            for item in list_parent(parent):
+                if not put((FanOutResult(parent, item), None)):
+                    return
+        except Exception as exc:
+            put((None, exc))
+        else:
+            put((_DONE, None))
+
+    executor = futures.ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        for parent in parents:
+            executor.submit(walk, parent)
+        remaining = len(parents)
+        while remaining:
+            result, exc = results.get()
+            if exc is not None:
+                raise exc
+            if result is _DONE:
+                remaining -= 1
+                continue
+            yield result
+    finally:
+        stop.set()
+        executor.shutdown(wait=False)
+
+
+async def fan_out_async(
+    list_parent: Callable[[str], Awaitable[AsyncIterable[Any]]],
+    parents: Iterable[str],
+    max_concurrency: int = 8,
+) -> AsyncIterator[FanOutResult]:
+    """Walk the listings of several parents concurrently.
+
+    Args:
+        list_parent (Callable[[str], Awaitable[AsyncIterable]]): Resolves
+            to an async iterable, such as an async pager, over the
+            resources under the given parent.
+        parents (Iterable[str]): The parents to list.
+        max_concurrency (int): The number of listings walked at once.
+
+    Returns:
+        AsyncIterator[FanOutResult]: The items of all listings, merged in
+            the order they arrive and tagged with their parent. The first
+            error raised by a listing is re-raised and cancels the others.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    results = asyncio.Queue(maxsize=_BUFFER_SIZE)
+
+    async def walk(parent):
+        async with semaphore:
+            try:
+                async for item in await list_parent(parent):
+                    await results.put((FanOutResult(parent, item), None))
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                await results.put((None, exc))
+                return
+        await results.put((_DONE, None))
+
+    tasks = [asyncio.ensure_future(walk(parent)) for parent in parents]
+    try:
+        remaining = len(tasks)
+        while remaining:
+            result, exc = await results.get()
+            if exc is not None:
+                raise exc
+            if result is _DONE:
+                remaining -= 1
+                continue
+            yield result
+    finally:
+        # Wait for the walks to stop, so that none is destroyed pending.
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+__all__ = (
+    "FanOutResult",
+    "fan_out",
+    "fan_out_async",
+)
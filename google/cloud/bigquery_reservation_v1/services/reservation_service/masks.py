@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from typing import Dict, Tuple, Type
+
+from google.api_core import protobuf_helpers  # type: ignore
+import proto  # type: ignore
+
+from google.cloud.bigquery_reservation_v1.types import reservation
+from google.protobuf import field_mask_pb2 as field_mask  # type: ignore
+
+# The fields an update call may change, per resource type. The others are
+# either output only or immutable.
+UPDATABLE_FIELDS = {
+    reservation.Reservation: ("slot_capacity", "ignore_idle_slots"),
+    reservation.CapacityCommitment: ("plan", "renewal_plan"),
+    reservation.BiReservation: ("size",),
+}  # type: Dict[Type[proto.Message], Tuple[str, ...]]
+
+
+def minimal_field_mask(
+    current: proto.Message, desired: proto.Message
+) -> field_mask.FieldMask:
+    """Return the update mask that turns ``current`` into ``desired``.
+
+    Only the updatable fields that differ between the two resources are
+    named, so an update with this mask leaves every other field, including
+    ones changed concurrently by someone else, untouched.
+
+    Args:
+        current (proto.Message): The resource as it is; a reservation,
+            capacity commitment or BI reservation.
+        desired (proto.Message): The resource as it should be, of the same
+            type as ``current``.
+
+    Returns:
+        ~.field_mask.FieldMask: The mask. It is empty when there is
+            nothing to update.
+
+    Raises:
+        ValueError: If the resources are of different or unsupported types.
+    """
+    if type(current) is not type(desired):
+        raise ValueError(
+            "Cannot compare a {} with a {}.".format(
+                type(current).__name__, type(desired).__name__
+            )
+        )
+    updatable = UPDATABLE_FIELDS.get(type(desired))
+    if updatable is None:
+        raise ValueError("Cannot update a {}.".format(type(desired).__name__))
+    changed = protobuf_helpers.field_mask(
+        type(current).pb(current), type(desired).pb(desired)
+    )
+    return field_mask.FieldMask(
+        paths=[path for path in changed.paths if path.split(".")[0] in updatable]
+    )
+
+
+__all__ = (
+    "UPDATABLE_FIELDS",
+    "minimal_field_mask",
+)
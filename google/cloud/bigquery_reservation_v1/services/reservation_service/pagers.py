@@ -15,10 +15,140 @@
 # limitations under the License.
 #
 
-from typing import Any, AsyncIterable, Awaitable, Callable, Iterable, Sequence, Tuple
+import asyncio
+import functools
+import itertools
+import queue
+import threading
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Sequence,
+    Tuple,
+)
+
+from google.api_core import retry as retries  # type: ignore
+from google.api_core import retry_async  # type: ignore
 
 from google.cloud.bigquery_reservation_v1.types import reservation
 
+# How long a prefetch worker waits on a full buffer before re-checking
+# whether the consumer has gone away.
+_PREFETCH_POLL_INTERVAL = 0.1
+
+_DONE = object()
+
+
+class PagerCheckpoint(NamedTuple):
+    """A position within a paged listing from which iteration can resume.
+
+    Attributes:
+        page_token (str): The token the page being consumed was requested
+            with; empty for the first page.
+        offset (int): The number of items of that page already consumed.
+    """
+
+    page_token: str
+    offset: int = 0
+
+
+def _prefetch_pages(
+    fetch: Callable[[str], Any], page_token: str, depth: int
+) -> Iterator[Any]:
+    """Yield the pages following ``page_token``, fetched on a worker thread.
+
+    At most ``depth`` pages are buffered ahead of the consumer. The worker
+    stops as soon as the consumer abandons the iteration, and an error
+    raised by ``fetch`` is re-raised in the consumer once the pages
+    preceding it have been yielded.
+    """
+    buffer = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=_PREFETCH_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def worker():
+        token = page_token
+        try:
+            while token and not stop.is_set():
+                page = fetch(token)
+                if not put((page, None)):
+                    return
+                token = page.next_page_token
+        except Exception as exc:
+            put((None, exc))
+        else:
+            put((_DONE, None))
+
+    threading.Thread(target=worker, daemon=True).start()
+    try:
+        while True:
+            page, exc = buffer.get()
+            if exc is not None:
+                raise exc
+            if page is _DONE:
+                return
+            yield page
+    finally:
+        stop.set()
+
+
+async def _prefetch_pages_async(
+    fetch: Callable[[str], Awaitable[Any]], page_token: str, depth: int
+) -> AsyncIterator[Any]:
+    """Yield the pages following ``page_token``, fetched in a separate task.
+
+    The fetching task feeds a queue holding at most ``depth`` pages, so
+    the consumer's per-item work overlaps with the next request while
+    backpressure still bounds the pages in flight. The task is cancelled
+    when the consumer abandons the iteration.
+    """
+    buffer = asyncio.Queue(maxsize=depth)
+
+    async def worker():
+        token = page_token
+        try:
+            while token:
+                page = await fetch(token)
+                await buffer.put((page, None))
+                token = page.next_page_token
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            await buffer.put((None, exc))
+        else:
+            await buffer.put((_DONE, None))
+
+    task = asyncio.ensure_future(worker())
+    try:
+        while True:
+            page, exc = await buffer.get()
+            if exc is not None:
+                raise exc
+            if page is _DONE:
+                return
+            yield page
+    finally:
+        # Wait for the task to stop, so that it is not destroyed pending.
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
 
 class ListReservationsPager:
     """A pager for iterating through ``list_reservations`` requests.
@@ -44,7 +174,10 @@ class ListReservationsPager:
         request: reservation.ListReservationsRequest,
         response: reservation.ListReservationsResponse,
         *,
-        metadata: Sequence[Tuple[str, str]] = ()
+        metadata: Sequence[Tuple[str, str]] = (),
+        prefetch: int = 0,
+        checkpoint: PagerCheckpoint = None,
+        page_retry: retries.Retry = None
     ):
         """Instantiate the pager.
 
@@ -57,26 +190,73 @@ class ListReservationsPager:
                 The initial response object.
             metadata (Sequence[Tuple[str, str]]): Strings which should be
                 sent along with the request as metadata.
+            prefetch (int): The number of pages to fetch ahead of the
+                consumer on a background thread. If ``0`` (the default),
+                each page is requested only once the previous one has
+                been consumed.
+            checkpoint (Optional[PagerCheckpoint]): The position the
+                initial response was requested from. Items of the initial
+                page before ``checkpoint.offset`` are skipped.
+            page_retry (Optional[google.api_core.retry.Retry]):
+                Designation of how the fetch of a page after the first
+                should be retried once the retry of the wrapped ``method``
+                has been exhausted. The failed page is fetched again,
+                rather than the listing being restarted.
         """
         self._method = method
         self._request = reservation.ListReservationsRequest(request)
         self._response = response
         self._metadata = metadata
+        self._prefetch = prefetch
+        self._checkpoint = checkpoint or PagerCheckpoint(self._request.page_token)
+        self._page_retry = page_retry
 
     def __getattr__(self, name: str) -> Any:
         return getattr(self._response, name)
 
+    @property
+    def checkpoint(self) -> PagerCheckpoint:
+        """The position of the last consumed item.
+
+        Pass this to the originating method as ``checkpoint`` to resume
+        the listing after a failure without starting over.
+        """
+        return self._checkpoint
+
+    def _fetch_page(self, page_token: str) -> reservation.ListReservationsResponse:
+        self._request.page_token = page_token
+        fetch = functools.partial(self._method, self._request, metadata=self._metadata)
+        if self._page_retry is not None:
+            fetch = self._page_retry(fetch)
+        return fetch()
+
     @property
     def pages(self) -> Iterable[reservation.ListReservationsResponse]:
         yield self._response
-        while self._response.next_page_token:
-            self._request.page_token = self._response.next_page_token
-            self._response = self._method(self._request, metadata=self._metadata)
-            yield self._response
+        prefetched = None
+        if self._prefetch > 0:
+            prefetched = _prefetch_pages(
+                self._fetch_page, self._response.next_page_token, self._prefetch
+            )
+        try:
+            while self._response.next_page_token:
+                self._checkpoint = PagerCheckpoint(self._response.next_page_token)
+                if prefetched is not None:
+                    self._response = next(prefetched)
+                else:
+                    self._response = self._fetch_page(self._checkpoint.page_token)
+                yield self._response
+        finally:
+            if prefetched is not None:
+                prefetched.close()
 
     def __iter__(self) -> Iterable[reservation.Reservation]:
         for page in self.pages:
-            yield from page.reservations
+            skip = self._checkpoint.offset
+            items = itertools.islice(page.reservations, skip, None)
+            for offset, item in enumerate(items, start=skip + 1):
+                self._checkpoint = self._checkpoint._replace(offset=offset)
+                yield item
 
     def __repr__(self) -> str:
         return "{0}<{1!r}>".format(self.__class__.__name__, self._response)
@@ -106,7 +286,10 @@ class ListReservationsAsyncPager:
         request: reservation.ListReservationsRequest,
         response: reservation.ListReservationsResponse,
         *,
-        metadata: Sequence[Tuple[str, str]] = ()
+        metadata: Sequence[Tuple[str, str]] = (),
+        prefetch: int = 0,
+        checkpoint: PagerCheckpoint = None,
+        page_retry: retry_async.AsyncRetry = None
     ):
         """Instantiate the pager.
 
@@ -119,27 +302,75 @@ class ListReservationsAsyncPager:
                 The initial response object.
             metadata (Sequence[Tuple[str, str]]): Strings which should be
                 sent along with the request as metadata.
+            prefetch (int): The number of pages to fetch ahead of the
+                consumer in a separate task. If ``0`` (the default),
+                each page is requested only once the previous one has
+                been consumed.
+            checkpoint (Optional[PagerCheckpoint]): The position the
+                initial response was requested from. Items of the initial
+                page before ``checkpoint.offset`` are skipped.
+            page_retry (Optional[google.api_core.retry_async.AsyncRetry]):
+                Designation of how the fetch of a page after the first
+                should be retried once the retry of the wrapped ``method``
+                has been exhausted. The failed page is fetched again,
+                rather than the listing being restarted.
         """
         self._method = method
         self._request = reservation.ListReservationsRequest(request)
         self._response = response
         self._metadata = metadata
+        self._prefetch = prefetch
+        self._checkpoint = checkpoint or PagerCheckpoint(self._request.page_token)
+        self._page_retry = page_retry
 
     def __getattr__(self, name: str) -> Any:
         return getattr(self._response, name)
 
+    @property
+    def checkpoint(self) -> PagerCheckpoint:
+        """The position of the last consumed item.
+
+        Pass this to the originating method as ``checkpoint`` to resume
+        the listing after a failure without starting over.
+        """
+        return self._checkpoint
+
+    async def _fetch_page(
+        self, page_token: str
+    ) -> reservation.ListReservationsResponse:
+        self._request.page_token = page_token
+        fetch = functools.partial(self._method, self._request, metadata=self._metadata)
+        if self._page_retry is not None:
+            fetch = self._page_retry(fetch)
+        return await fetch()
+
     @property
     async def pages(self) -> AsyncIterable[reservation.ListReservationsResponse]:
         yield self._response
-        while self._response.next_page_token:
-            self._request.page_token = self._response.next_page_token
-            self._response = await self._method(self._request, metadata=self._metadata)
-            yield self._response
+        prefetched = None
+        if self._prefetch > 0:
+            prefetched = _prefetch_pages_async(
+                self._fetch_page, self._response.next_page_token, self._prefetch
+            )
+        try:
+            while self._response.next_page_token:
+                self._checkpoint = PagerCheckpoint(self._response.next_page_token)
+                if prefetched is not None:
+                    self._response = await prefetched.__anext__()
+                else:
+                    self._response = await self._fetch_page(self._checkpoint.page_token)
+                yield self._response
+        finally:
+            if prefetched is not None:
+                await prefetched.aclose()
 
     def __aiter__(self) -> AsyncIterable[reservation.Reservation]:
         async def async_generator():
             async for page in self.pages:
-                for response in page.reservations:
+                skip = self._checkpoint.offset
+                responses = itertools.islice(page.reservations, skip, None)
+                for offset, response in enumerate(responses, start=skip + 1):
+                    self._checkpoint = self._checkpoint._replace(offset=offset)
                     yield response
 
         return async_generator()
@@ -172,7 +403,10 @@ class ListCapacityCommitmentsPager:
         request: reservation.ListCapacityCommitmentsRequest,
         response: reservation.ListCapacityCommitmentsResponse,
         *,
-        metadata: Sequence[Tuple[str, str]] = ()
+        metadata: Sequence[Tuple[str, str]] = (),
+        prefetch: int = 0,
+        checkpoint: PagerCheckpoint = None,
+        page_retry: retries.Retry = None
     ):
         """Instantiate the pager.
 
@@ -185,26 +419,75 @@ class ListCapacityCommitmentsPager:
                 The initial response object.
             metadata (Sequence[Tuple[str, str]]): Strings which should be
                 sent along with the request as metadata.
+            prefetch (int): The number of pages to fetch ahead of the
+                consumer on a background thread. If ``0`` (the default),
+                each page is requested only once the previous one has
+                been consumed.
+            checkpoint (Optional[PagerCheckpoint]): The position the
+                initial response was requested from. Items of the initial
+                page before ``checkpoint.offset`` are skipped.
+            page_retry (Optional[google.api_core.retry.Retry]):
+                Designation of how the fetch of a page after the first
+                should be retried once the retry of the wrapped ``method``
+                has been exhausted. The failed page is fetched again,
+                rather than the listing being restarted.
         """
         self._method = method
         self._request = reservation.ListCapacityCommitmentsRequest(request)
         self._response = response
         self._metadata = metadata
+        self._prefetch = prefetch
+        self._checkpoint = checkpoint or PagerCheckpoint(self._request.page_token)
+        self._page_retry = page_retry
 
     def __getattr__(self, name: str) -> Any:
         return getattr(self._response, name)
 
+    @property
+    def checkpoint(self) -> PagerCheckpoint:
+        """The position of the last consumed item.
+
+        Pass this to the originating method as ``checkpoint`` to resume
+        the listing after a failure without starting over.
+        """
+        return self._checkpoint
+
+    def _fetch_page(
+        self, page_token: str
+    ) -> reservation.ListCapacityCommitmentsResponse:
+        self._request.page_token = page_token
+        fetch = functools.partial(self._method, self._request, metadata=self._metadata)
+        if self._page_retry is not None:
+            fetch = self._page_retry(fetch)
+        return fetch()
+
     @property
     def pages(self) -> Iterable[reservation.ListCapacityCommitmentsResponse]:
         yield self._response
-        while self._response.next_page_token:
-            self._request.page_token = self._response.next_page_token
-            self._response = self._method(self._request, metadata=self._metadata)
-            yield self._response
+        prefetched = None
+        if self._prefetch > 0:
+            prefetched = _prefetch_pages(
+                self._fetch_page, self._response.next_page_token, self._prefetch
+            )
+        try:
+            while self._response.next_page_token:
+                self._checkpoint = PagerCheckpoint(self._response.next_page_token)
+                if prefetched is not None:
+                    self._response = next(prefetched)
+                else:
+                    self._response = self._fetch_page(self._checkpoint.page_token)
+                yield self._response
+        finally:
+            if prefetched is not None:
+                prefetched.close()
 
     def __iter__(self) -> Iterable[reservation.CapacityCommitment]:
         for page in self.pages:
-            yield from page.capacity_commitments
+            skip = self._checkpoint.offset
+            items = itertools.islice(page.capacity_commitments, skip, None)
+            for offset, item in enumerate(items, start=skip + 1):
+                self._checkpoint = self._checkpoint._replace(offset=offset)
+                yield item
 
     def __repr__(self) -> str:
         return "{0}<{1!r}>".format(self.__class__.__name__, self._response)
@@ -234,7 +517,10 @@ class ListCapacityCommitmentsAsyncPager:
         request: reservation.ListCapacityCommitmentsRequest,
         response: reservation.ListCapacityCommitmentsResponse,
         *,
-        metadata: Sequence[Tuple[str, str]] = ()
+        metadata: Sequence[Tuple[str, str]] = (),
+        prefetch: int = 0,
+        checkpoint: PagerCheckpoint = None,
+        page_retry: retry_async.AsyncRetry = None
     ):
         """Instantiate the pager.
 
@@ -247,27 +533,75 @@ class ListCapacityCommitmentsAsyncPager:
                 The initial response object.
             metadata (Sequence[Tuple[str, str]]): Strings which should be
                 sent along with the request as metadata.
+            prefetch (int): The number of pages to fetch ahead of the
+                consumer in a separate task. If ``0`` (the default),
+                each page is requested only once the previous one has
+                been consumed.
+            checkpoint (Optional[PagerCheckpoint]): The position the
+                initial response was requested from. Items of the initial
+                page before ``checkpoint.offset`` are skipped.
+            page_retry (Optional[google.api_core.retry_async.AsyncRetry]):
+                Designation of how the fetch of a page after the first
+                should be retried once the retry of the wrapped ``method``
+                has been exhausted. The failed page is fetched again,
+                rather than the listing being restarted.
         """
         self._method = method
         self._request = reservation.ListCapacityCommitmentsRequest(request)
         self._response = response
         self._metadata = metadata
+        self._prefetch = prefetch
+        self._checkpoint = checkpoint or PagerCheckpoint(self._request.page_token)
+        self._page_retry = page_retry
 
     def __getattr__(self, name: str) -> Any:
         return getattr(self._response, name)
 
+    @property
+    def checkpoint(self) -> PagerCheckpoint:
+        """The position of the last consumed item.
+
+        Pass this to the originating method as ``checkpoint`` to resume
+        the listing after a failure without starting over.
+        """
+        return self._checkpoint
+
+    async def _fetch_page(
+        self, page_token: str
+    ) -> reservation.ListCapacityCommitmentsResponse:
+        self._request.page_token = page_token
+        fetch = functools.partial(self._method, self._request, metadata=self._metadata)
+        if self._page_retry is not None:
+            fetch = self._page_retry(fetch)
+        return await fetch()
+
     @property
     async def pages(self) -> AsyncIterable[reservation.ListCapacityCommitmentsResponse]:
         yield self._response
-        while self._response.next_page_token:
-            self._request.page_token = self._response.next_page_token
-            self._response = await self._method(self._request, metadata=self._metadata)
-            yield self._response
+        prefetched = None
+        if self._prefetch > 0:
+            prefetched = _prefetch_pages_async(
+                self._fetch_page, self._response.next_page_token, self._prefetch
+            )
+        try:
+            while self._response.next_page_token:
+                self._checkpoint = PagerCheckpoint(self._response.next_page_token)
+                if prefetched is not None:
+                    self._response = await prefetched.__anext__()
+                else:
+                    self._response = await self._fetch_page(self._checkpoint.page_token)
+                yield self._response
+        finally:
+            if prefetched is not None:
+                await prefetched.aclose()
 
     def __aiter__(self) -> AsyncIterable[reservation.CapacityCommitment]:
         async def async_generator():
             async for page in self.pages:
-                for response in page.capacity_commitments:
+                skip = self._checkpoint.offset
+                responses = itertools.islice(page.capacity_commitments, skip, None)
+                for offset, response in enumerate(responses, start=skip + 1):
+                    self._checkpoint = self._checkpoint._replace(offset=offset)
                     yield response
 
         return async_generator()
@@ -300,7 +634,10 @@ class ListAssignmentsPager:
         request: reservation.ListAssignmentsRequest,
         response: reservation.ListAssignmentsResponse,
         *,
-        metadata: Sequence[Tuple[str, str]] = ()
+        metadata: Sequence[Tuple[str, str]] = (),
+        prefetch: int = 0,
+        checkpoint: PagerCheckpoint = None,
+        page_retry: retries.Retry = None
     ):
         """Instantiate the pager.
 
@@ -313,26 +650,73 @@ class ListAssignmentsPager:
                 The initial response object.
             metadata (Sequence[Tuple[str, str]]): Strings which should be
                 sent along with the request as metadata.
+            prefetch (int): The number of pages to fetch ahead of the
+                consumer on a background thread. If ``0`` (the default),
+                each page is requested only once the previous one has
+                been consumed.
+            checkpoint (Optional[PagerCheckpoint]): The position the
+                initial response was requested from. Items of the initial
+                page before ``checkpoint.offset`` are skipped.
+            page_retry (Optional[google.api_core.retry.Retry]):
+                Designation of how the fetch of a page after the first
+                should be retried once the retry of the wrapped ``method``
+                has been exhausted. The failed page is fetched again,
+                rather than the listing being restarted.
         """
         self._method = method
         self._request = reservation.ListAssignmentsRequest(request)
         self._response = response
         self._metadata = metadata
+        self._prefetch = prefetch
+        self._checkpoint = checkpoint or PagerCheckpoint(self._request.page_token)
+        self._page_retry = page_retry
 
     def __getattr__(self, name: str) -> Any:
         return getattr(self._response, name)
 
+    @property
+    def checkpoint(self) -> PagerCheckpoint:
+        """The position of the last consumed item.
+
+        Pass this to the originating method as ``checkpoint`` to resume
+        the listing after a failure without starting over.
+        """
+        return self._checkpoint
+
+    def _fetch_page(self, page_token: str) -> reservation.ListAssignmentsResponse:
+        self._request.page_token = page_token
+        fetch = functools.partial(self._method, self._request, metadata=self._metadata)
+        if self._page_retry is not None:
+            fetch = self._page_retry(fetch)
+        return fetch()
+
     @property
     def pages(self) -> Iterable[reservation.ListAssignmentsResponse]:
         yield self._response
-        while self._response.next_page_token:
-            self._request.page_token = self._response.next_page_token
-            self._response = self._method(self._request, metadata=self._metadata)
-            yield self._response
+        prefetched = None
+        if self._prefetch > 0:
+            prefetched = _prefetch_pages(
+                self._fetch_page, self._response.next_page_token, self._prefetch
+            )
+        try:
+            while self._response.next_page_token:
+                self._checkpoint = PagerCheckpoint(self._response.next_page_token)
+                if prefetched is not None:
+                    self._response = next(prefetched)
+                else:
+                    self._response = self._fetch_page(self._checkpoint.page_token)
+                yield self._response
+        finally:
+            if prefetched is not None:
+                prefetched.close()
 
     def __iter__(self) -> Iterable[reservation.Assignment]:
         for page in self.pages:
-            yield from page.assignments
+            skip = self._checkpoint.offset
+            items = itertools.islice(page.assignments, skip, None)
+            for offset, item in enumerate(items, start=skip + 1):
+                self._checkpoint = self._checkpoint._replace(offset=offset)
+                yield item
 
     def __repr__(self) -> str:
         return "{0}<{1!r}>".format(self.__class__.__name__, self._response)
@@ -362,7 +746,10 @@ class ListAssignmentsAsyncPager:
         request: reservation.ListAssignmentsRequest,
         response: reservation.ListAssignmentsResponse,
         *,
-        metadata: Sequence[Tuple[str, str]] = ()
+        metadata: Sequence[Tuple[str, str]] = (),
+        prefetch: int = 0,
+        checkpoint: PagerCheckpoint = None,
+        page_retry: retry_async.AsyncRetry = None
     ):
         """Instantiate the pager.
 
@@ -375,27 +762,73 @@ class ListAssignmentsAsyncPager:
                 The initial response object.
             metadata (Sequence[Tuple[str, str]]): Strings which should be
                 sent along with the request as metadata.
+            prefetch (int): The number of pages to fetch ahead of the
+                consumer in a separate task. If ``0`` (the default),
+                each page is requested only once the previous one has
+                been consumed.
+            checkpoint (Optional[PagerCheckpoint]): The position the
+                initial response was requested from. Items of the initial
+                page before ``checkpoint.offset`` are skipped.
+            page_retry (Optional[google.api_core.retry_async.AsyncRetry]):
+                Designation of how the fetch of a page after the first
+                should be retried once the retry of the wrapped ``method``
+                has been exhausted. The failed page is fetched again,
+                rather than the listing being restarted.
         """
         self._method = method
         self._request = reservation.ListAssignmentsRequest(request)
         self._response = response
         self._metadata = metadata
+        self._prefetch = prefetch
+        self._checkpoint = checkpoint or PagerCheckpoint(self._request.page_token)
+        self._page_retry = page_retry
 
     def __getattr__(self, name: str) -> Any:
         return getattr(self._response, name)
 
+    @property
+    def checkpoint(self) -> PagerCheckpoint:
+        """The position of the last consumed item.
+
+        Pass this to the originating method as ``checkpoint`` to resume
+        the listing after a failure without starting over.
+        """
+        return self._checkpoint
+
+    async def _fetch_page(self, page_token: str) -> reservation.ListAssignmentsResponse:
+        self._request.page_token = page_token
+        fetch = functools.partial(self._method, self._request, metadata=self._metadata)
+        if self._page_retry is not None:
+            fetch = self._page_retry(fetch)
+        return await fetch()
+
     @property
     async def pages(self) -> AsyncIterable[reservation.ListAssignmentsResponse]:
         yield self._response
-        while self._response.next_page_token:
-            self._request.page_token = self._response.next_page_token
-            self._response = await self._method(self._request, metadata=self._metadata)
-            yield self._response
+        prefetched = None
+        if self._prefetch > 0:
+            prefetched = _prefetch_pages_async(
+                self._fetch_page, self._response.next_page_token, self._prefetch
+            )
+        try:
+            while self._response.next_page_token:
+                self._checkpoint = PagerCheckpoint(self._response.next_page_token)
+                if prefetched is not None:
+                    self._response = await prefetched.__anext__()
+                else:
+                    self._response = await self._fetch_page(self._checkpoint.page_token)
+                yield self._response
+        finally:
+            if prefetched is not None:
+                await prefetched.aclose()
 
     def __aiter__(self) -> AsyncIterable[reservation.Assignment]:
         async def async_generator():
             async for page in self.pages:
-                for response in page.assignments:
+                skip = self._checkpoint.offset
+                responses = itertools.islice(page.assignments, skip, None)
+                for offset, response in enumerate(responses, start=skip + 1):
+                    self._checkpoint = self._checkpoint._replace(offset=offset)
                     yield response
 
         return async_generator()
@@ -428,7 +861,10 @@ class SearchAssignmentsPager:
         request: reservation.SearchAssignmentsRequest,
         response: reservation.SearchAssignmentsResponse,
         *,
-        metadata: Sequence[Tuple[str, str]] = ()
+        metadata: Sequence[Tuple[str, str]] = (),
+        prefetch: int = 0,
+        checkpoint: PagerCheckpoint = None,
+        page_retry: retries.Retry = None
     ):
         """Instantiate the pager.
 
@@ -441,26 +877,73 @@ class SearchAssignmentsPager:
                 The initial response object.
             metadata (Sequence[Tuple[str, str]]): Strings which should be
                 sent along with the request as metadata.
+            prefetch (int): The number of pages to fetch ahead of the
+                consumer on a background thread. If ``0`` (the default),
+                each page is requested only once the previous one has
+                been consumed.
+            checkpoint (Optional[PagerCheckpoint]): The position the
+                initial response was requested from. Items of the initial
+                page before ``checkpoint.offset`` are skipped.
+            page_retry (Optional[google.api_core.retry.Retry]):
+                Designation of how the fetch of a page after the first
+                should be retried once the retry of the wrapped ``method``
+                has been exhausted. The failed page is fetched again,
+                rather than the listing being restarted.
         """
         self._method = method
         self._request = reservation.SearchAssignmentsRequest(request)
         self._response = response
         self._metadata = metadata
+        self._prefetch = prefetch
+        self._checkpoint = checkpoint or PagerCheckpoint(self._request.page_token)
+        self._page_retry = page_retry
 
     def __getattr__(self, name: str) -> Any:
         return getattr(self._response, name)
 
+    @property
+    def checkpoint(self) -> PagerCheckpoint:
+        """The position of the last consumed item.
+
+        Pass this to the originating method as ``checkpoint`` to resume
+        the listing after a failure without starting over.
+        """
+        return self._checkpoint
+
+    def _fetch_page(self, page_token: str) -> reservation.SearchAssignmentsResponse:
+        self._request.page_token = page_token
+        fetch = functools.partial(self._method, self._request, metadata=self._metadata)
+        if self._page_retry is not None:
+            fetch = self._page_retry(fetch)
+        return fetch()
+
     @property
     def pages(self) -> Iterable[reservation.SearchAssignmentsResponse]:
         yield self._response
-        while self._response.next_page_token:
-            self._request.page_token = self._response.next_page_token
-            self._response = self._method(self._request, metadata=self._metadata)
-            yield self._response
+        prefetched = None
+        if self._prefetch > 0:
+            prefetched = _prefetch_pages(
+                self._fetch_page, self._response.next_page_token, self._prefetch
+            )
+        try:
+            while self._response.next_page_token:
+                self._checkpoint = PagerCheckpoint(self._response.next_page_token)
+                if prefetched is not None:
+                    self._response = next(prefetched)
+                else:
+                    self._response = self._fetch_page(self._checkpoint.page_token)
+                yield self._response
+        finally:
+            if prefetched is not None:
+                prefetched.close()
 
     def __iter__(self) -> Iterable[reservation.Assignment]:
         for page in self.pages:
-            yield from page.assignments
+            skip = self._checkpoint.offset
+            items = itertools.islice(page.assignments, skip, None)
+            for offset, item in enumerate(items, start=skip + 1):
+                self._checkpoint = self._checkpoint._replace(offset=offset)
+                yield item
 
     def __repr__(self) -> str:
         return "{0}<{1!r}>".format(self.__class__.__name__, self._response)
@@ -490,7 +973,10 @@ class SearchAssignmentsAsyncPager:
         request: reservation.SearchAssignmentsRequest,
         response: reservation.SearchAssignmentsResponse,
         *,
-        metadata: Sequence[Tuple[str, str]] = ()
+        metadata: Sequence[Tuple[str, str]] = (),
+        prefetch: int = 0,
+        checkpoint: PagerCheckpoint = None,
+        page_retry: retry_async.AsyncRetry = None
     ):
         """Instantiate the pager.
 
@@ -503,27 +989,75 @@ class SearchAssignmentsAsyncPager:
                 The initial response object.
             metadata (Sequence[Tuple[str, str]]): Strings which should be
                 sent along with the request as metadata.
+            prefetch (int): The number of pages to fetch ahead of the
+                consumer in a separate task. If ``0`` (the default),
+                each page is requested only once the previous one has
+                been consumed.
+            checkpoint (Optional[PagerCheckpoint]): The position the
+                initial response was requested from. Items of the initial
+                page before ``checkpoint.offset`` are skipped.
+            page_retry (Optional[google.api_core.retry_async.AsyncRetry]):
+                Designation of how the fetch of a page after the first
+                should be retried once the retry of the wrapped ``method``
+                has been exhausted. The failed page is fetched again,
+                rather than the listing being restarted.
         """
         self._method = method
         self._request = reservation.SearchAssignmentsRequest(request)
         self._response = response
         self._metadata = metadata
+        self._prefetch = prefetch
+        self._checkpoint = checkpoint or PagerCheckpoint(self._request.page_token)
+        self._page_retry = page_retry
 
     def __getattr__(self, name: str) -> Any:
         return getattr(self._response, name)
 
+    @property
+    def checkpoint(self) -> PagerCheckpoint:
+        """The position of the last consumed item.
+
+        Pass this to the originating method as ``checkpoint`` to resume
+        the listing after a failure without starting over.
+        """
+        return self._checkpoint
+
+    async def _fetch_page(
+        self, page_token: str
+    ) -> reservation.SearchAssignmentsResponse:
+        self._request.page_token = page_token
+        fetch = functools.partial(self._method, self._request, metadata=self._metadata)
+        if self._page_retry is not None:
+            fetch = self._page_retry(fetch)
+        return await fetch()
+
     @property
     async def pages(self) -> AsyncIterable[reservation.SearchAssignmentsResponse]:
         yield self._response
-        while self._response.next_page_token:
-            self._request.page_token = self._response.next_page_token
-            self._response = await self._method(self._request, metadata=self._metadata)
-            yield self._response
+        prefetched = None
+        if self._prefetch > 0:
+            prefetched = _prefetch_pages_async(
+                self._fetch_page, self._response.next_page_token, self._prefetch
+            )
+        try:
+            while self._response.next_page_token:
+                self._checkpoint = PagerCheckpoint(self._response.next_page_token)
+                if prefetched is not None:
+                    self._response = await prefetched.__anext__()
+                else:
+                    self._response = await self._fetch_page(self._checkpoint.page_token)
+                yield self._response
+        finally:
+            if prefetched is not None:
+                await prefetched.aclose()
 
     def __aiter__(self) -> AsyncIterable[reservation.Assignment]:
         async def async_generator():
             async for page in self.pages:
-                for response in page.assignments:
+                skip = self._checkpoint.offset
+                responses = itertools.islice(page.assignments, skip, None)
+                for offset, response in enumerate(responses, start=skip + 1):
+                    self._checkpoint = self._checkpoint._replace(offset=offset)
                     yield response
 
         return async_generator()
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+import time
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Tuple,
+)
+
+import proto  # type: ignore
+
+
+class AdaptiveInterval:
+    """A polling interval that backs off while nothing changes.
+
+    The interval starts at ``minimum``, is multiplied by ``multiplier``
+    after every poll that observed no change, up to ``maximum``, and drops
+    back to ``minimum`` as soon as a poll observes a change.
+    """
+
+    def __init__(
+        self, minimum: float = 1.0, maximum: float = 60.0, multiplier: float = 2.0
+    ):
+        """Instantiate the interval.
+
+        Args:
+            minimum (float): The shortest interval, in seconds.
+            maximum (float): The longest interval, in seconds.
+            multiplier (float): The factor the interval grows by after
+                each poll that observed no change.
+        """
+        if not 0 < minimum <= maximum:
+            raise ValueError("Expected 0 < minimum <= maximum.")
+        if multiplier < 1:
+            raise ValueError("The multiplier must be at least 1.")
+        self._minimum = minimum
+        self._maximum = maximum
+        self._multiplier = multiplier
+        self._current = minimum
+
+    @property
+    def current(self) -> float:
+        """The number of seconds to wait before the next poll."""
+        return self._current
+
+    def record(self, changed: bool) -> float:
+        """Adjust the interval to the outcome of a poll.
+
+        Args:
+            changed (bool): Whether the poll observed a change.
+
+        Returns:
+            float: The number of seconds to wait before the next poll.
+        """
+        if changed:
+            self._current = self._minimum
+        else:
+            self._current = min(self._current * self._multiplier, self._maximum)
+        return self._current
+
+
+class ResourceChanges(NamedTuple):
+    """The differences between two listings of resources.
+
+    Attributes:
+        added (Tuple): The resources that appeared.
+        removed (Tuple): The resources that disappeared, in their last
+            known state.
+        modified (Tuple): The resources whose content changed, in their
+            new state.
+    """
+
+    added: Tuple[proto.Message, ...] = ()
+    removed: Tuple[proto.Message, ...] = ()
+    modified: Tuple[proto.Message, ...] = ()
+
+    @property
+    def empty(self) -> bool:
+        """Whether nothing changed."""
+        return not (self.added or self.removed or self.modified)
+
+
+def diff(
+    known: Dict[str, proto.Message], resources: Iterable[proto.Message]
+) -> ResourceChanges:
+    """Compare a listing against the resources known from the last one.
+
+    Resources are matched by name and compared by content. ``known`` is
+    updated in place to hold the resources of the new listing.
+
+    Args:
+        known (Dict[str, proto.Message]): The resources of the last
+            listing, keyed by name.
+        resources (Iterable[proto.Message]): The resources of the new
+            listing.
+
+    Returns:
+        ~.ResourceChanges: What changed between the two listings.
+    """
+    added = []
+    modified = []
+    seen = set()
+    for resource in resources:
+        seen.add(resource.name)
+        previous = known.get(resource.name)
+        if previous is None:
+            added.append(resource)
+        elif previous != resource:
+            modified.append(resource)
+        else:
+            continue
+        known[resource.name] = resource
+    removed = [known.pop(name) for name in list(known) if name not in seen]
+    return ResourceChanges(tuple(added), tuple(removed), tuple(modified))
+
+
+def watch(
+    poll: Callable[[], Iterable[proto.Message]], interval: AdaptiveInterval = None,
+) -> Iterator[ResourceChanges]:
+    """Poll a listing and yield what changes between polls.
+
+    The resources present at the first poll are reported as added. Polls
+    that observe no change yield nothing and lengthen the interval.
+
+    Args:
+        poll (Callable[[], Iterable[proto.Message]]): Lists the resources.
+        interval (~.AdaptiveInterval): Paces the polls. Defaults to an
+            interval between one second and one minute.
+
+    Returns:
+        Iterator[~.ResourceChanges]: The changes, one entry per poll that
+            observed any. The iterator does not end by itself; errors
+            raised by ``poll`` are re-raised.
+    """
+    interval = interval or AdaptiveInterval()
+    known = {}  # type: Dict[str, proto.Message]
+    while True:
+        changes = diff(known, poll())
+        if not changes.empty:
+            yield changes
+        time.sleep(interval.record(not changes.empty))
+
+
+async def watch_async(
+    poll: Callable[[], Awaitable[Iterable[proto.Message]]],
+    interval: AdaptiveInterval = None,
+) -> AsyncIterator[ResourceChanges]:
+    """Poll a listing and yield what changes between polls.
+
+    The asyncio counterpart of :func:`watch`.
+
+    Args:
+        poll (Callable[[], Awaitable[Iterable[proto.Message]]]): Lists the
+            resources.
+        interval (~.AdaptiveInterval): Paces the polls. Defaults to an
+            interval between one second and one minute.
+
+    Returns:
+        AsyncIterator[~.ResourceChanges]: The changes, one entry per poll
+            that observed any.
+    """
+    interval = interval or AdaptiveInterval()
+    known = {}  # type: Dict[str, proto.Message]
+    while True:
+        changes = diff(known, await poll())
+        if not changes.empty:
+            yield changes
+        await asyncio.sleep(interval.record(not changes.empty))
+
+
+__all__ = (
+    "AdaptiveInterval",
+    "ResourceChanges",
+    "diff",
+    "watch",
+    "watch_async",
+)
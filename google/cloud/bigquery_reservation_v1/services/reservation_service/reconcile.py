@@ -0,0 +1,391 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from typing import Any, Dict, List, Mapping, NamedTuple, Sequence, Tuple
+
+from google.api_core import gapic_v1  # type: ignore
+from google.api_core import retry as retries  # type: ignore
+import proto  # type: ignore
+
+from google.cloud.bigquery_reservation_v1.services.reservation_service import bulk
+from google.cloud.bigquery_reservation_v1.services.reservation_service import masks
+from google.cloud.bigquery_reservation_v1.types import reservation
+
+from .client import ReservationServiceClient
+from .topology import ReservationTopology
+
+
+def _location_path(name: str) -> str:
+    return "/".join(name.split("/")[:4])
+
+
+def _reservation_name(assignment_name: str) -> str:
+    return assignment_name.rsplit("/assignments/", 1)[0]
+
+
+class DesiredState(NamedTuple):
+    """The reservations, assignments and commitments that should exist.
+
+    Reservations and capacity commitments are identified by name. An
+    assignment is identified by its location, assignee and job type, and
+    given together with the name of the reservation it should belong to.
+
+    Attributes:
+        reservations (Sequence[~.reservation.Reservation]): The desired
+            reservations.
+        assignments (Sequence[Tuple[str, ~.reservation.Assignment]]): The
+            desired ``(reservation name, assignment)`` pairs.
+        capacity_commitments (Sequence[~.reservation.CapacityCommitment]):
+            The desired plans of existing capacity commitments.
+    """
+
+    reservations: Sequence[reservation.Reservation] = ()
+    assignments: Sequence[Tuple[str, reservation.Assignment]] = ()
+    capacity_commitments: Sequence[reservation.CapacityCommitment] = ()
+
+    @classmethod
+    def from_dict(cls, document: Mapping[str, Any]) -> "DesiredState":
+        """Build a desired state from a configuration document.
+
+        Args:
+            document (Mapping[str, Any]): A mapping with optional
+                ``reservations``, ``assignments`` and
+                ``capacity_commitments`` lists. Each entry maps field
+                names to values, as accepted by the message constructors;
+                assignment entries also hold the name of their
+                ``reservation``.
+
+        Returns:
+            ~.DesiredState: The desired state.
+        """
+        assignments = []
+        for entry in document.get("assignments", ()):
+            entry = dict(entry)
+            parent = entry.pop("reservation")
+            assignments.append((parent, reservation.Assignment(entry)))
+        return cls(
+            reservations=[
+                reservation.Reservation(entry)
+                for entry in document.get("reservations", ())
+            ],
+            assignments=assignments,
+            capacity_commitments=[
+                reservation.CapacityCommitment(entry)
+                for entry in document.get("capacity_commitments", ())
+            ],
+        )
+
+    def location_paths(self) -> List[str]:
+        """Return the ``projects/*/locations/*`` paths the state covers."""
+        names = [r.name for r in self.reservations]
+        names.extend(parent for parent, _ in self.assignments)
+        names.extend(c.name for c in self.capacity_commitments)
+        return sorted(set(_location_path(name) for name in names))
+
+
+class Operation(NamedTuple):
+    """A single call planned by a reconciliation.
+
+    Attributes:
+        method (str): The name of the client method to call.
+        request (proto.Message): The request to call it with.
+        key (str): Identifies the operation among the others of a plan.
+        depends_on (Tuple[str, ...]): The keys of the operations that must
+            complete first.
+    """
+
+    method: str
+    request: proto.Message
+    key: str
+    depends_on: Tuple[str, ...] = ()
+
+
+class Plan(NamedTuple):
+    """The calls that bring the current state to the desired one.
+
+    Attributes:
+        operations (Tuple[~.Operation, ...]): The planned calls.
+    """
+
+    operations: Tuple[Operation, ...] = ()
+
+    @property
+    def empty(self) -> bool:
+        """Whether the current state already is the desired one."""
+        return not self.operations
+
+    def waves(self) -> List[List[Operation]]:
+        """Split the operations into waves that may each run in parallel.
+
+        Every operation is placed in the first wave that follows all of
+        the operations it depends on.
+
+        Returns:
+            List[List[~.Operation]]: The waves, in the order they must run.
+        """
+        keys = set(op.key for op in self.operations)
+        done = set()
+        remaining = list(self.operations)
+        waves = []
+        while remaining:
+            wave = [
+                op
+                for op in remaining
+                if all(key in done or key not in keys for key in op.depends_on)
+            ]
+            if not wave:
+                raise ValueError("The plan has a dependency cycle.")
+            waves.append(wave)
+            done.update(op.key for op in wave)
+            remaining = [op for op in remaining if op.key not in done]
+        return waves
+
+
+class ApplyResult(NamedTuple):
+    """The outcome of applying a plan.
+
+    Attributes:
+        results (Tuple[~.bulk.BulkResult, ...]): The result of each
+            operation that ran; the item of each result is its
+            :class:`Operation`.
+        skipped (Tuple[~.Operation, ...]): The operations that did not run
+            because an earlier wave had failures.
+    """
+
+    results: Tuple[bulk.BulkResult, ...] = ()
+    skipped: Tuple[Operation, ...] = ()
+
+    @property
+    def ok(self) -> bool:
+        """Whether every planned operation ran and succeeded."""
+        return not self.skipped and all(result.ok for result in self.results)
+
+
+def compute_plan(
+    current: ReservationTopology, desired: DesiredState, prune: bool = False
+) -> Plan:
+    """Compute the calls that bring ``current`` to ``desired``.
+
+    Existing resources are updated with an ``update_mask`` naming only the
+    fields that differ, assignments attached to the wrong reservation are
+    moved rather than recreated, and nothing is called for resources that
+    already match. Assignments are created after their reservation and
+    deleted before it.
+
+    Args:
+        current (~.ReservationTopology): The current state.
+        desired (~.DesiredState): The desired state.
+        prune (bool): If true, reservations and assignments in the
+            locations covered by ``desired`` that it does not mention are
+            deleted. A reservation that a desired assignment is created in
+            or moved to counts as mentioned. Capacity commitments are never
+            created or deleted.
+
+    Returns:
+        ~.Plan: The planned calls.
+
+    Raises:
+        ValueError: If ``desired`` names a capacity commitment that does
+            not exist.
+    """
+    operations = []
+    scope = set(desired.location_paths())
+    # The keys of the operations that take assignments out of a reservation.
+    emptied = {}  # type: Dict[str, List[str]]
+
+    wanted = {r.name: r for r in desired.reservations}
+    for name, want in wanted.items():
+        have = current.reservations.get(name)
+        if have is None:
+            parent, reservation_id = name.rsplit("/reservations/", 1)
+            body = reservation.Reservation(want)
+            body.name = ""
+            request = reservation.CreateReservationRequest(
+                parent=parent, reservation_id=reservation_id, reservation=body,
+            )
+            operations.append(Operation("create_reservation", request, name))
+            continue
+        update_mask = masks.minimal_field_mask(have, want)
+        if update_mask.paths:
+            request = reservation.UpdateReservationRequest(
+                reservation=want, update_mask=update_mask,
+            )
+            operations.append(Operation("update_reservation", request, name))
+
+    for want in desired.capacity_commitments:
+        have = current.capacity_commitments.get(want.name)
+        if have is None:
+            raise ValueError("Unknown capacity commitment: {}".format(want.name))
+        update_mask = masks.minimal_field_mask(have, want)
+        if update_mask.paths:
+            request = reservation.UpdateCapacityCommitmentRequest(
+                capacity_commitment=want, update_mask=update_mask,
+            )
+            operations.append(
+                Operation("update_capacity_commitment", request, want.name)
+            )
+
+    existing = {
+        (_location_path(a.name), a.assignee, a.job_type): a
+        for a in current.assignments.values()
+    }
+    for parent, want in desired.assignments:
+        identity = (_location_path(parent), want.assignee, want.job_type)
+        have = existing.pop(identity, None)
+        if have is None:
+            request = reservation.CreateAssignmentRequest(
+                parent=parent, assignment=want
+            )
+            key = "{}/assignments/{}#{}".format(
+                parent, want.assignee, want.job_type.name
+            )
+            operations.append(
+                Operation("create_assignment", request, key, depends_on=(parent,))
+            )
+        elif _reservation_name(have.name) != parent:
+            request = reservation.MoveAssignmentRequest(
+                name=have.name, destination_id=parent
+            )
+            operations.append(
+                Operation("move_assignment", request, have.name, depends_on=(parent,))
+            )
+            emptied.setdefault(_reservation_name(have.name), []).append(have.name)
+
+    if prune:
+        # The reservations that desired assignments need are kept too.
+        kept = set(wanted).union(parent for parent, _ in desired.assignments)
+        for have in existing.values():
+            if _location_path(have.name) not in scope:
+                continue
+            request = reservation.DeleteAssignmentRequest(name=have.name)
+            operations.append(Operation("delete_assignment", request, have.name))
+            emptied.setdefault(_reservation_name(have.name), []).append(have.name)
+        for name in current.reservations:
+            if name in kept or _location_path(name) not in scope:
+                continue
+            request = reservation.DeleteReservationRequest(name=name)
+            operations.append(
+                Operation(
+                    "delete_reservation",
+                    request,
+                    name,
+                    depends_on=tuple(emptied.get(name, ())),
+                )
+            )
+
+    return Plan(tuple(operations))
+
+
+class Reconciler:
+    """Brings reservations, assignments and commitments to a desired state.
+
+    :meth:`plan` lists the current state of the locations the desired
+    state covers and computes the calls needed; :meth:`apply` makes them,
+    running the operations of each dependency wave in parallel.
+    """
+
+    def __init__(self, client: ReservationServiceClient, *, max_workers: int = 8):
+        """Instantiate the reconciler.
+
+        Args:
+            client (~.ReservationServiceClient): The client to call with.
+            max_workers (int): The number of calls in flight at once, both
+                when listing and when applying.
+        """
+        self._client = client
+        self._max_workers = max_workers
+
+    def current_state(self, desired: DesiredState) -> ReservationTopology:
+        """List the current state of the locations ``desired`` covers."""
+        segments = [
+            ReservationServiceClient.parse_common_location_path(path)
+            for path in desired.location_paths()
+        ]
+        return ReservationTopology.from_client(
+            self._client,
+            projects=sorted(set(s["project"] for s in segments)),
+            locations=sorted(set(s["location"] for s in segments)),
+            max_workers=self._max_workers,
+        )
+
+    def plan(self, desired: DesiredState, *, prune: bool = False) -> Plan:
+        """Compute the calls that bring the current state to ``desired``.
+
+        Args:
+            desired (~.DesiredState): The desired state.
+            prune (bool): If true, also delete the reservations and
+                assignments that ``desired`` does not mention, in the
+                locations it covers.
+
+        Returns:
+            ~.Plan: The planned calls.
+        """
+        return compute_plan(self.current_state(desired), desired, prune=prune)
+
+    def apply(
+        self,
+        plan: Plan,
+        *,
+        retry: retries.Retry = gapic_v1.method.DEFAULT,
+        timeout: float = None,
+        metadata: Sequence[Tuple[str, str]] = (),
+    ) -> ApplyResult:
+        """Make the calls of ``plan``, one dependency wave at a time.
+
+        The operations of a wave run in parallel. If any of them fails,
+        the wave is completed but the following waves are skipped.
+
+        Args:
+            plan (~.Plan): The plan to apply.
+            retry (google.api_core.retry.Retry): Designation of what errors, if any,
+                should be retried.
+            timeout (float): The timeout for each request.
+            metadata (Sequence[Tuple[str, str]]): Strings which should be
+                sent along with each request as metadata.
+
+        Returns:
+            ~.ApplyResult: The outcome of each operation.
+        """
+
+        def call(operation):
+            method = getattr(self._client, operation.method)
+            return method(
+                request=operation.request,
+                retry=retry,
+                timeout=timeout,
+                metadata=metadata,
+            )
+
+        results = []  # type: List[bulk.BulkResult]
+        waves = plan.waves()
+        for position, wave in enumerate(waves):
+            wave_results = list(bulk.run(call, wave, max_workers=self._max_workers))
+            results.extend(wave_results)
+            if not all(result.ok for result in wave_results):
+                skipped = [op for later in waves[position + 1 :] for op in later]
+                return ApplyResult(tuple(results), tuple(skipped))
+        return ApplyResult(tuple(results))
+
+
+__all__ = (
+    "ApplyResult",
+    "DesiredState",
+    "Operation",
+    "Plan",
+    "Reconciler",
+    "compute_plan",
+)
@@ -0,0 +1,406 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+import collections
+import types
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+)
+
+import proto  # type: ignore
+
+from google.cloud.bigquery_reservation_v1.services.reservation_service import polling
+from google.cloud.bigquery_reservation_v1.types import reservation
+
+from .async_client import ReservationServiceAsyncClient
+from .client import ReservationServiceClient
+
+
+def _reservation_name(assignment: reservation.Assignment) -> str:
+    """Return the name of the reservation an assignment belongs to."""
+    return assignment.name.rsplit("/assignments/", 1)[0]
+
+
+def _list_all(client, projects, locations, max_workers):
+    projects = list(projects)
+    locations = list(locations)
+
+    def list_all(method):
+        results = client.fan_out_list(
+            method, projects=projects, locations=locations, max_workers=max_workers,
+        )
+        return [result.item for result in results]
+
+    return (
+        list_all("list_reservations"),
+        list_all("list_assignments"),
+        list_all("list_capacity_commitments"),
+    )
+
+
+async def _list_all_async(client, projects, locations, max_concurrency):
+    projects = list(projects)
+    locations = list(locations)
+
+    async def list_all(method):
+        results = client.fan_out_list(
+            method,
+            projects=projects,
+            locations=locations,
+            max_concurrency=max_concurrency,
+        )
+        return [result.item async for result in results]
+
+    return await asyncio.gather(
+        list_all("list_reservations"),
+        list_all("list_assignments"),
+        list_all("list_capacity_commitments"),
+    )
+
+
+def _location(name: str) -> str:
+    """Return the location segment of a resource name."""
+    return ReservationServiceClient.parse_common_location_path(
+        "/".join(name.split("/")[:4])
+    ).get("location", "")
+
+
+class ReservationTopology:
+    """An in-memory snapshot of reservations, assignments and commitments.
+
+    Assignments are indexed by assignee, by reservation and by job type,
+    so questions such as "which reservation do the queries of project X
+    run in" are answered in-process instead of by a ``search_assignments``
+    call per assignee.
+
+    The snapshot is not refreshed automatically; :meth:`refresh` re-lists
+    the resources and applies only what changed. It is not safe to use
+    from several threads while it is being modified.
+    """
+
+    def __init__(
+        self,
+        reservations: Iterable[reservation.Reservation] = (),
+        assignments: Iterable[reservation.Assignment] = (),
+        capacity_commitments: Iterable[reservation.CapacityCommitment] = (),
+    ):
+        """Instantiate the snapshot.
+
+        Args:
+            reservations (Iterable[~.reservation.Reservation]): The
+                reservations in the snapshot.
+            assignments (Iterable[~.reservation.Assignment]): The
+                assignments in the snapshot.
+            capacity_commitments (Iterable[~.reservation.CapacityCommitment]):
+                The capacity commitments in the snapshot.
+        """
+        self._reservations = {}  # type: Dict[str, reservation.Reservation]
+        self._assignments = {}  # type: Dict[str, reservation.Assignment]
+        self._capacity_commitments = (
+            {}
+        )  # type: Dict[str, reservation.CapacityCommitment]
+        self._by_assignee = collections.defaultdict(dict)
+        self._by_reservation = collections.defaultdict(dict)
+        self._by_job_type = collections.defaultdict(dict)
+
+        for resource in reservations:
+            self._reservations[resource.name] = resource
+        for resource in capacity_commitments:
+            self._capacity_commitments[resource.name] = resource
+        for resource in assignments:
+            self._index_assignment(resource)
+
+    @classmethod
+    def from_client(
+        cls,
+        client: ReservationServiceClient,
+        *,
+        projects: Iterable[str],
+        locations: Iterable[str],
+        max_workers: int = 8,
+    ) -> "ReservationTopology":
+        """Build a snapshot by listing resources through ``client``.
+
+        The assignments of all reservations in a location are listed
+        together, so the snapshot costs a few paged calls per project and
+        location regardless of the number of assignees.
+
+        Args:
+            client (~.ReservationServiceClient): The client to list with.
+            projects (Iterable[str]): The admin projects to snapshot.
+            locations (Iterable[str]): The locations to snapshot in each
+                project.
+            max_workers (int): The number of listings walked at once.
+
+        Returns:
+            ~.ReservationTopology: The snapshot.
+        """
+        return cls(*_list_all(client, projects, locations, max_workers))
+
+    @classmethod
+    async def from_async_client(
+        cls,
+        client: ReservationServiceAsyncClient,
+        *,
+        projects: Iterable[str],
+        locations: Iterable[str],
+        max_concurrency: int = 8,
+    ) -> "ReservationTopology":
+        """Build a snapshot by listing resources through ``client``.
+
+        The asyncio counterpart of :meth:`from_client`; the three kinds of
+        resource are listed concurrently.
+
+        Args:
+            client (~.ReservationServiceAsyncClient): The client to list with.
+            projects (Iterable[str]): The admin projects to snapshot.
+            locations (Iterable[str]): The locations to snapshot in each
+                project.
+            max_concurrency (int): The number of listings walked at once
+                for each kind of resource.
+
+        Returns:
+            ~.ReservationTopology: The snapshot.
+        """
+        return cls(*await _list_all_async(client, projects, locations, max_concurrency))
+
+    def refresh(
+        self,
+        client: ReservationServiceClient,
+        *,
+        projects: Iterable[str],
+        locations: Iterable[str],
+        max_workers: int = 8,
+    ) -> polling.ResourceChanges:
+        """Re-list the resources through ``client`` and apply the differences.
+
+        Takes the same arguments as :meth:`from_client`.
+
+        Returns:
+            ~.polling.ResourceChanges: What changed since the snapshot was taken or
+                last refreshed.
+        """
+        return self.update(*_list_all(client, projects, locations, max_workers))
+
+    async def refresh_async(
+        self,
+        client: ReservationServiceAsyncClient,
+        *,
+        projects: Iterable[str],
+        locations: Iterable[str],
+        max_concurrency: int = 8,
+    ) -> polling.ResourceChanges:
+        """Re-list the resources through ``client`` and apply the differences.
+
+        The asyncio counterpart of :meth:`refresh`; takes the same
+        arguments as :meth:`from_async_client`.
+
+        Returns:
+            ~.polling.ResourceChanges: What changed since the snapshot was taken or
+                last refreshed.
+        """
+        return self.update(
+            *await _list_all_async(client, projects, locations, max_concurrency)
+        )
+
+    def update(
+        self,
+        reservations: Iterable[reservation.Reservation] = (),
+        assignments: Iterable[reservation.Assignment] = (),
+        capacity_commitments: Iterable[reservation.CapacityCommitment] = (),
+    ) -> polling.ResourceChanges:
+        """Bring the snapshot in line with a fresh listing of its resources.
+
+        Resources are matched by name and compared by content. Only the
+        resources that were added, removed or modified are touched, and
+        the indexes are updated in place.
+
+        Args:
+            reservations (Iterable[~.reservation.Reservation]): The current
+                reservations.
+            assignments (Iterable[~.reservation.Assignment]): The current
+                assignments.
+            capacity_commitments (Iterable[~.reservation.CapacityCommitment]):
+                The current capacity commitments.
+
+        Returns:
+            ~.polling.ResourceChanges: What changed. Added and modified resources
+                are given in their new state, removed ones in their last
+                known state.
+        """
+        added, removed, modified = (), (), ()
+
+        for current, resources in (
+            (self._reservations, reservations),
+            (self._capacity_commitments, capacity_commitments),
+            (self._assignments, assignments),
+        ):
+            changes = polling.diff(dict(current), resources)
+            for resource in changes.removed:
+                self._remove(current, resource)
+            for resource in changes.modified:
+                self._remove(current, current[resource.name])
+                self._add(current, resource)
+            for resource in changes.added:
+                self._add(current, resource)
+            added += changes.added
+            removed += changes.removed
+            modified += changes.modified
+
+        return polling.ResourceChanges(added, removed, modified)
+
+    def _add(self, current: Dict[str, proto.Message], resource: proto.Message):
+        if current is self._assignments:
+            self._index_assignment(resource)
+        else:
+            current[resource.name] = resource
+
+    def _remove(self, current: Dict[str, proto.Message], resource: proto.Message):
+        if current is self._assignments:
+            self._unindex_assignment(resource)
+        else:
+            del current[resource.name]
+
+    def _index_assignment(self, assignment: reservation.Assignment) -> None:
+        self._assignments[assignment.name] = assignment
+        self._by_assignee[assignment.assignee][assignment.name] = assignment
+        self._by_reservation[_reservation_name(assignment)][
+            assignment.name
+        ] = assignment
+        self._by_job_type[assignment.job_type][assignment.name] = assignment
+
+    def _unindex_assignment(self, assignment: reservation.Assignment) -> None:
+        del self._assignments[assignment.name]
+        for index, key in (
+            (self._by_assignee, assignment.assignee),
+            (self._by_reservation, _reservation_name(assignment)),
+            (self._by_job_type, assignment.job_type),
+        ):
+            bucket = index[key]
+            del bucket[assignment.name]
+            if not bucket:
+                del index[key]
+
+    @property
+    def reservations(self) -> Mapping[str, reservation.Reservation]:
+        """The reservations in the snapshot, keyed by name."""
+        return types.MappingProxyType(self._reservations)
+
+    @property
+    def assignments(self) -> Mapping[str, reservation.Assignment]:
+        """The assignments in the snapshot, keyed by name."""
+        return types.MappingProxyType(self._assignments)
+
+    @property
+    def capacity_commitments(self) -> Mapping[str, reservation.CapacityCommitment]:
+        """The capacity commitments in the snapshot, keyed by name."""
+        return types.MappingProxyType(self._capacity_commitments)
+
+    def assignments_for_assignee(
+        self, assignee: str, job_type: reservation.Assignment.JobType = None
+    ) -> List[reservation.Assignment]:
+        """Return the assignments of an assignee.
+
+        Args:
+            assignee (str): The assignee, e.g. ``projects/myproject``,
+                ``folders/123`` or ``organizations/456``.
+            job_type (Optional[~.reservation.Assignment.JobType]): If set,
+                only assignments for this type of job are returned.
+        """
+        assignments = self._by_assignee.get(assignee, {}).values()
+        return [a for a in assignments if job_type is None or a.job_type == job_type]
+
+    def assignments_for_reservation(
+        self, reservation_name: str, job_type: reservation.Assignment.JobType = None
+    ) -> List[reservation.Assignment]:
+        """Return the assignments of a reservation.
+
+        Args:
+            reservation_name (str): The name of the reservation.
+            job_type (Optional[~.reservation.Assignment.JobType]): If set,
+                only assignments for this type of job are returned.
+        """
+        assignments = self._by_reservation.get(reservation_name, {}).values()
+        return [a for a in assignments if job_type is None or a.job_type == job_type]
+
+    def assignments_for_job_type(
+        self, job_type: reservation.Assignment.JobType
+    ) -> List[reservation.Assignment]:
+        """Return the assignments for a type of job."""
+        return list(self._by_job_type.get(job_type, {}).values())
+
+    def assignment_for(
+        self,
+        assignee: str,
+        job_type: reservation.Assignment.JobType = reservation.Assignment.JobType.QUERY,
+        *,
+        location: str = None,
+        ancestors: Sequence[str] = (),
+    ) -> Optional[reservation.Assignment]:
+        """Return the assignment that applies to the jobs of an assignee.
+
+        Args:
+            assignee (str): The assignee, e.g. ``projects/myproject``.
+            job_type (~.reservation.Assignment.JobType): The type of job.
+            location (Optional[str]): If set, only assignments to
+                reservations in this location are considered.
+            ancestors (Sequence[str]): The folders and organization the
+                assignee belongs to, nearest first. Their assignments apply
+                when the assignee has none of its own.
+
+        Returns:
+            Optional[~.reservation.Assignment]: The assignment, or ``None``
+                if no assignment in the snapshot applies.
+        """
+        for candidate in (assignee,) + tuple(ancestors):
+            for assignment in self.assignments_for_assignee(candidate, job_type):
+                if location is None or _location(assignment.name) == location:
+                    return assignment
+        return None
+
+    def reservation_for(
+        self,
+        assignee: str,
+        job_type: reservation.Assignment.JobType = reservation.Assignment.JobType.QUERY,
+        *,
+        location: str = None,
+        ancestors: Sequence[str] = (),
+    ) -> Optional[reservation.Reservation]:
+        """Return the reservation the jobs of an assignee run in.
+
+        Takes the same arguments as :meth:`assignment_for`.
+
+        Returns:
+            Optional[~.reservation.Reservation]: The reservation, or
+                ``None`` if no assignment in the snapshot applies or its
+                reservation is not in the snapshot.
+        """
+        assignment = self.assignment_for(
+            assignee, job_type, location=location, ancestors=ancestors
+        )
+        if assignment is None:
+            return None
+        return self._reservations.get(_reservation_name(assignment))
+
+
+__all__ = ("ReservationTopology",)
@@ -21,6 +21,8 @@ from typing import Dict, Type
 from .base import ReservationServiceTransport
 from .grpc import ReservationServiceGrpcTransport
 from .grpc_asyncio import ReservationServiceGrpcAsyncIOTransport
+from .pool import ReservationServicePooledGrpcTransport
+from .pool import ReservationServicePooledGrpcAsyncIOTransport
 
 
 # Compile a registry of transports.
@@ -29,10 +31,14 @@ _transport_registry = (
 )  # type: Dict[str, Type[ReservationServiceTransport]]
 _transport_registry["grpc"] = ReservationServiceGrpcTransport
 _transport_registry["grpc_asyncio"] = ReservationServiceGrpcAsyncIOTransport
+_transport_registry["grpc_pool"] = ReservationServicePooledGrpcTransport
+_transport_registry["grpc_asyncio_pool"] = ReservationServicePooledGrpcAsyncIOTransport
 
 
 __all__ = (
     "ReservationServiceTransport",
     "ReservationServiceGrpcTransport",
     "ReservationServiceGrpcAsyncIOTransport",
+    "ReservationServicePooledGrpcTransport",
+    "ReservationServicePooledGrpcAsyncIOTransport",
 )
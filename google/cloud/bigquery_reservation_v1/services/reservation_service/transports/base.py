@@ -16,7 +16,10 @@
 #
 
 import abc
+import os
+import threading
 import typing
+import weakref
 import pkg_resources
 
 from google import auth  # type: ignore
@@ -24,11 +27,16 @@ from google.api_core import exceptions  # type: ignore
 from google.api_core import gapic_v1  # type: ignore
 from google.api_core import retry as retries  # type: ignore
 from google.auth import credentials  # type: ignore
+from google.auth.transport.requests import Request  # type: ignore
 
 from google.cloud.bigquery_reservation_v1.types import reservation
 from google.cloud.bigquery_reservation_v1.types import reservation as gcbr_reservation
 from google.protobuf import empty_pb2 as empty  # type: ignore
 
+from .hedging import HedgingPolicy, hedge
+from .rate_limit import READ_METHODS, WRITE_METHODS, RateLimiter, throttle
+from .retry_budget import BudgetedRetry, RetryBudget
+
 
 try:
     DEFAULT_CLIENT_INFO = gapic_v1.client_info.ClientInfo(
@@ -39,6 +47,19 @@ try:
 except pkg_resources.DistributionNotFound:
     DEFAULT_CLIENT_INFO = gapic_v1.client_info.ClientInfo()
 
+# The transports whose state is reset in a child process after a fork.
+_transports = weakref.WeakSet()  # type: weakref.WeakSet
+
+
+def _after_fork_in_child() -> None:
+    # A lock held by another thread of the parent stays held in the child.
+    for transport in list(_transports):
+        transport._fork_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
 
 class ReservationServiceTransport(abc.ABC):
     """Abstract transport class for ReservationService."""
@@ -57,6 +78,9 @@ class ReservationServiceTransport(abc.ABC):
         scopes: typing.Optional[typing.Sequence[str]] = AUTH_SCOPES,
         quota_project_id: typing.Optional[str] = None,
         client_info: gapic_v1.client_info.ClientInfo = DEFAULT_CLIENT_INFO,
+        rate_limiter: typing.Optional[RateLimiter] = None,
+        retry_budget: typing.Optional[RetryBudget] = None,
+        hedging_policy: typing.Optional[HedgingPolicy] = None,
         **kwargs,
     ) -> None:
         """Instantiate the transport.
@@ -79,6 +103,15 @@ class ReservationServiceTransport(abc.ABC):
                 API requests. If ``None``, then default info will be used.	
                 Generally, you only need to set this if you're developing	
                 your own client library.
+            rate_limiter (Optional[RateLimiter]): Paces the calls made
+                through this transport, per method. Every attempt,
+                including retries, takes a token.
+            retry_budget (Optional[RetryBudget]): Caps the retries made
+                by the default retry settings of every method of this
+                transport, which then back off with full jitter.
+            hedging_policy (Optional[HedgingPolicy]): Hedges slow calls
+                to the idempotent read methods it names. A hedged call
+                takes a single token from the rate limiter.
         """
         # Save the hostname. Default to port 443 (HTTPS) if none is specified.
         if ":" not in host:
@@ -105,176 +138,314 @@ class ReservationServiceTransport(abc.ABC):
         # Save the credentials.
         self._credentials = credentials
 
+        self._rate_limiter = rate_limiter
+        self._retry_budget = retry_budget
+        self._hedging_policy = hedging_policy
+
+        # Remember the process, so that a fork can be detected.
+        self._client_info = client_info
+        self._pid = os.getpid()
+        self._fork_lock = threading.Lock()
+        _transports.add(self)
+
         # Lifted into its own function so it can be stubbed out during tests.
         self._prep_wrapped_messages(client_info)
 
+    def _check_fork(self) -> None:
+        """Reset the transport if it runs in a forked child process."""
+        if self._pid != os.getpid():
+            with self._fork_lock:
+                if self._pid != os.getpid():
+                    self._reset_after_fork()
+                    self._prep_wrapped_messages(self._client_info)
+                    self._pid = os.getpid()
+
+    @property
+    def _wrapped_methods(self) -> typing.Dict[typing.Callable, typing.Callable]:
+        """The wrapped RPC methods, rebuilt first in a forked child process."""
+        self._check_fork()
+        return self._wrapped
+
+    @_wrapped_methods.setter
+    def _wrapped_methods(self, wrapped):
+        self._wrapped = wrapped
+
+    def _reset_after_fork(self) -> None:
+        """Drop the state inherited from the parent process.
+
+        Called in a child process, before its first call, once the process
+        forked. Transports that hold channels reopen them here.
+        """
+
+    def _build_stubs(self) -> None:
+        """Build the stub of every RPC method that is not built yet."""
+        self._check_fork()
+        for name in READ_METHODS + WRITE_METHODS:
+            getattr(self, name)
+
+    def _fetch_token(self) -> None:
+        """Fetch an access token, unless the credentials hold a valid one."""
+        if self._credentials and not self._credentials.valid:
+            self._credentials.refresh(Request())
+
+    def warm_up(
+        self, timeout: float = None, *, fetch_token: bool = False
+    ) -> typing.Optional[typing.Awaitable[None]]:
+        """Prepare the transport for its first call.
+
+        Builds the stub of every RPC method, connects the channel and,
+        optionally, fetches an access token, so that the first call does
+        not pay for them.
+
+        Args:
+            timeout (float): How long to wait for the channel to connect,
+                in seconds. If ``None``, wait indefinitely.
+            fetch_token (bool): Whether to also fetch an access token.
+
+        Raises:
+            google.api_core.exceptions.DeadlineExceeded: If the channel
+                did not connect within ``timeout``.
+        """
+        raise NotImplementedError()
+
+    def _rate_limited(self, name: str, method: typing.Callable) -> typing.Callable:
+        """Return ``method``, paced by the rate limiter's bucket for ``name``."""
+        bucket = self._rate_limiter and self._rate_limiter.bucket_for(name)
+        if not bucket:
+            return method
+        return throttle(bucket, method)
+
+    def _hedged(self, name: str, method: typing.Callable) -> typing.Callable:
+        """Return ``method``, hedged if the hedging policy covers ``name``."""
+        policy = self._hedging_policy
+        if policy is None or not policy.hedges(name):
+            return method
+        return hedge(policy, name, method)
+
+    def _budgeted_retry(self, retry: retries.Retry) -> retries.Retry:
+        """Return ``retry``, drawing from the retry budget if there is one."""
+        if self._retry_budget is None:
+            return retry
+        return BudgetedRetry.from_retry(retry, self._retry_budget)
+
     def _prep_wrapped_messages(self, client_info):
         # Precompute the wrapped methods.
         self._wrapped_methods = {
             self.create_reservation: gapic_v1.method.wrap_method(
-                self.create_reservation, default_timeout=60.0, client_info=client_info,
+                self._rate_limited("create_reservation", self.create_reservation),
+                default_timeout=60.0,
+                client_info=client_info,
             ),
             self.list_reservations: gapic_v1.method.wrap_method(
-                self.list_reservations,
-                default_retry=retries.Retry(
-                    initial=0.1,
-                    maximum=60.0,
-                    multiplier=1.3,
-                    predicate=retries.if_exception_type(
-                        exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
-                    ),
+                self._rate_limited("list_reservations", self.list_reservations),
+                default_retry=self._budgeted_retry(
+                    retries.Retry(
+                        initial=0.1,
+                        maximum=60.0,
+                        multiplier=1.3,
+                        predicate=retries.if_exception_type(
+                            exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
+                        ),
+                    )
                 ),
                 default_timeout=60.0,
                 client_info=client_info,
             ),
             self.get_reservation: gapic_v1.method.wrap_method(
-                self.get_reservation,
-                default_retry=retries.Retry(
-                    initial=0.1,
-                    maximum=60.0,
-                    multiplier=1.3,
-                    predicate=retries.if_exception_type(
-                        exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
-                    ),
+                self._rate_limited(
+                    "get_reservation",
+                    self._hedged("get_reservation", self.get_reservation),
+                ),
+                default_retry=self._budgeted_retry(
+                    retries.Retry(
+                        initial=0.1,
+                        maximum=60.0,
+                        multiplier=1.3,
+                        predicate=retries.if_exception_type(
+                            exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
+                        ),
+                    )
                 ),
                 default_timeout=60.0,
                 client_info=client_info,
             ),
             self.delete_reservation: gapic_v1.method.wrap_method(
-                self.delete_reservation,
-                default_retry=retries.Retry(
-                    initial=0.1,
-                    maximum=60.0,
-                    multiplier=1.3,
-                    predicate=retries.if_exception_type(
-                        exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
-                    ),
+                self._rate_limited("delete_reservation", self.delete_reservation),
+                default_retry=self._budgeted_retry(
+                    retries.Retry(
+                        initial=0.1,
+                        maximum=60.0,
+                        multiplier=1.3,
+                        predicate=retries.if_exception_type(
+                            exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
+                        ),
+                    )
                 ),
                 default_timeout=60.0,
                 client_info=client_info,
             ),
             self.update_reservation: gapic_v1.method.wrap_method(
-                self.update_reservation, default_timeout=60.0, client_info=client_info,
+                self._rate_limited("update_reservation", self.update_reservation),
+                default_timeout=60.0,
+                client_info=client_info,
             ),
             self.create_capacity_commitment: gapic_v1.method.wrap_method(
-                self.create_capacity_commitment,
+                self._rate_limited(
+                    "create_capacity_commitment", self.create_capacity_commitment
+                ),
                 default_timeout=60.0,
                 client_info=client_info,
             ),
             self.list_capacity_commitments: gapic_v1.method.wrap_method(
-                self.list_capacity_commitments,
-                default_retry=retries.Retry(
-                    initial=0.1,
-                    maximum=60.0,
-                    multiplier=1.3,
-                    predicate=retries.if_exception_type(
-                        exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
-                    ),
+                self._rate_limited(
+                    "list_capacity_commitments", self.list_capacity_commitments
+                ),
+                default_retry=self._budgeted_retry(
+                    retries.Retry(
+                        initial=0.1,
+                        maximum=60.0,
+                        multiplier=1.3,
+                        predicate=retries.if_exception_type(
+                            exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
+                        ),
+                    )
                 ),
                 default_timeout=60.0,
                 client_info=client_info,
             ),
             self.get_capacity_commitment: gapic_v1.method.wrap_method(
-                self.get_capacity_commitment,
-                default_retry=retries.Retry(
-                    initial=0.1,
-                    maximum=60.0,
-                    multiplier=1.3,
-                    predicate=retries.if_exception_type(
-                        exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
+                self._rate_limited(
+                    "get_capacity_commitment",
+                    self._hedged(
+                        "get_capacity_commitment", self.get_capacity_commitment
                     ),
                 ),
+                default_retry=self._budgeted_retry(
+                    retries.Retry(
+                        initial=0.1,
+                        maximum=60.0,
+                        multiplier=1.3,
+                        predicate=retries.if_exception_type(
+                            exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
+                        ),
+                    )
+                ),
                 default_timeout=60.0,
                 client_info=client_info,
             ),
             self.delete_capacity_commitment: gapic_v1.method.wrap_method(
-                self.delete_capacity_commitment,
-                default_retry=retries.Retry(
-                    initial=0.1,
-                    maximum=60.0,
-                    multiplier=1.3,
-                    predicate=retries.if_exception_type(
-                        exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
-                    ),
+                self._rate_limited(
+                    "delete_capacity_commitment", self.delete_capacity_commitment
+                ),
+                default_retry=self._budgeted_retry(
+                    retries.Retry(
+                        initial=0.1,
+                        maximum=60.0,
+                        multiplier=1.3,
+                        predicate=retries.if_exception_type(
+                            exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
+                        ),
+                    )
                 ),
                 default_timeout=60.0,
                 client_info=client_info,
             ),
             self.update_capacity_commitment: gapic_v1.method.wrap_method(
-                self.update_capacity_commitment,
+                self._rate_limited(
+                    "update_capacity_commitment", self.update_capacity_commitment
+                ),
                 default_timeout=60.0,
                 client_info=client_info,
             ),
             self.split_capacity_commitment: gapic_v1.method.wrap_method(
-                self.split_capacity_commitment,
+                self._rate_limited(
+                    "split_capacity_commitment", self.split_capacity_commitment
+                ),
                 default_timeout=60.0,
                 client_info=client_info,
             ),
             self.merge_capacity_commitments: gapic_v1.method.wrap_method(
-                self.merge_capacity_commitments,
+                self._rate_limited(
+                    "merge_capacity_commitments", self.merge_capacity_commitments
+                ),
                 default_timeout=60.0,
                 client_info=client_info,
             ),
             self.create_assignment: gapic_v1.method.wrap_method(
-                self.create_assignment, default_timeout=60.0, client_info=client_info,
+                self._rate_limited("create_assignment", self.create_assignment),
+                default_timeout=60.0,
+                client_info=client_info,
             ),
             self.list_assignments: gapic_v1.method.wrap_method(
-                self.list_assignments,
-                default_retry=retries.Retry(
-                    initial=0.1,
-                    maximum=60.0,
-                    multiplier=1.3,
-                    predicate=retries.if_exception_type(
-                        exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
-                    ),
+                self._rate_limited("list_assignments", self.list_assignments),
+                default_retry=self._budgeted_retry(
+                    retries.Retry(
+                        initial=0.1,
+                        maximum=60.0,
+                        multiplier=1.3,
+                        predicate=retries.if_exception_type(
+                            exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
+                        ),
+                    )
                 ),
                 default_timeout=60.0,
                 client_info=client_info,
             ),
             self.delete_assignment: gapic_v1.method.wrap_method(
-                self.delete_assignment,
-                default_retry=retries.Retry(
-                    initial=0.1,
-                    maximum=60.0,
-                    multiplier=1.3,
-                    predicate=retries.if_exception_type(
-                        exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
-                    ),
+                self._rate_limited("delete_assignment", self.delete_assignment),
+                default_retry=self._budgeted_retry(
+                    retries.Retry(
+                        initial=0.1,
+                        maximum=60.0,
+                        multiplier=1.3,
+                        predicate=retries.if_exception_type(
+                            exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
+                        ),
+                    )
                 ),
                 default_timeout=60.0,
                 client_info=client_info,
             ),
             self.search_assignments: gapic_v1.method.wrap_method(
-                self.search_assignments,
-                default_retry=retries.Retry(
-                    initial=0.1,
-                    maximum=60.0,
-                    multiplier=1.3,
-                    predicate=retries.if_exception_type(
-                        exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
-                    ),
+                self._rate_limited("search_assignments", self.search_assignments),
+                default_retry=self._budgeted_retry(
+                    retries.Retry(
+                        initial=0.1,
+                        maximum=60.0,
+                        multiplier=1.3,
+                        predicate=retries.if_exception_type(
+                            exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
+                        ),
+                    )
                 ),
                 default_timeout=60.0,
                 client_info=client_info,
             ),
             self.move_assignment: gapic_v1.method.wrap_method(
-                self.move_assignment, default_timeout=60.0, client_info=client_info,
+                self._rate_limited("move_assignment", self.move_assignment),
+                default_timeout=60.0,
+                client_info=client_info,
             ),
             self.get_bi_reservation: gapic_v1.method.wrap_method(
-                self.get_bi_reservation,
-                default_retry=retries.Retry(
-                    initial=0.1,
-                    maximum=60.0,
-                    multiplier=1.3,
-                    predicate=retries.if_exception_type(
-                        exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
-                    ),
+                self._rate_limited(
+                    "get_bi_reservation",
+                    self._hedged("get_bi_reservation", self.get_bi_reservation),
+                ),
+                default_retry=self._budgeted_retry(
+                    retries.Retry(
+                        initial=0.1,
+                        maximum=60.0,
+                        multiplier=1.3,
+                        predicate=retries.if_exception_type(
+                            exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
+                        ),
+                    )
                 ),
                 default_timeout=60.0,
                 client_info=client_info,
             ),
             self.update_bi_reservation: gapic_v1.method.wrap_method(
-                self.update_bi_reservation,
+                self._rate_limited("update_bi_reservation", self.update_bi_reservation),
                 default_timeout=60.0,
                 client_info=client_info,
             ),
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from typing import Any, Dict, Sequence, Tuple
+
+import grpc  # type: ignore
+
+
+class ChannelOptions:
+    """Tuning for the gRPC channels a transport opens.
+
+    Keepalive pings keep a connection that sits idle between calls from
+    being dropped by NATs and load balancers, so the next call does not
+    pay for a reconnect. Durations are in seconds; options left as
+    ``None`` keep the gRPC defaults.
+    """
+
+    def __init__(
+        self,
+        *,
+        keepalive_time: float = None,
+        keepalive_timeout: float = None,
+        keepalive_permit_without_calls: bool = None,
+        max_pings_without_data: int = None,
+        max_send_message_length: int = None,
+        max_receive_message_length: int = None,
+        compression: grpc.Compression = None,
+        options: Sequence[Tuple[str, Any]] = ()
+    ):
+        """Instantiate the channel options.
+
+        Args:
+            keepalive_time (float): How often to ping the server over an
+                open connection.
+            keepalive_timeout (float): How long to wait for the reply to
+                a ping before the connection is considered dead.
+            keepalive_permit_without_calls (bool): Whether to also ping
+                while no call is in flight. Needed to keep idle
+                connections open.
+            max_pings_without_data (int): How many pings may be sent
+                without data being sent in between. ``0`` means no limit.
+            max_send_message_length (int): The largest request message
+                to send, in bytes. ``-1`` means no limit.
+            max_receive_message_length (int): The largest response
+                message to accept, in bytes. ``-1`` means no limit.
+            compression (grpc.Compression): The compression of the
+                messages sent over the channel.
+            options (Sequence[Tuple[str, Any]]): Further raw channel
+                arguments, which take precedence over the ones above.
+        """
+        for name, value in (
+            ("keepalive_time", keepalive_time),
+            ("keepalive_timeout", keepalive_timeout),
+        ):
+            if value is not None and value <= 0:
+                raise ValueError("The {} must be positive.".format(name))
+        self.keepalive_time = keepalive_time
+        self.keepalive_timeout = keepalive_timeout
+        self.keepalive_permit_without_calls = keepalive_permit_without_calls
+        self.max_pings_without_data = max_pings_without_data
+        self.max_send_message_length = max_send_message_length
+        self.max_receive_message_length = max_receive_message_length
+        self.compression = compression
+        self.options = tuple(options)
+
+    def grpc_options(self) -> Tuple[Tuple[str, Any], ...]:
+        """Return the channel arguments, as accepted by ``grpc`` channels."""
+        options = []
+        if self.keepalive_time is not None:
+            options.append(("grpc.keepalive_time_ms", _millis(self.keepalive_time)))
+        if self.keepalive_timeout is not None:
+            options.append(
+                ("grpc.keepalive_timeout_ms", _millis(self.keepalive_timeout))
+            )
+        for name, value in (
+            (
+                "grpc.keepalive_permit_without_calls",
+                self.keepalive_permit_without_calls,
+            ),
+            ("grpc.http2.max_pings_without_data", self.max_pings_without_data),
+            ("grpc.max_send_message_length", self.max_send_message_length),
+            ("grpc.max_receive_message_length", self.max_receive_message_length),
+        ):
+            if value is not None:
+                options.append((name, int(value)))
+        names = {name for name, _ in self.options}
+        return (
+            tuple(option for option in options if option[0] not in names) + self.options
+        )
+
+    def channel_kwargs(self) -> Dict[str, Any]:
+        """Return the keyword arguments to open a channel with.
+
+        Returns:
+            Dict[str, Any]: The ``options`` and ``compression`` arguments
+                of the transport's ``create_channel``, when set.
+        """
+        kwargs = {}  # type: Dict[str, Any]
+        options = self.grpc_options()
+        if options:
+            kwargs["options"] = list(options)
+        if self.compression is not None:
+            kwargs["compression"] = self.compression
+        return kwargs
+
+
+def _millis(seconds: float) -> int:
+    return int(seconds * 1000)
+
+
+__all__ = ("ChannelOptions",)
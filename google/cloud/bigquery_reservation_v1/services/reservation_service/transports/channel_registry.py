@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+import os
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple
+import weakref
+
+from google import auth  # type: ignore
+from google.auth import credentials  # type: ignore
+
+# The registries to empty in a child process after a fork.
+_registries = weakref.WeakSet()  # type: weakref.WeakSet
+
+
+def _after_fork_in_child() -> None:
+    for registry in list(_registries):
+        registry._after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    # asyncio.get_running_loop is new in Python 3.7.
+    try:
+        if hasattr(asyncio, "get_running_loop"):
+            return asyncio.get_running_loop()
+        loop = asyncio.get_event_loop()
+    except RuntimeError:
+        return None
+    return loop if loop.is_running() else None
+
+
+def _close(channel: Any) -> None:
+    # grpc.aio channels close asynchronously; schedule that on the running
+    # loop, if any, and otherwise leave the channel to its finalizer.
+    closing = channel.close()
+    if asyncio.iscoroutine(closing):
+        loop = _running_loop()
+        if loop is not None:
+            loop.create_task(closing)
+        else:
+            closing.close()
+
+
+class ChannelRegistry:
+    """Shares channels among the transports that would open identical ones.
+
+    Channels are keyed by the transport class, host, credentials,
+    credentials file, scopes, quota project and SSL credentials.
+    Credentials and SSL credentials are compared by identity. Each
+    transport holding a channel keeps a reference to it; the channel is
+    closed once the last such transport is garbage collected.
+
+    The registry also resolves application default credentials once per
+    set of scopes and quota project, so transports created without
+    credentials share both the lookup and the channel. Safe to share
+    across threads.
+
+    In a child process after a fork the registry starts out empty: the
+    channels of the parent are left alone, neither reused nor closed.
+    """
+
+    def __init__(self):
+        # key -> [channel, references, objects pinned by the key]
+        self._channels = {}  # type: Dict[Hashable, list]
+        self._credentials = {}  # type: Dict[Hashable, credentials.Credentials]
+        self._lock = threading.Lock()
+        _registries.add(self)
+
+    def _after_fork(self) -> None:
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._channels)
+
+    def default_credentials(
+        self, scopes: Sequence[str], quota_project_id: Optional[str] = None
+    ) -> credentials.Credentials:
+        """Return the application default credentials, looking them up once.
+
+        Args:
+            scopes (Sequence[str]): The scopes to request.
+            quota_project_id (Optional[str]): The project to bill.
+        """
+        key = (tuple(scopes), quota_project_id)
+        with self._lock:
+            if key not in self._credentials:
+                self._credentials[key], _ = auth.default(
+                    scopes=scopes, quota_project_id=quota_project_id
+                )
+            return self._credentials[key]
+
+    @staticmethod
+    def key(
+        kind: type,
+        host: str,
+        *,
+        credentials: credentials.Credentials = None,
+        credentials_file: str = None,
+        scopes: Sequence[str] = None,
+        quota_project_id: str = None,
+        ssl_credentials: Any = None,
+        **kwargs
+    ) -> Tuple[Hashable, Tuple[Any, ...]]:
+        """Return the key of a channel, and the objects it refers to.
+
+        The arguments are those of the transport's ``create_channel``;
+        any other arguments are compared by value. Keys made in different
+        processes never match.
+
+        Returns:
+            Tuple[Hashable, Tuple[Any, ...]]: The key, and the objects
+                compared by identity, which must be kept alive while the
+                key is in use.
+        """
+        key = (
+            os.getpid(),
+            kind,
+            host,
+            id(credentials),
+            credentials_file,
+            tuple(scopes or ()),
+            quota_project_id,
+            id(ssl_credentials),
+            tuple(sorted((name, repr(value)) for name, value in kwargs.items())),
+        )
+        return key, (credentials, ssl_credentials)
+
+    def acquire(
+        self, key: Hashable, factory: Callable[[], Any], pinned: Tuple[Any, ...] = ()
+    ) -> Any:
+        """Return the channel for ``key``, opening it if needed.
+
+        Each call takes a reference that must be given back with
+        :meth:`release`.
+
+        Args:
+            key (Hashable): The key of the channel.
+            factory (Callable[[], Any]): Opens the channel.
+            pinned (Tuple[Any, ...]): Objects to keep alive with the channel.
+        """
+        with self._lock:
+            entry = self._channels.get(key)
+            if entry is None:
+                entry = self._channels[key] = [factory(), 0, pinned]
+            entry[1] += 1
+            return entry[0]
+
+    def release(self, key: Hashable) -> None:
+        """Give back a reference to the channel for ``key``.
+
+        The channel is closed once no references are left.
+        """
+        with self._lock:
+            entry = self._channels.get(key)
+            if entry is None:
+                return
+            entry[1] -= 1
+            if entry[1]:
+                return
+            del self._channels[key]
+        _close(entry[0])
+
+
+# The registry shared by every transport in the process that opts in.
+DEFAULT_REGISTRY = ChannelRegistry()
+
+
+__all__ = (
+    "ChannelRegistry",
+    "DEFAULT_REGISTRY",
+)
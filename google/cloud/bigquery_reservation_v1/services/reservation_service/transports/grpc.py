@@ -16,8 +16,10 @@
 #
 
 import warnings
+import weakref
 from typing import Callable, Dict, Optional, Sequence, Tuple
 
+from google.api_core import exceptions  # type: ignore
 from google.api_core import grpc_helpers  # type: ignore
 from google.api_core import gapic_v1  # type: ignore
 from google import auth  # type: ignore
@@ -31,6 +33,11 @@ from google.cloud.bigquery_reservation_v1.types import reservation as gcbr_reser
 from google.protobuf import empty_pb2 as empty  # type: ignore
 
 from .base import ReservationServiceTransport, DEFAULT_CLIENT_INFO
+from .channel_options import ChannelOptions
+from .channel_registry import ChannelRegistry
+from .hedging import HedgingPolicy
+from .rate_limit import RateLimiter
+from .retry_budget import RetryBudget
 
 
 class ReservationServiceGrpcTransport(ReservationServiceTransport):
@@ -77,6 +84,11 @@ class ReservationServiceGrpcTransport(ReservationServiceTransport):
         ssl_channel_credentials: grpc.ChannelCredentials = None,
         quota_project_id: Optional[str] = None,
         client_info: gapic_v1.client_info.ClientInfo = DEFAULT_CLIENT_INFO,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_budget: Optional[RetryBudget] = None,
+        hedging_policy: Optional[HedgingPolicy] = None,
+        channel_registry: Optional[ChannelRegistry] = None,
+        channel_options: Optional[ChannelOptions] = None,
     ) -> None:
         """Instantiate the transport.
 
@@ -112,6 +124,22 @@ class ReservationServiceGrpcTransport(ReservationServiceTransport):
                 API requests. If ``None``, then default info will be used.
                 Generally, you only need to set this if you're developing
                 your own client library.
+            rate_limiter (Optional[RateLimiter]): Paces the calls made
+                through this transport, per method. Every attempt,
+                including retries, takes a token.
+            retry_budget (Optional[RetryBudget]): Caps the retries made
+                by the default retry settings of every method of this
+                transport, which then back off with full jitter.
+            hedging_policy (Optional[HedgingPolicy]): Hedges slow calls
+                to the idempotent read methods it names. A hedged call
+                takes a single token from the rate limiter.
+            channel_registry (Optional[ChannelRegistry]): A registry to
+                share the channel through, with every transport that would
+                open an identical one. Application default credentials are
+                then also looked up through the registry.
+            channel_options (Optional[ChannelOptions]): Keepalive, message
+                size and compression settings of the channel. This argument
+                is ignored if ``channel`` is provided.
 
         Raises:
           google.auth.exceptions.MutualTLSChannelError: If mutual TLS transport
@@ -120,6 +148,10 @@ class ReservationServiceGrpcTransport(ReservationServiceTransport):
               and ``credentials_file`` are passed.
         """
         self._ssl_channel_credentials = ssl_channel_credentials
+        self._channel_registry = channel_registry
+        channel_kwargs = channel_options.channel_kwargs() if channel_options else {}
+        self._channel_args = None
+        self._channel_finalizer = None
 
         if channel:
             # Sanity check: Ensure that channel and credentials are not both
@@ -157,31 +189,37 @@ class ReservationServiceGrpcTransport(ReservationServiceTransport):
                 ssl_credentials = SslCredentials().ssl_credentials
 
             # create a new channel. The provided one is ignored.
-            self._grpc_channel = type(self).create_channel(
+            self._grpc_channel = self._open_channel(
                 host,
                 credentials=credentials,
                 credentials_file=credentials_file,
                 ssl_credentials=ssl_credentials,
                 scopes=scopes or self.AUTH_SCOPES,
                 quota_project_id=quota_project_id,
+                **channel_kwargs,
             )
             self._ssl_channel_credentials = ssl_credentials
         else:
             host = host if ":" in host else host + ":443"
 
-            if credentials is None:
+            if credentials is None and channel_registry is not None:
+                credentials = channel_registry.default_credentials(
+                    self.AUTH_SCOPES, quota_project_id
+                )
+            elif credentials is None:
                 credentials, _ = auth.default(
                     scopes=self.AUTH_SCOPES, quota_project_id=quota_project_id
                 )
 
             # create a new channel. The provided one is ignored.
-            self._grpc_channel = type(self).create_channel(
+            self._grpc_channel = self._open_channel(
                 host,
                 credentials=credentials,
                 credentials_file=credentials_file,
                 ssl_credentials=ssl_channel_credentials,
                 scopes=scopes or self.AUTH_SCOPES,
                 quota_project_id=quota_project_id,
+                **channel_kwargs,
             )
 
         self._stubs = {}  # type: Dict[str, Callable]
@@ -194,6 +232,9 @@ class ReservationServiceGrpcTransport(ReservationServiceTransport):
             scopes=scopes or self.AUTH_SCOPES,
             quota_project_id=quota_project_id,
             client_info=client_info,
+            rate_limiter=rate_limiter,
+            retry_budget=retry_budget,
+            hedging_policy=hedging_policy,
         )
 
     @classmethod
@@ -241,6 +282,77 @@ class ReservationServiceGrpcTransport(ReservationServiceTransport):
             **kwargs,
         )
 
+    def _open_channel(self, host: str, **kwargs) -> grpc.Channel:
+        """Open the channel calls are sent over.
+
+        Lifted into its own method so that subclasses can open several.
+        The arguments are those of :meth:`create_channel`. With a channel
+        registry, the channel is shared, and the reference taken on it is
+        given back once this transport is garbage collected.
+        """
+        self._channel_args = (host, dict(kwargs))
+        registry = self._channel_registry
+        if registry is None:
+            return type(self).create_channel(host, **kwargs)
+        key, pinned = registry.key(type(self), host, **kwargs)
+        channel = registry.acquire(
+            key, lambda: type(self).create_channel(host, **kwargs), pinned
+        )
+        self._channel_finalizer = weakref.finalize(self, registry.release, key)
+        return channel
+
+    def _reset_after_fork(self) -> None:
+        """Reopen the channel in a forked child process.
+
+        The channel inherited from the parent is abandoned, not closed,
+        and the stubs are rebuilt on the new channel. A channel passed in
+        by the caller is kept as it is.
+        """
+        if self._channel_args is None:
+            return
+        if self._channel_finalizer is not None:
+            self._channel_finalizer.detach()
+            self._channel_finalizer = None
+        host, kwargs = self._channel_args
+        self._grpc_channel = self._open_channel(host, **kwargs)
+        self._stubs = {}
+
+    def warm_up(self, timeout: float = None, *, fetch_token: bool = False) -> None:
+        """Prepare the transport for its first call.
+
+        Builds the stub of every RPC method, waits for the channel (every
+        channel of a pool) to connect and, optionally, fetches an access
+        token, so that the first call does not pay for them.
+
+        Args:
+            timeout (float): How long to wait for the channel to connect,
+                in seconds. If ``None``, wait indefinitely.
+            fetch_token (bool): Whether to also fetch an access token.
+
+        Raises:
+            google.api_core.exceptions.DeadlineExceeded: If the channel
+                did not connect within ``timeout``.
+        """
+        self._build_stubs()
+        if fetch_token:
+            self._fetch_token()
+        channels = self._channels()
+        ready = [grpc.channel_ready_future(channel) for channel in channels]
+        try:
+            for future in ready:
+                future.result(timeout=timeout)
+        except grpc.FutureTimeoutError:
+            raise exceptions.DeadlineExceeded(
+                "The channel did not connect within {}s.".format(timeout)
+            )
+        finally:
+            for future in ready:
+                future.cancel()
+
+    def _channels(self) -> Sequence[grpc.Channel]:
+        """Return the channels calls are sent over."""
+        return (self.grpc_channel,)
+
     @property
     def grpc_channel(self) -> grpc.Channel:
         """Return the channel designed to connect to this service.
@@ -15,11 +15,15 @@
 # limitations under the License.
 #
 
+import asyncio
 import warnings
+import weakref
 from typing import Awaitable, Callable, Dict, Optional, Sequence, Tuple
 
+from google.api_core import exceptions  # type: ignore
 from google.api_core import gapic_v1  # type: ignore
 from google.api_core import grpc_helpers_async  # type: ignore
+from google.api_core import retry as retries  # type: ignore
 from google import auth  # type: ignore
 from google.auth import credentials  # type: ignore
 from google.auth.transport.grpc import SslCredentials  # type: ignore
@@ -32,6 +36,11 @@ from google.cloud.bigquery_reservation_v1.types import reservation as gcbr_reser
 from google.protobuf import empty_pb2 as empty  # type: ignore
 
 from .base import ReservationServiceTransport, DEFAULT_CLIENT_INFO
+from .channel_options import ChannelOptions
+from .channel_registry import ChannelRegistry
+from .hedging import HedgingPolicy, hedge_async
+from .rate_limit import RateLimiter, throttle_async
+from .retry_budget import AsyncBudgetedRetry, RetryBudget
 from .grpc import ReservationServiceGrpcTransport
 
 
@@ -121,6 +130,11 @@ class ReservationServiceGrpcAsyncIOTransport(ReservationServiceTransport):
         ssl_channel_credentials: grpc.ChannelCredentials = None,
         quota_project_id=None,
         client_info: gapic_v1.client_info.ClientInfo = DEFAULT_CLIENT_INFO,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_budget: Optional[RetryBudget] = None,
+        hedging_policy: Optional[HedgingPolicy] = None,
+        channel_registry: Optional[ChannelRegistry] = None,
+        channel_options: Optional[ChannelOptions] = None,
     ) -> None:
         """Instantiate the transport.
 
@@ -157,6 +171,22 @@ class ReservationServiceGrpcAsyncIOTransport(ReservationServiceTransport):
                 API requests. If ``None``, then default info will be used.	
                 Generally, you only need to set this if you're developing	
                 your own client library.
+            rate_limiter (Optional[RateLimiter]): Paces the calls made
+                through this transport, per method. Every attempt,
+                including retries, takes a token.
+            retry_budget (Optional[RetryBudget]): Caps the retries made
+                by the default retry settings of every method of this
+                transport, which then back off with full jitter.
+            hedging_policy (Optional[HedgingPolicy]): Hedges slow calls
+                to the idempotent read methods it names. A hedged call
+                takes a single token from the rate limiter.
+            channel_registry (Optional[ChannelRegistry]): A registry to
+                share the channel through, with every transport that would
+                open an identical one. Application default credentials are
+                then also looked up through the registry.
+            channel_options (Optional[ChannelOptions]): Keepalive, message
+                size and compression settings of the channel. This argument
+                is ignored if ``channel`` is provided.
 
         Raises:
             google.auth.exceptions.MutualTlsChannelError: If mutual TLS transport
@@ -165,6 +195,9 @@ class ReservationServiceGrpcAsyncIOTransport(ReservationServiceTransport):
               and ``credentials_file`` are passed.
         """
         self._ssl_channel_credentials = ssl_channel_credentials
+        self._channel_registry = channel_registry
+        self._channel_args = None
+        channel_kwargs = channel_options.channel_kwargs() if channel_options else {}
 
         if channel:
             # Sanity check: Ensure that channel and credentials are not both
@@ -202,31 +235,37 @@ class ReservationServiceGrpcAsyncIOTransport(ReservationServiceTransport):
                 ssl_credentials = SslCredentials().ssl_credentials
 
             # create a new channel. The provided one is ignored.
-            self._grpc_channel = type(self).create_channel(
+            self._grpc_channel = self._open_channel(
                 host,
                 credentials=credentials,
                 credentials_file=credentials_file,
                 ssl_credentials=ssl_credentials,
                 scopes=scopes or self.AUTH_SCOPES,
                 quota_project_id=quota_project_id,
+                **channel_kwargs,
             )
             self._ssl_channel_credentials = ssl_credentials
         else:
             host = host if ":" in host else host + ":443"
 
-            if credentials is None:
+            if credentials is None and channel_registry is not None:
+                credentials = channel_registry.default_credentials(
+                    self.AUTH_SCOPES, quota_project_id
+                )
+            elif credentials is None:
                 credentials, _ = auth.default(
                     scopes=self.AUTH_SCOPES, quota_project_id=quota_project_id
                 )
 
             # create a new channel. The provided one is ignored.
-            self._grpc_channel = type(self).create_channel(
+            self._grpc_channel = self._open_channel(
                 host,
                 credentials=credentials,
                 credentials_file=credentials_file,
                 ssl_credentials=ssl_channel_credentials,
                 scopes=scopes or self.AUTH_SCOPES,
                 quota_project_id=quota_project_id,
+                **channel_kwargs,
             )
 
         # Run the base constructor.
@@ -237,10 +276,89 @@ class ReservationServiceGrpcAsyncIOTransport(ReservationServiceTransport):
             scopes=scopes or self.AUTH_SCOPES,
             quota_project_id=quota_project_id,
             client_info=client_info,
+            rate_limiter=rate_limiter,
+            retry_budget=retry_budget,
+            hedging_policy=hedging_policy,
         )
 
         self._stubs = {}
 
+    def _rate_limited(self, name: str, method: Callable) -> Callable:
+        """Return ``method``, paced by the rate limiter's bucket for ``name``."""
+        bucket = self._rate_limiter and self._rate_limiter.bucket_for(name)
+        if not bucket:
+            return method
+        return throttle_async(bucket, method)
+
+    def _hedged(self, name: str, method: Callable) -> Callable:
+        """Return ``method``, hedged if the hedging policy covers ``name``."""
+        policy = self._hedging_policy
+        if policy is None or not policy.hedges(name):
+            return method
+        return hedge_async(policy, name, method)
+
+    def _budgeted_retry(self, retry: retries.Retry) -> retries.Retry:
+        """Return ``retry``, drawing from the retry budget if there is one."""
+        if self._retry_budget is None:
+            return retry
+        return AsyncBudgetedRetry.from_retry(retry, self._retry_budget)
+
+    def _open_channel(self, host: str, **kwargs) -> aio.Channel:
+        """Open the channel calls are sent over.
+
+        Lifted into its own method so that subclasses can open several.
+        The arguments are those of :meth:`create_channel`. With a channel
+        registry, the channel is shared, and the reference taken on it is
+        given back once this transport is garbage collected.
+        """
+        self._channel_args = (host, dict(kwargs))
+        registry = self._channel_registry
+        if registry is None:
+            return type(self).create_channel(host, **kwargs)
+        key, pinned = registry.key(type(self), host, **kwargs)
+        channel = registry.acquire(
+            key, lambda: type(self).create_channel(host, **kwargs), pinned
+        )
+        weakref.finalize(self, registry.release, key)
+        return channel
+
+    async def warm_up(
+        self, timeout: float = None, *, fetch_token: bool = False
+    ) -> None:
+        """Prepare the transport for its first call.
+
+        Builds the stub of every RPC method, waits for the channel (every
+        channel of a pool) to connect and, optionally, fetches an access
+        token, so that the first call does not pay for them. The token is
+        fetched on the default executor, as it blocks.
+
+        Args:
+            timeout (float): How long to wait for the channel to connect,
+                in seconds. If ``None``, wait indefinitely.
+            fetch_token (bool): Whether to also fetch an access token.
+
+        Raises:
+            google.api_core.exceptions.DeadlineExceeded: If the channel
+                did not connect within ``timeout``.
+        """
+        self._build_stubs()
+        if fetch_token:
+            await asyncio.get_event_loop().run_in_executor(None, self._fetch_token)
+        channels = self._channels()
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(channel.channel_ready() for channel in channels)),
+                timeout,
+            )
+        except asyncio.TimeoutError:
+            raise exceptions.DeadlineExceeded(
+                "The channel did not connect within {}s.".format(timeout)
+            )
+
+    def _channels(self) -> Sequence[aio.Channel]:
+        """Return the channels calls are sent over."""
+        return (self.grpc_channel,)
+
     @property
     def grpc_channel(self) -> aio.Channel:
         """Create the channel designed to connect to this service.
@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+import collections
+import math
+import queue
+import threading
+import time
+from typing import Any, Callable, Deque, Dict, Sequence
+
+import grpc  # type: ignore
+from grpc.experimental import aio  # type: ignore
+
+# The idempotent reads whose calls may be hedged.
+HEDGEABLE_METHODS = (
+    "get_reservation",
+    "get_capacity_commitment",
+    "get_bi_reservation",
+)
+
+
+class HedgingPolicy:
+    """Decides when a slow read is sent a second time.
+
+    A call that has not completed after the ``percentile``-th percentile
+    of the recent latencies of its method is hedged: an identical call is
+    sent, the first of the two to complete is used and the other is
+    cancelled. Until ``min_samples`` latencies are known, ``initial_delay``
+    is used instead. Each call earns ``max_ratio`` of a hedge, up to
+    ``burst`` hedges, so at most that fraction of calls is hedged over
+    time. Safe to share across threads.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        *,
+        methods: Sequence[str] = HEDGEABLE_METHODS,
+        initial_delay: float = 1.0,
+        min_delay: float = 0.01,
+        max_delay: float = 10.0,
+        max_ratio: float = 0.05,
+        burst: float = 10.0,
+        window: int = 200,
+        min_samples: int = 20,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """Instantiate the policy.
+
+        Args:
+            percentile (float): The percentile of recent latencies after
+                which a call is hedged, between 0 and 100.
+            methods (Sequence[str]): The names of the methods to hedge.
+                Only idempotent methods may be hedged.
+            initial_delay (float): The delay used until enough latencies
+                are known, in seconds.
+            min_delay (float): The shortest delay, in seconds.
+            max_delay (float): The longest delay, in seconds.
+            max_ratio (float): The fraction of calls that may be hedged.
+            burst (float): The number of hedges that may be sent at once
+                after a quiet period.
+            window (int): The number of recent latencies kept per method.
+            min_samples (int): The number of latencies needed before the
+                percentile is used.
+            clock (Callable[[], float]): The source of the current time,
+                in seconds.
+        """
+        if not 0 < percentile <= 100:
+            raise ValueError("The percentile must be in (0, 100].")
+        unknown = set(methods) - set(HEDGEABLE_METHODS)
+        if unknown:
+            raise ValueError(
+                "Only idempotent reads may be hedged, not: {}".format(
+                    ", ".join(sorted(unknown))
+                )
+            )
+        self._percentile = percentile
+        self._methods = frozenset(methods)
+        self._initial_delay = initial_delay
+        self._min_delay = min_delay
+        self._max_delay = max_delay
+        self._max_ratio = max_ratio
+        self._burst = burst
+        self._window = window
+        self._min_samples = min_samples
+        self._clock = clock
+        self._latencies = {}  # type: Dict[str, Deque[float]]
+        self._tokens = burst
+        self._lock = threading.Lock()
+
+    def hedges(self, method: str) -> bool:
+        """Return whether calls to ``method`` are hedged."""
+        return method in self._methods
+
+    def delay(self, method: str) -> float:
+        """Return how long a call to ``method`` runs before it is hedged."""
+        with self._lock:
+            latencies = sorted(self._latencies.get(method, ()))
+        if len(latencies) < self._min_samples:
+            return self._initial_delay
+        rank = math.ceil(self._percentile / 100 * len(latencies))
+        return min(self._max_delay, max(self._min_delay, latencies[rank - 1]))
+
+    def record(self, method: str, latency: float) -> None:
+        """Note that a call to ``method`` completed after ``latency`` seconds.
+
+        Each completed call also earns a fraction of a hedge.
+        """
+        with self._lock:
+            latencies = self._latencies.get(method)
+            if latencies is None:
+                latencies = self._latencies[method] = collections.deque(
+                    maxlen=self._window
+                )
+            latencies.append(latency)
+            self._tokens = min(self._burst, self._tokens + self._max_ratio)
+
+    def try_hedge(self) -> bool:
+        """Withdraw a hedge, if the hedge rate allows one.
+
+        Returns:
+            bool: True if the hedge may be sent.
+        """
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+def _first_success(calls):
+    # Block until one of the grpc futures succeeds, and return it. If
+    # every one of them fails, return the last to fail.
+    finished = queue.Queue()
+    for call in calls:
+        call.add_done_callback(finished.put)
+    for _ in calls:
+        call = finished.get()
+        if not call.cancelled() and call.exception() is None:
+            break
+    return call
+
+
+def hedge(
+    policy: HedgingPolicy, name: str, method: grpc.UnaryUnaryMultiCallable
+) -> Callable[..., Any]:
+    """Wrap a unary stub so that slow calls are hedged.
+
+    The response of the first call to succeed is returned; an error is
+    only raised once every call has failed.
+
+    Args:
+        policy (~.HedgingPolicy): Decides when to hedge.
+        name (str): The name of the method, e.g. ``get_reservation``.
+        method (grpc.UnaryUnaryMultiCallable): The stub. Its calls are
+            made through ``future`` so that the loser can be cancelled.
+    """
+
+    def hedged(request, timeout=None, **kwargs):
+        start = policy._clock()
+        primary = method.future(request, timeout=timeout, **kwargs)
+        try:
+            response = primary.result(timeout=policy.delay(name))
+        except grpc.FutureTimeoutError:
+            pass
+        else:
+            policy.record(name, policy._clock() - start)
+            return response
+
+        winner = primary
+        if policy.try_hedge():
+            if timeout is not None:
+                timeout = max(0.0, timeout - (policy._clock() - start))
+            backup = method.future(request, timeout=timeout, **kwargs)
+            winner = _first_success((primary, backup))
+            (backup if winner is primary else primary).cancel()
+        response = winner.result()
+        policy.record(name, policy._clock() - start)
+        return response
+
+    return hedged
+
+
+class _HedgedCall:
+    """An awaitable RPC that is sent a second time if it is slow."""
+
+    def __init__(self, policy, name, method, args, kwargs):
+        self._policy = policy
+        self._name = name
+        self._method = method
+        self._args = args
+        self._kwargs = kwargs
+
+    def _start(self):
+        call = self._method(*self._args, **self._kwargs)
+        return call, asyncio.ensure_future(call)
+
+    async def _run(self):
+        policy = self._policy
+        start = policy._clock()
+        calls = dict((self._start(),))
+        try:
+            delay = policy.delay(self._name)
+            done, pending = await asyncio.wait(calls.values(), timeout=delay)
+            if not done and policy.try_hedge():
+                call, task = self._start()
+                calls[call] = task
+                pending.add(task)
+            # Use the first call to succeed; fail once every call has.
+            while True:
+                for task in done:
+                    failed = task
+                    if task.exception() is None:
+                        policy.record(self._name, policy._clock() - start)
+                        return task.result()
+                if not pending:
+                    return failed.result()
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+        finally:
+            for call, task in calls.items():
+                if not task.done():
+                    call.cancel()
+                    task.cancel()
+
+    def __await__(self):
+        return self._run().__await__()
+
+
+class _HedgedUnaryUnaryMultiCallable(aio.UnaryUnaryMultiCallable):
+    """A unary stub whose slow calls are hedged."""
+
+    def __init__(
+        self, policy: HedgingPolicy, name: str, method: aio.UnaryUnaryMultiCallable
+    ):
+        self._policy = policy
+        self._name = name
+        self._method = method
+
+    def __call__(self, *args, **kwargs):
+        return _HedgedCall(self._policy, self._name, self._method, args, kwargs)
+
+
+def hedge_async(
+    policy: HedgingPolicy, name: str, method: aio.UnaryUnaryMultiCallable
+) -> aio.UnaryUnaryMultiCallable:
+    """Wrap an async unary stub so that slow calls are hedged.
+
+    The result is itself a unary stub, so it can be wrapped by
+    :func:`google.api_core.gapic_v1.method_async.wrap_method`.
+    """
+    return _HedgedUnaryUnaryMultiCallable(policy, name, method)
+
+
+__all__ = (
+    "HEDGEABLE_METHODS",
+    "HedgingPolicy",
+    "hedge",
+    "hedge_async",
+)
@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+import itertools
+import threading
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import grpc  # type: ignore
+from grpc.experimental import aio  # type: ignore
+
+from .grpc import ReservationServiceGrpcTransport
+from .grpc_asyncio import ReservationServiceGrpcAsyncIOTransport
+
+# The ways a pool can pick the channel for a call.
+ROUND_ROBIN = "round_robin"
+LEAST_OUTSTANDING = "least_outstanding"
+
+# Channels with identical arguments share their connections through the
+# process-wide subchannel pool unless told otherwise.
+_LOCAL_SUBCHANNEL_POOL = ("grpc.use_local_subchannel_pool", 1)
+
+
+class ChannelPool:
+    """A set of channels that calls are spread over.
+
+    Stands in for a single ``grpc.Channel``: :meth:`unary_unary` returns
+    a stub that sends each call over one of the channels, picked in turn
+    (``round_robin``) or as the one with the fewest calls in flight
+    (``least_outstanding``). Each channel keeps its own stubs.
+    """
+
+    def __init__(self, channels: Sequence[Any], dispatch: str = ROUND_ROBIN):
+        """Instantiate the pool.
+
+        Args:
+            channels (Sequence[grpc.Channel]): The channels to spread
+                calls over.
+            dispatch (str): How to pick the channel for a call, either
+                ``round_robin`` or ``least_outstanding``.
+        """
+        if not channels:
+            raise ValueError("A channel pool needs at least one channel.")
+        if dispatch not in (ROUND_ROBIN, LEAST_OUTSTANDING):
+            raise ValueError("Unknown dispatch policy: {!r}".format(dispatch))
+        self._channels = tuple(channels)
+        self._dispatch = dispatch
+        self._stubs = [{} for _ in self._channels]  # type: List[Dict[str, Callable]]
+        self._outstanding = [0] * len(self._channels)
+        self._turns = itertools.count()
+        self._lock = threading.Lock()
+
+    @property
+    def channels(self) -> Tuple[Any, ...]:
+        """The channels of the pool."""
+        return self._channels
+
+    @property
+    def outstanding(self) -> Tuple[int, ...]:
+        """The number of calls in flight on each channel."""
+        with self._lock:
+            return tuple(self._outstanding)
+
+    def _acquire(self) -> int:
+        with self._lock:
+            size = len(self._channels)
+            start = next(self._turns) % size
+            if self._dispatch == LEAST_OUTSTANDING:
+                # Rotate the starting point so that ties are spread too.
+                index = min(
+                    ((start + offset) % size for offset in range(size)),
+                    key=self._outstanding.__getitem__,
+                )
+            else:
+                index = start
+            self._outstanding[index] += 1
+            return index
+
+    def _release(self, index: int) -> None:
+        with self._lock:
+            self._outstanding[index] -= 1
+
+    def _stub(self, index: int, method: str, **kwargs) -> Callable:
+        stubs = self._stubs[index]
+        if method not in stubs:
+            stubs[method] = self._channels[index].unary_unary(method, **kwargs)
+        return stubs[method]
+
+    def unary_unary(self, method: str, **kwargs) -> grpc.UnaryUnaryMultiCallable:
+        """Return a stub for ``method`` that dispatches over the pool.
+
+        Args:
+            method (str): The name of the RPC method.
+            kwargs: The serializers, as accepted by
+                ``grpc.Channel.unary_unary``.
+        """
+        stubs = [self._stub(i, method, **kwargs) for i in range(len(self._channels))]
+        return _PooledUnaryUnaryMultiCallable(self, stubs)
+
+    def close(self) -> None:
+        """Close every channel of the pool."""
+        for channel in self._channels:
+            channel.close()
+
+
+class _PooledUnaryUnaryMultiCallable(grpc.UnaryUnaryMultiCallable):
+    """A unary stub that sends each call over a channel of a pool."""
+
+    def __init__(self, pool: ChannelPool, stubs: Sequence[Callable]):
+        self._pool = pool
+        self._stubs = stubs
+
+    def _blocking(self, attr, request, *args, **kwargs):
+        index = self._pool._acquire()
+        try:
+            return getattr(self._stubs[index], attr)(request, *args, **kwargs)
+        finally:
+            self._pool._release(index)
+
+    def __call__(self, request, *args, **kwargs):
+        return self._blocking("__call__", request, *args, **kwargs)
+
+    def with_call(self, request, *args, **kwargs):
+        return self._blocking("with_call", request, *args, **kwargs)
+
+    def future(self, request, *args, **kwargs):
+        index = self._pool._acquire()
+        try:
+            future = self._stubs[index].future(request, *args, **kwargs)
+        except BaseException:
+            self._pool._release(index)
+            raise
+        future.add_done_callback(lambda _: self._pool._release(index))
+        return future
+
+
+class AsyncChannelPool(ChannelPool):
+    """The asyncio counterpart of :class:`ChannelPool`."""
+
+    def unary_unary(self, method: str, **kwargs) -> aio.UnaryUnaryMultiCallable:
+        """Return a stub for ``method`` that dispatches over the pool.
+
+        Args:
+            method (str): The name of the RPC method.
+            kwargs: The serializers, as accepted by
+                ``grpc.aio.Channel.unary_unary``.
+        """
+        stubs = [self._stub(i, method, **kwargs) for i in range(len(self._channels))]
+        return _PooledAioUnaryUnaryMultiCallable(self, stubs)
+
+    async def close(self, grace: float = None) -> None:
+        """Close every channel of the pool."""
+        await asyncio.gather(*(channel.close(grace) for channel in self._channels))
+
+
+class _PooledAioUnaryUnaryMultiCallable(aio.UnaryUnaryMultiCallable):
+    """An async unary stub that sends each call over a channel of a pool."""
+
+    def __init__(self, pool: AsyncChannelPool, stubs: Sequence[Callable]):
+        self._pool = pool
+        self._stubs = stubs
+
+    def __call__(self, *args, **kwargs):
+        index = self._pool._acquire()
+        try:
+            call = self._stubs[index](*args, **kwargs)
+        except BaseException:
+            self._pool._release(index)
+            raise
+        call.add_done_callback(lambda _: self._pool._release(index))
+        return call
+
+
+def _pool_options(kwargs):
+    # Give each channel of the pool connections of its own.
+    kwargs["options"] = list(kwargs.get("options", ())) + [_LOCAL_SUBCHANNEL_POOL]
+    return kwargs
+
+
+class ReservationServicePooledGrpcTransport(ReservationServiceGrpcTransport):
+    """gRPC backend transport for ReservationService over a channel pool.
+
+    Calls are spread over ``pool_size`` channels, each with connections
+    of its own, so that concurrent calls are not limited by the number
+    of streams a single HTTP/2 connection allows.
+    The pooled channels are never shared through a channel registry.
+    Clients select it with ``transport="grpc_pool"``.
+    """
+
+    def __init__(
+        self, *, pool_size: int = 4, dispatch: str = ROUND_ROBIN, **kwargs
+    ) -> None:
+        """Instantiate the transport.
+
+        Args:
+            pool_size (int): The number of channels to open.
+            dispatch (str): How to pick the channel for a call, either
+                ``round_robin`` or ``least_outstanding``.
+            kwargs: The arguments of
+                :class:`~.ReservationServiceGrpcTransport`. A ``channel``
+                may be a :class:`ChannelPool`; a single channel is used as
+                a pool of one.
+        """
+        if pool_size < 1:
+            raise ValueError("The pool size must be at least one.")
+        self._pool_size = pool_size
+        self._dispatch = dispatch
+        channel = kwargs.get("channel")
+        if channel is not None and not isinstance(channel, ChannelPool):
+            kwargs["channel"] = ChannelPool([channel], dispatch)
+        super().__init__(**kwargs)
+
+    def _open_channel(self, host: str, **kwargs) -> ChannelPool:
+        self._channel_args = (host, dict(kwargs))
+        _pool_options(kwargs)
+        return ChannelPool(
+            [type(self).create_channel(host, **kwargs) for _ in range(self._pool_size)],
+            self._dispatch,
+        )
+
+    def _channels(self) -> Sequence[grpc.Channel]:
+        return self.channel_pool.channels
+
+    @property
+    def channel_pool(self) -> ChannelPool:
+        """Return the pool of channels calls are spread over."""
+        return self._grpc_channel
+
+
+class ReservationServicePooledGrpcAsyncIOTransport(
+    ReservationServiceGrpcAsyncIOTransport
+):
+    """gRPC AsyncIO backend transport for ReservationService over a pool.
+
+    The asyncio counterpart of :class:`ReservationServicePooledGrpcTransport`.
+    Clients select it with ``transport="grpc_asyncio_pool"``.
+    """
+
+    def __init__(
+        self, *, pool_size: int = 4, dispatch: str = ROUND_ROBIN, **kwargs
+    ) -> None:
+        """Instantiate the transport.
+
+        Args:
+            pool_size (int): The number of channels to open.
+            dispatch (str): How to pick the channel for a call, either
+                ``round_robin`` or ``least_outstanding``.
+            kwargs: The arguments of
+                :class:`~.ReservationServiceGrpcAsyncIOTransport`. A
+                ``channel`` may be an :class:`AsyncChannelPool`; a single
+                channel is used as a pool of one.
+        """
+        if pool_size < 1:
+            raise ValueError("The pool size must be at least one.")
+        self._pool_size = pool_size
+        self._dispatch = dispatch
+        channel = kwargs.get("channel")
+        if channel is not None and not isinstance(channel, AsyncChannelPool):
+            kwargs["channel"] = AsyncChannelPool([channel], dispatch)
+        super().__init__(**kwargs)
+
+    def _open_channel(self, host: str, **kwargs) -> AsyncChannelPool:
+        self._channel_args = (host, dict(kwargs))
+        _pool_options(kwargs)
+        return AsyncChannelPool(
+            [type(self).create_channel(host, **kwargs) for _ in range(self._pool_size)],
+            self._dispatch,
+        )
+
+    def _channels(self) -> Sequence[aio.Channel]:
+        return self.channel_pool.channels
+
+    @property
+    def channel_pool(self) -> AsyncChannelPool:
+        """Return the pool of channels calls are spread over."""
+        return self._grpc_channel
+
+
+__all__ = (
+    "AsyncChannelPool",
+    "ChannelPool",
+    "LEAST_OUTSTANDING",
+    "ROUND_ROBIN",
+    "ReservationServicePooledGrpcAsyncIOTransport",
+    "ReservationServicePooledGrpcTransport",
+)
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+import functools
+import threading
+import time
+from typing import Any, Callable, Mapping, Optional
+
+from grpc.experimental import aio  # type: ignore
+
+# The methods that only read state, and those that change it.
+READ_METHODS = (
+    "list_reservations",
+    "get_reservation",
+    "list_capacity_commitments",
+    "get_capacity_commitment",
+    "list_assignments",
+    "search_assignments",
+    "get_bi_reservation",
+)
+WRITE_METHODS = (
+    "create_reservation",
+    "delete_reservation",
+    "update_reservation",
+    "create_capacity_commitment",
+    "delete_capacity_commitment",
+    "update_capacity_commitment",
+    "split_capacity_commitment",
+    "merge_capacity_commitments",
+    "create_assignment",
+    "delete_assignment",
+    "move_assignment",
+    "update_bi_reservation",
+)
+
+
+class TokenBucket:
+    """A token bucket that paces calls to a sustained rate.
+
+    The bucket holds up to ``capacity`` tokens and refills at ``rate``
+    tokens per second. Each call takes a token; a call that finds the
+    bucket empty reserves the next token and waits for it, so waiting
+    callers are served in arrival order. Safe to share across threads.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float = None,
+        *,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """Instantiate the bucket.
+
+        Args:
+            rate (float): The sustained number of calls per second.
+            capacity (float): The number of calls that may burst at once.
+                Defaults to ``rate``, i.e. one second worth of calls.
+            clock (Callable[[], float]): The source of the current time,
+                in seconds.
+        """
+        if rate <= 0:
+            raise ValueError("The rate must be positive.")
+        self._rate = rate
+        self._capacity = rate if capacity is None else capacity
+        self._clock = clock
+        self._tokens = self._capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token, reserving it ahead of time if none is left.
+
+        Returns:
+            float: The number of seconds to wait before making the call.
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self._capacity, self._tokens + (now - self._updated) * self._rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self._rate)
+
+    def acquire(self) -> None:
+        """Take a token, blocking until it is available."""
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        """Take a token, waiting without blocking the event loop."""
+        delay = self.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class RateLimiter:
+    """Assigns a token bucket to each RPC method of a transport.
+
+    Methods mapped to the same bucket share its budget. Methods without a
+    bucket of their own use the default one, if any, and are otherwise
+    not limited.
+    """
+
+    def __init__(
+        self, buckets: Mapping[str, TokenBucket] = None, default: TokenBucket = None
+    ):
+        """Instantiate the limiter.
+
+        Args:
+            buckets (Mapping[str, ~.TokenBucket]): The bucket of each
+                method, keyed by method name, e.g. ``list_reservations``.
+            default (Optional[~.TokenBucket]): The bucket of the other
+                methods.
+        """
+        self._buckets = dict(buckets or {})
+        self._default = default
+
+    @classmethod
+    def per_kind(
+        cls, read: TokenBucket = None, write: TokenBucket = None
+    ) -> "RateLimiter":
+        """Build a limiter with one budget for reads and one for writes.
+
+        Args:
+            read (Optional[~.TokenBucket]): The bucket shared by the
+                methods that only read state.
+            write (Optional[~.TokenBucket]): The bucket shared by the
+                methods that change state.
+        """
+        buckets = {}
+        for names, bucket in ((READ_METHODS, read), (WRITE_METHODS, write)):
+            if bucket is not None:
+                buckets.update(dict.fromkeys(names, bucket))
+        return cls(buckets)
+
+    def bucket_for(self, method: str) -> Optional[TokenBucket]:
+        """Return the bucket limiting ``method``, if any."""
+        return self._buckets.get(method, self._default)
+
+
+def throttle(bucket: TokenBucket, method: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap ``method`` so that each call first takes a token from ``bucket``."""
+
+    @functools.wraps(method)
+    def throttled(*args, **kwargs):
+        bucket.acquire()
+        return method(*args, **kwargs)
+
+    return throttled
+
+
+class _PacedCall:
+    """An awaitable RPC that is only started once a token is available."""
+
+    def __init__(self, bucket, method, args, kwargs):
+        self._bucket = bucket
+        self._method = method
+        self._args = args
+        self._kwargs = kwargs
+
+    def __await__(self):
+        yield from self._bucket.acquire_async().__await__()
+        call = self._method(*self._args, **self._kwargs)
+        return (yield from call.__await__())
+
+
+class _PacedUnaryUnaryMultiCallable(aio.UnaryUnaryMultiCallable):
+    """A unary stub whose calls first await a token from a bucket."""
+
+    def __init__(self, bucket: TokenBucket, method: aio.UnaryUnaryMultiCallable):
+        self._bucket = bucket
+        self._method = method
+
+    def __call__(self, *args, **kwargs):
+        return _PacedCall(self._bucket, self._method, args, kwargs)
+
+
+def throttle_async(
+    bucket: TokenBucket, method: aio.UnaryUnaryMultiCallable
+) -> aio.UnaryUnaryMultiCallable:
+    """Wrap an async unary stub so that each call first awaits a token.
+
+    The RPC is only started once the token is available. The result is
+    itself a unary stub, so it can be wrapped by
+    :func:`google.api_core.gapic_v1.method_async.wrap_method`.
+    """
+    return _PacedUnaryUnaryMultiCallable(bucket, method)
+
+
+__all__ = (
+    "RateLimiter",
+    "TokenBucket",
+    "READ_METHODS",
+    "WRITE_METHODS",
+    "throttle",
+    "throttle_async",
+)
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import collections
+import functools
+import math
+import random
+import threading
+import time
+from typing import Any, Callable, Iterator
+
+from google.api_core import exceptions  # type: ignore
+from google.api_core import retry as retries  # type: ignore
+from google.api_core import retry_async  # type: ignore
+
+
+class RetryBudget:
+    """Caps retries at a fraction of the calls that recently succeeded.
+
+    Over a sliding window of ``window`` seconds, at most ``ratio`` retries
+    are allowed per successful call, plus ``min_per_second`` retries per
+    second so that a quiet transport can still retry. While a dependency
+    is failing few calls succeed, so retries dry up instead of
+    multiplying the load. Safe to share across threads.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.1,
+        min_per_second: float = 1.0,
+        window: int = 10,
+        *,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """Instantiate the budget.
+
+        Args:
+            ratio (float): The number of retries allowed per success.
+            min_per_second (float): The number of retries allowed per
+                second regardless of successes.
+            window (int): The number of seconds of history considered.
+            clock (Callable[[], float]): The source of the current time,
+                in seconds.
+        """
+        if ratio < 0 or min_per_second < 0:
+            raise ValueError("The ratio and minimum must not be negative.")
+        if window < 1:
+            raise ValueError("The window must be at least one second.")
+        self._ratio = ratio
+        self._reserve = min_per_second * window
+        self._window = int(window)
+        self._clock = clock
+        # One [second, successes, retries] entry per second of the window.
+        self._slots = collections.deque()
+        self._successes = 0
+        self._retries = 0
+        self._lock = threading.Lock()
+
+    def _slot(self) -> list:
+        second = math.floor(self._clock())
+        while self._slots and self._slots[0][0] <= second - self._window:
+            _, successes, retries = self._slots.popleft()
+            self._successes -= successes
+            self._retries -= retries
+        if not self._slots or self._slots[-1][0] != second:
+            self._slots.append([second, 0, 0])
+        return self._slots[-1]
+
+    @property
+    def available(self) -> float:
+        """The number of retries currently allowed."""
+        with self._lock:
+            self._slot()
+            return self._reserve + self._ratio * self._successes - self._retries
+
+    def record_success(self) -> None:
+        """Note that a call succeeded."""
+        with self._lock:
+            self._slot()[1] += 1
+            self._successes += 1
+
+    def try_retry(self) -> bool:
+        """Withdraw a retry from the budget.
+
+        Returns:
+            bool: True if the retry may be made, False if the budget is
+                spent.
+        """
+        with self._lock:
+            slot = self._slot()
+            if self._retries + 1 > self._reserve + self._ratio * self._successes:
+                return False
+            slot[2] += 1
+            self._retries += 1
+            return True
+
+    def refund(self) -> None:
+        """Give back a retry withdrawn by :meth:`try_retry` but not made."""
+        with self._lock:
+            self._slot()
+            for slot in reversed(self._slots):
+                if slot[2]:
+                    slot[2] -= 1
+                    self._retries -= 1
+                    return
+
+
+def full_jitter(
+    initial: float, maximum: float, multiplier: float = 2.0
+) -> Iterator[float]:
+    """Yield exponentially growing delays with full jitter.
+
+    The n-th delay is drawn uniformly between zero and
+    ``min(maximum, initial * multiplier ** n)``, so that calls which
+    failed together do not retry together.
+
+    Args:
+        initial (float): The bound of the first delay.
+        maximum (float): The largest bound of any delay.
+        multiplier (float): The factor each bound grows by.
+    """
+    bound = min(initial, maximum)
+    while True:
+        yield random.uniform(0.0, bound)
+        bound = min(bound * multiplier, maximum)
+
+
+class _BudgetedPredicate:
+    # Withdraws a retry from the budget for each retryable error. The
+    # retry loop checks its deadline only after the predicate, so the
+    # retry withdrawn for the last error may never be made; it is then
+    # given back with ``refund``.
+
+    def __init__(self, budget: RetryBudget, predicate: Callable):
+        self._budget = budget
+        self._predicate = predicate
+        self._withdrawn = False
+
+    def __call__(self, exc: Exception) -> bool:
+        self._withdrawn = bool(self._predicate(exc) and self._budget.try_retry())
+        return self._withdrawn
+
+    def refund(self) -> None:
+        if self._withdrawn:
+            self._withdrawn = False
+            self._budget.refund()
+
+
+class _Budgeted:
+    # The budget handling shared by the sync and async retries. The
+    # ``with_*`` methods of the base classes return plain retries, so
+    # their results are re-bound to the budget.
+
+    def __init__(self, budget: RetryBudget, **kwargs):
+        """Instantiate the retry.
+
+        Args:
+            budget (~.RetryBudget): The budget retries are drawn from.
+            kwargs: The arguments of the base retry class.
+        """
+        super().__init__(**kwargs)
+        self._budget = budget
+
+    @classmethod
+    def from_retry(cls, retry: Any, budget: RetryBudget) -> Any:
+        """Return a copy of ``retry`` that draws from ``budget``."""
+        return cls(
+            budget,
+            predicate=retry._predicate,
+            initial=retry._initial,
+            maximum=retry._maximum,
+            multiplier=retry._multiplier,
+            deadline=retry._deadline,
+            on_error=retry._on_error,
+        )
+
+    def with_deadline(self, deadline):
+        return self.from_retry(super().with_deadline(deadline), self._budget)
+
+    def with_timeout(self, timeout):
+        return self.from_retry(super().with_timeout(timeout), self._budget)
+
+    def with_predicate(self, predicate):
+        return self.from_retry(super().with_predicate(predicate), self._budget)
+
+    def with_delay(self, initial=None, maximum=None, multiplier=None):
+        return self.from_retry(
+            super().with_delay(initial, maximum, multiplier), self._budget
+        )
+
+
+class BudgetedRetry(_Budgeted, retries.Retry):
+    """A :class:`~google.api_core.retry.Retry` that draws from a budget.
+
+    Each retry withdraws from the shared :class:`RetryBudget`, and is not
+    made once the budget is spent; the error is raised instead. Each
+    successful attempt is credited to the budget. Delays between
+    attempts use :func:`full_jitter`.
+    """
+
+    def __call__(self, func: Callable, on_error: Callable = None) -> Callable:
+        if self._on_error is not None:
+            on_error = self._on_error
+
+        @functools.wraps(func)
+        def retry_wrapped_func(*args, **kwargs):
+            def attempt():
+                result = func(*args, **kwargs)
+                self._budget.record_success()
+                return result
+
+            predicate = _BudgetedPredicate(self._budget, self._predicate)
+            try:
+                return retries.retry_target(
+                    attempt,
+                    predicate,
+                    full_jitter(self._initial, self._maximum, self._multiplier),
+                    self._deadline,
+                    on_error=on_error,
+                )
+            except exceptions.RetryError:
+                # The deadline passed before the last retry was made.
+                predicate.refund()
+                raise
+
+        return retry_wrapped_func
+
+
+class AsyncBudgetedRetry(_Budgeted, retry_async.AsyncRetry):
+    """The asyncio counterpart of :class:`BudgetedRetry`."""
+
+    def __call__(self, func: Callable, on_error: Callable = None) -> Callable:
+        if self._on_error is not None:
+            on_error = self._on_error
+
+        @functools.wraps(func)
+        async def retry_wrapped_func(*args, **kwargs):
+            async def attempt():
+                result = await func(*args, **kwargs)
+                self._budget.record_success()
+                return result
+
+            predicate = _BudgetedPredicate(self._budget, self._predicate)
+            try:
+                return await retry_async.retry_target(
+                    attempt,
+                    predicate,
+                    full_jitter(self._initial, self._maximum, self._multiplier),
+                    self._deadline,
+                    on_error=on_error,
+                )
+            except exceptions.RetryError:
+                # The deadline passed before the last retry was made.
+                predicate.refund()
+                raise
+
+        return retry_wrapped_func
+
+
+__all__ = (
+    "AsyncBudgetedRetry",
+    "BudgetedRetry",
+    "RetryBudget",
+    "full_jitter",
+)
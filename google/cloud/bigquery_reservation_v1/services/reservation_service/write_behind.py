@@ -0,0 +1,369 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+from concurrent import futures
+import threading
+from typing import Any, Dict, List, Sequence, Set, Tuple
+
+from google.api_core import gapic_v1  # type: ignore
+from google.api_core import retry as retries  # type: ignore
+import proto  # type: ignore
+
+from google.cloud.bigquery_reservation_v1.services.reservation_service import bulk
+from google.cloud.bigquery_reservation_v1.types import reservation
+from google.protobuf import field_mask_pb2 as field_mask  # type: ignore
+
+# The client method and its resource argument, per updatable resource type.
+_UPDATE_METHODS = {
+    reservation.Reservation: ("update_reservation", "reservation"),
+    reservation.CapacityCommitment: (
+        "update_capacity_commitment",
+        "capacity_commitment",
+    ),
+    reservation.BiReservation: ("update_bi_reservation", "bi_reservation"),
+}
+
+
+class _Pending:
+    """The merged updates to one resource that have not been sent yet."""
+
+    def __init__(self, resource: proto.Message):
+        self.resource = type(resource)()
+        self.paths = []  # type: List[str]
+        self.waiters = []  # type: List[Any]
+        self.timer = None  # type: Any
+
+    def merge(self, resource: proto.Message, update_mask: field_mask.FieldMask):
+        # Later updates win for the fields they name; the masks are unioned.
+        update_mask.MergeMessage(
+            type(resource).pb(resource), type(self.resource).pb(self.resource)
+        )
+        self.resource.name = resource.name
+        for path in update_mask.paths:
+            if path not in self.paths:
+                self.paths.append(path)
+
+    def claim(self) -> None:
+        # Drop the concurrent futures cancelled by their callers, and mark
+        # the others running, so that they can no longer be cancelled
+        # between the check in resolve() and their result being set.
+        self.waiters = [
+            waiter for waiter in self.waiters if waiter.set_running_or_notify_cancel()
+        ]
+
+    def resolve(self, response: Any = None, error: Exception = None) -> None:
+        for waiter in self.waiters:
+            if waiter.done():
+                # Cancelled by its caller.
+                continue
+            if error is None:
+                waiter.set_result(response)
+            else:
+                waiter.set_exception(error)
+
+    def send(self, client, retry, timeout, metadata):
+        method, argument = _UPDATE_METHODS[type(self.resource)]
+        return getattr(client, method)(
+            **{argument: self.resource},
+            update_mask=field_mask.FieldMask(paths=self.paths),
+            retry=retry,
+            timeout=timeout,
+            metadata=metadata
+        )
+
+
+def _check_update(resource: proto.Message, update_mask: field_mask.FieldMask):
+    if type(resource) not in _UPDATE_METHODS:
+        raise ValueError("Cannot update a {}.".format(type(resource).__name__))
+    if not resource.name:
+        raise ValueError("The resource to update must have a name.")
+    if not update_mask.paths:
+        raise ValueError("The update mask must name at least one field.")
+
+
+class UpdateQueue:
+    """Merges rapid successive updates to a resource into a single call.
+
+    Updates submitted for the same resource name within ``delay`` seconds
+    of the first one are merged: each field takes the value of the latest
+    update that names it, and the update masks are unioned. The merged
+    update is sent when the window closes or on :meth:`flush`. Updates to
+    one resource are sent one call at a time, in submission order, while
+    those to different resources are sent concurrently.
+
+    Reservations, capacity commitments and BI reservations can be
+    queued. The queue is safe to share across threads.
+    """
+
+    def __init__(
+        self,
+        client,
+        *,
+        delay: float = 0.5,
+        max_workers: int = 8,
+        retry: retries.Retry = gapic_v1.method.DEFAULT,
+        timeout: float = None,
+        metadata: Sequence[Tuple[str, str]] = ()
+    ):
+        """Instantiate the queue.
+
+        Args:
+            client (~.ReservationServiceClient): The client to send the
+                updates with.
+            delay (float): The number of seconds updates to a resource
+                are held, counted from the first one, before being sent.
+            max_workers (int): The number of updates :meth:`flush` sends
+                at once.
+
+            retry (google.api_core.retry.Retry): Designation of what errors, if any,
+                should be retried.
+            timeout (float): The timeout for each request.
+            metadata (Sequence[Tuple[str, str]]): Strings which should be
+                sent along with each request as metadata.
+        """
+        self._client = client
+        self._delay = delay
+        self._max_workers = max_workers
+        self._call_options = (retry, timeout, metadata)
+        self._lock = threading.Lock()
+        self._pending = {}  # type: Dict[str, _Pending]
+        # The send in flight for each name, set once it has finished.
+        self._sending = {}  # type: Dict[str, threading.Event]
+        self._closed = False
+
+    def __enter__(self) -> "UpdateQueue":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def submit(
+        self, resource: proto.Message, update_mask: field_mask.FieldMask
+    ) -> futures.Future:
+        """Queue an update.
+
+        Args:
+            resource (proto.Message): The resource holding the new values;
+                a reservation, capacity commitment or BI reservation.
+            update_mask (~.field_mask.FieldMask): The fields to update.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the updated resource
+                once the merged update it is part of has been sent.
+
+        Raises:
+            ValueError: If the update cannot be queued, or the queue is
+                closed.
+        """
+        _check_update(resource, update_mask)
+        future = futures.Future()
+        with self._lock:
+            if self._closed:
+                raise ValueError("The update queue is closed.")
+            pending = self._pending.get(resource.name)
+            if pending is None:
+                pending = self._pending[resource.name] = _Pending(resource)
+                pending.timer = threading.Timer(
+                    self._delay, self._send, args=(resource.name, pending)
+                )
+                pending.timer.daemon = True
+                pending.timer.start()
+            pending.merge(resource, update_mask)
+            pending.waiters.append(future)
+        return future
+
+    def flush(self) -> None:
+        """Send every pending update now and wait for the calls to finish.
+
+        Errors are not raised here; they are set on the futures returned
+        by :meth:`submit`.
+        """
+        with self._lock:
+            pending = list(self._pending.items())
+        for _, batch in pending:
+            batch.timer.cancel()
+        for _ in bulk.run(
+            lambda item: self._send(*item), pending, max_workers=self._max_workers
+        ):
+            pass
+        # Also wait for the sends their timers had already started.
+        with self._lock:
+            sending = list(self._sending.values())
+        for done in sending:
+            done.wait()
+
+    def close(self) -> None:
+        """Flush the queue and stop accepting updates."""
+        with self._lock:
+            self._closed = True
+        self.flush()
+
+    def _send(self, name: str, pending: _Pending) -> None:
+        while True:
+            with self._lock:
+                if self._pending.get(name) is not pending:
+                    # Already sent by a flush or by its timer.
+                    return
+                previous = self._sending.get(name)
+                if previous is None:
+                    del self._pending[name]
+                    done = self._sending[name] = threading.Event()
+                    break
+            # Updates keep merging while an earlier send is in flight.
+            previous.wait()
+        pending.claim()
+        try:
+            response = pending.send(self._client, *self._call_options)
+        except Exception as exc:
+            pending.resolve(error=exc)
+        else:
+            pending.resolve(response)
+        finally:
+            with self._lock:
+                del self._sending[name]
+            done.set()
+
+
+class AsyncUpdateQueue:
+    """Merges rapid successive updates to a resource into a single call.
+
+    The asyncio counterpart of :class:`UpdateQueue`, sending through a
+    :class:`~.ReservationServiceAsyncClient`. It must be used from a
+    running event loop.
+    """
+
+    def __init__(
+        self,
+        client,
+        *,
+        delay: float = 0.5,
+        retry: retries.Retry = gapic_v1.method.DEFAULT,
+        timeout: float = None,
+        metadata: Sequence[Tuple[str, str]] = ()
+    ):
+        """Instantiate the queue.
+
+        Args:
+            client (~.ReservationServiceAsyncClient): The client to send
+                the updates with.
+            delay (float): The number of seconds updates to a resource
+                are held, counted from the first one, before being sent.
+
+            retry (google.api_core.retry.Retry): Designation of what errors, if any,
+                should be retried.
+            timeout (float): The timeout for each request.
+            metadata (Sequence[Tuple[str, str]]): Strings which should be
+                sent along with each request as metadata.
+        """
+        self._client = client
+        self._delay = delay
+        self._call_options = (retry, timeout, metadata)
+        self._pending = {}  # type: Dict[str, _Pending]
+        # The send in flight for each name, set once it has finished.
+        self._sending = {}  # type: Dict[str, asyncio.Event]
+        # The sends started by timers, kept until they finish.
+        self._tasks = set()  # type: Set[asyncio.Future]
+        self._closed = False
+
+    async def __aenter__(self) -> "AsyncUpdateQueue":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def submit(
+        self, resource: proto.Message, update_mask: field_mask.FieldMask
+    ) -> asyncio.Future:
+        """Queue an update.
+
+        Args:
+            resource (proto.Message): The resource holding the new values;
+                a reservation, capacity commitment or BI reservation.
+            update_mask (~.field_mask.FieldMask): The fields to update.
+
+        Returns:
+            asyncio.Future: Resolves to the updated resource once the
+                merged update it is part of has been sent.
+
+        Raises:
+            ValueError: If the update cannot be queued, or the queue is
+                closed.
+        """
+        _check_update(resource, update_mask)
+        if self._closed:
+            raise ValueError("The update queue is closed.")
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+        pending = self._pending.get(resource.name)
+        if pending is None:
+            pending = self._pending[resource.name] = _Pending(resource)
+            pending.timer = loop.call_later(
+                self._delay, self._start_send, resource.name, pending
+            )
+        pending.merge(resource, update_mask)
+        pending.waiters.append(future)
+        return future
+
+    async def flush(self) -> None:
+        """Send every pending update now and wait for the calls to finish.
+
+        Errors are not raised here; they are set on the futures returned
+        by :meth:`submit`.
+        """
+        pending = list(self._pending.items())
+        for _, batch in pending:
+            batch.timer.cancel()
+        await asyncio.gather(*(self._send(name, batch) for name, batch in pending))
+        # Also wait for the sends their timers had already started.
+        await asyncio.gather(*self._tasks)
+
+    async def close(self) -> None:
+        """Flush the queue and stop accepting updates."""
+        self._closed = True
+        await self.flush()
+
+    def _start_send(self, name: str, pending: _Pending) -> None:
+        task = asyncio.ensure_future(self._send(name, pending))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, name: str, pending: _Pending) -> None:
+        while True:
+            if self._pending.get(name) is not pending:
+                return
+            previous = self._sending.get(name)
+            if previous is None:
+                break
+            await previous.wait()
+        del self._pending[name]
+        done = self._sending[name] = asyncio.Event()
+        try:
+            response = await pending.send(self._client, *self._call_options)
+        except Exception as exc:
+            pending.resolve(error=exc)
+        else:
+            pending.resolve(response)
+        finally:
+            del self._sending[name]
+            done.set()
+
+
+__all__ = (
+    "UpdateQueue",
+    "AsyncUpdateQueue",
+)
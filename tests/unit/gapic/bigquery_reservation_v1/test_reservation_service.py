@@ -15,8 +15,15 @@
 # limitations under the License.
 #
 
+import asyncio
+from concurrent import futures
+import gc
+import itertools
 import os
 import mock
+import random
+import threading
+import time
 
 import grpc
 from grpc.experimental import aio
@@ -30,6 +37,7 @@ from google.api_core import exceptions
 from google.api_core import gapic_v1
 from google.api_core import grpc_helpers
 from google.api_core import grpc_helpers_async
+from google.api_core import retry as retries
 from google.auth import credentials
 from google.auth.exceptions import MutualTLSChannelError
 from google.cloud.bigquery_reservation_v1.services.reservation_service import (
@@ -38,8 +46,39 @@ from google.cloud.bigquery_reservation_v1.services.reservation_service import (
 from google.cloud.bigquery_reservation_v1.services.reservation_service import (
     ReservationServiceClient,
 )
+from google.cloud.bigquery_reservation_v1.services.reservation_service import bulk
+from google.cloud.bigquery_reservation_v1.services.reservation_service import cache
+from google.cloud.bigquery_reservation_v1.services.reservation_service import coalescing
+from google.cloud.bigquery_reservation_v1.services.reservation_service import (
+    commitment_layout,
+)
+from google.cloud.bigquery_reservation_v1.services.reservation_service import masks
 from google.cloud.bigquery_reservation_v1.services.reservation_service import pagers
+from google.cloud.bigquery_reservation_v1.services.reservation_service import polling
+from google.cloud.bigquery_reservation_v1.services.reservation_service import reconcile
 from google.cloud.bigquery_reservation_v1.services.reservation_service import transports
+from google.cloud.bigquery_reservation_v1.services.reservation_service.transports import (
+    channel_options,
+)
+from google.cloud.bigquery_reservation_v1.services.reservation_service.transports import (
+    channel_registry,
+)
+from google.cloud.bigquery_reservation_v1.services.reservation_service.transports import (
+    hedging,
+)
+from google.cloud.bigquery_reservation_v1.services.reservation_service.transports import (
+    pool,
+)
+from google.cloud.bigquery_reservation_v1.services.reservation_service.transports import (
+    rate_limit,
+)
+from google.cloud.bigquery_reservation_v1.services.reservation_service.transports import (
+    retry_budget,
+)
+from google.cloud.bigquery_reservation_v1.services.reservation_service import topology
+from google.cloud.bigquery_reservation_v1.services.reservation_service import (
+    write_behind,
+)
 from google.cloud.bigquery_reservation_v1.types import reservation
 from google.cloud.bigquery_reservation_v1.types import reservation as gcbr_reservation
 from google.oauth2 import service_account
@@ -989,6 +1028,198 @@ def test_list_reservations_pages():
             assert page_.raw_page.next_page_token == token
 
 
+def test_list_reservations_pager_prefetch():
+    client = ReservationServiceClient(credentials=credentials.AnonymousCredentials,)
+
+    # Mock the actual call within the gRPC stub, and fake the request.
+    with mock.patch.object(
+        type(client.transport.list_reservations), "__call__"
+    ) as call:
+        # Set the response to a series of pages.
+        call.side_effect = (
+            reservation.ListReservationsResponse(
+                reservations=[
+                    reservation.Reservation(name="a"),
+                    reservation.Reservation(name="b"),
+                    reservation.Reservation(name="c"),
+                ],
+                next_page_token="abc",
+            ),
+            reservation.ListReservationsResponse(
+                reservations=[], next_page_token="def",
+            ),
+            reservation.ListReservationsResponse(
+                reservations=[reservation.Reservation(name="d"),],
+                next_page_token="ghi",
+            ),
+            reservation.ListReservationsResponse(
+                reservations=[
+                    reservation.Reservation(name="e"),
+                    reservation.Reservation(name="f"),
+                ],
+            ),
+            RuntimeError,
+        )
+        pager = client.list_reservations(request={}, prefetch=2)
+
+        assert pager._prefetch == 2
+
+        results = [i.name for i in pager]
+        assert results == ["a", "b", "c", "d", "e", "f"]
+        assert pager.next_page_token == ""
+        assert call.call_count == 4
+        _, args, _ = call.mock_calls[3]
+        assert args[0].page_token == "ghi"
+
+
+def test_list_reservations_pager_prefetch_error():
+    client = ReservationServiceClient(credentials=credentials.AnonymousCredentials,)
+
+    # Mock the actual call within the gRPC stub, and fake the request.
+    with mock.patch.object(
+        type(client.transport.list_reservations), "__call__"
+    ) as call:
+        call.side_effect = (
+            reservation.ListReservationsResponse(
+                reservations=[reservation.Reservation(name="a"),],
+                next_page_token="abc",
+            ),
+            reservation.ListReservationsResponse(
+                reservations=[reservation.Reservation(name="b"),],
+                next_page_token="def",
+            ),
+            RuntimeError,
+        )
+        results = []
+        with pytest.raises(RuntimeError):
+            for i in client.list_reservations(request={}, prefetch=1):
+                results.append(i.name)
+
+        # Pages fetched before the failure are still delivered.
+        assert results == ["a", "b"]
+
+
+def test_list_reservations_pager_prefetch_abandoned():
+    client = ReservationServiceClient(credentials=credentials.AnonymousCredentials,)
+
+    # Mock the actual call within the gRPC stub, and fake the request.
+    with mock.patch.object(
+        type(client.transport.list_reservations), "__call__"
+    ) as call:
+        call.side_effect = [
+            reservation.ListReservationsResponse(
+                reservations=[reservation.Reservation()], next_page_token=str(i + 1),
+            )
+            for i in range(50)
+        ]
+        pages = client.list_reservations(request={}, prefetch=1).pages
+        next(pages)
+        next(pages)
+        pages.close()
+
+        # The worker must not run ahead of the consumer by more than the
+        # buffer depth plus the page in flight.
+        assert call.call_count <= 4
+
+
+def test_list_reservations_pager_checkpoint():
+    client = ReservationServiceClient(credentials=credentials.AnonymousCredentials,)
+
+    # Mock the actual call within the gRPC stub, and fake the request.
+    with mock.patch.object(
+        type(client.transport.list_reservations), "__call__"
+    ) as call:
+        call.side_effect = (
+            reservation.ListReservationsResponse(
+                reservations=[
+                    reservation.Reservation(name="a"),
+                    reservation.Reservation(name="b"),
+                ],
+                next_page_token="abc",
+            ),
+            reservation.ListReservationsResponse(
+                reservations=[
+                    reservation.Reservation(name="c"),
+                    reservation.Reservation(name="d"),
+                ],
+                next_page_token="def",
+            ),
+            exceptions.InternalServerError("internal"),
+        )
+        pager = client.list_reservations(request={})
+        assert pager.checkpoint == pagers.PagerCheckpoint("", 0)
+
+        results = []
+        with pytest.raises(exceptions.InternalServerError):
+            for i in pager:
+                results.append(i.name)
+                if i.name == "c":
+                    assert pager.checkpoint == pagers.PagerCheckpoint("abc", 1)
+
+        assert results == ["a", "b", "c", "d"]
+        # Every item of page "abc" was consumed; the next page is "def".
+        assert pager.checkpoint == pagers.PagerCheckpoint("def", 0)
+
+    with mock.patch.object(
+        type(client.transport.list_reservations), "__call__"
+    ) as call:
+        call.return_value = reservation.ListReservationsResponse(
+            reservations=[
+                reservation.Reservation(name="c"),
+                reservation.Reservation(name="d"),
+            ],
+            next_page_token="def",
+        )
+        call.side_effect = None
+        request = reservation.ListReservationsRequest(parent="parent_value")
+        resumed = client.list_reservations(
+            request, checkpoint=pagers.PagerCheckpoint("abc", 1)
+        )
+
+        # The caller's request is left untouched.
+        assert request.page_token == ""
+        _, args, _ = call.mock_calls[0]
+        assert args[0].page_token == "abc"
+        assert args[0].parent == "parent_value"
+        assert [i.name for i in resumed.reservations] == ["c", "d"]
+        call.return_value = reservation.ListReservationsResponse(
+            reservations=[reservation.Reservation(name="e")],
+        )
+        assert [i.name for i in resumed] == ["d", "e"]
+
+
+def test_list_reservations_pager_page_retry():
+    client = ReservationServiceClient(credentials=credentials.AnonymousCredentials,)
+
+    # Mock the actual call within the gRPC stub, and fake the request.
+    with mock.patch.object(
+        type(client.transport.list_reservations), "__call__"
+    ) as call:
+        call.side_effect = (
+            reservation.ListReservationsResponse(
+                reservations=[reservation.Reservation(name="a")], next_page_token="abc",
+            ),
+            exceptions.InternalServerError("internal"),
+            reservation.ListReservationsResponse(
+                reservations=[reservation.Reservation(name="b")],
+            ),
+        )
+        page_retry = retries.Retry(
+            initial=0.0,
+            maximum=0.0,
+            predicate=retries.if_exception_type(exceptions.InternalServerError),
+        )
+        pager = client.list_reservations(request={}, page_retry=page_retry)
+        results = [i.name for i in pager]
+
+        assert results == ["a", "b"]
+        assert call.call_count == 3
+        _, args, _ = call.mock_calls[1]
+        assert args[0].page_token == "abc"
+        _, args, _ = call.mock_calls[2]
+        assert args[0].page_token == "abc"
+
+
 @pytest.mark.asyncio
 async def test_list_reservations_async_pager():
     client = ReservationServiceAsyncClient(
@@ -1072,6 +1303,154 @@ async def test_list_reservations_async_pages():
             assert page_.raw_page.next_page_token == token
 
 
+@pytest.mark.asyncio
+async def test_list_reservations_async_pager_prefetch():
+    client = ReservationServiceAsyncClient(
+        credentials=credentials.AnonymousCredentials,
+    )
+
+    # Mock the actual call within the gRPC stub, and fake the request.
+    with mock.patch.object(
+        type(client.transport.list_reservations),
+        "__call__",
+        new_callable=mock.AsyncMock,
+    ) as call:
+        # Set the response to a series of pages.
+        call.side_effect = (
+            reservation.ListReservationsResponse(
+                reservations=[
+                    reservation.Reservation(name="a"),
+                    reservation.Reservation(name="b"),
+                    reservation.Reservation(name="c"),
+                ],
+                next_page_token="abc",
+            ),
+            reservation.ListReservationsResponse(
+                reservations=[], next_page_token="def",
+            ),
+            reservation.ListReservationsResponse(
+                reservations=[reservation.Reservation(name="d"),],
+                next_page_token="ghi",
+            ),
+            reservation.ListReservationsResponse(
+                reservations=[
+                    reservation.Reservation(name="e"),
+                    reservation.Reservation(name="f"),
+                ],
+            ),
+            RuntimeError,
+        )
+        async_pager = await client.list_reservations(request={}, prefetch=2)
+        assert async_pager._prefetch == 2
+        responses = []
+        async for response in async_pager:
+            responses.append(response.name)
+
+        assert responses == ["a", "b", "c", "d", "e", "f"]
+        assert async_pager.next_page_token == ""
+        assert call.call_count == 4
+
+
+@pytest.mark.asyncio
+async def test_list_reservations_async_pager_prefetch_error():
+    client = ReservationServiceAsyncClient(
+        credentials=credentials.AnonymousCredentials,
+    )
+
+    # Mock the actual call within the gRPC stub, and fake the request.
+    with mock.patch.object(
+        type(client.transport.list_reservations),
+        "__call__",
+        new_callable=mock.AsyncMock,
+    ) as call:
+        call.side_effect = (
+            reservation.ListReservationsResponse(
+                reservations=[reservation.Reservation(name="a"),],
+                next_page_token="abc",
+            ),
+            reservation.ListReservationsResponse(
+                reservations=[reservation.Reservation(name="b"),],
+                next_page_token="def",
+            ),
+            RuntimeError,
+        )
+        responses = []
+        with pytest.raises(RuntimeError):
+            async for response in await client.list_reservations(
+                request={}, prefetch=1
+            ):
+                responses.append(response.name)
+
+        assert responses == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_list_reservations_async_pager_prefetch_abandoned():
+    client = ReservationServiceAsyncClient(
+        credentials=credentials.AnonymousCredentials,
+    )
+
+    # Mock the actual call within the gRPC stub, and fake the request.
+    with mock.patch.object(
+        type(client.transport.list_reservations),
+        "__call__",
+        new_callable=mock.AsyncMock,
+    ) as call:
+        call.side_effect = [
+            reservation.ListReservationsResponse(
+                reservations=[reservation.Reservation()], next_page_token=str(i + 1),
+            )
+            for i in range(50)
+        ]
+        async_pager = await client.list_reservations(request={}, prefetch=1)
+        pages = async_pager.pages
+        await pages.__anext__()
+        await pages.__anext__()
+        await pages.aclose()
+
+    # The prefetch task has stopped, rather than being left pending.
+    current = asyncio.current_task()
+    assert all(task.done() for task in asyncio.all_tasks() if task is not current)
+
+
+@pytest.mark.asyncio
+async def test_list_reservations_async_pager_checkpoint():
+    client = ReservationServiceAsyncClient(
+        credentials=credentials.AnonymousCredentials,
+    )
+
+    # Mock the actual call within the gRPC stub, and fake the request.
+    with mock.patch.object(
+        type(client.transport.list_reservations),
+        "__call__",
+        new_callable=mock.AsyncMock,
+    ) as call:
+        call.side_effect = (
+            reservation.ListReservationsResponse(
+                reservations=[
+                    reservation.Reservation(name="b"),
+                    reservation.Reservation(name="c"),
+                ],
+                next_page_token="def",
+            ),
+            reservation.ListReservationsResponse(
+                reservations=[reservation.Reservation(name="d")],
+            ),
+        )
+        async_pager = await client.list_reservations(
+            request={}, checkpoint=pagers.PagerCheckpoint("abc", 1)
+        )
+        _, args, _ = call.mock_calls[0]
+        assert args[0].page_token == "abc"
+
+        responses = []
+        async for response in async_pager:
+            responses.append(response.name)
+
+        assert responses == ["c", "d"]
+        assert async_pager.checkpoint == pagers.PagerCheckpoint("def", 1)
+
+
 def test_get_reservation(
     transport: str = "grpc", request_type=reservation.GetReservationRequest
 ):
@@ -5927,3 +6306,2694 @@ def test_client_withDEFAULT_CLIENT_INFO():
             credentials=credentials.AnonymousCredentials(), client_info=client_info,
         )
         prep.assert_called_once_with(client_info)
+
+
+def _fan_out_pages(request, **kwargs):
+    # Two pages per parent, each holding one reservation named after it.
+    if request.page_token:
+        return reservation.ListReservationsResponse(
+            reservations=[reservation.Reservation(name=request.parent + "/2")],
+        )
+    return reservation.ListReservationsResponse(
+        reservations=[reservation.Reservation(name=request.parent + "/1")],
+        next_page_token="next",
+    )
+
+
+def test_fan_out_list():
+    client = ReservationServiceClient(credentials=credentials.AnonymousCredentials,)
+
+    # Mock the actual call within the gRPC stub, and fake the request.
+    with mock.patch.object(
+        type(client.transport.list_reservations), "__call__"
+    ) as call:
+        call.side_effect = _fan_out_pages
+        results = list(
+            client.fan_out_list(
+                "list_reservations",
+                projects=["p1", "p2"],
+                locations=["US", "EU"],
+                max_workers=3,
+            )
+        )
+
+    assert call.call_count == 8
+    assert sorted((r.parent, r.item.name) for r in results) == sorted(
+        (parent, parent + suffix)
+        for parent in (
+            "projects/p1/locations/US",
+            "projects/p1/locations/EU",
+            "projects/p2/locations/US",
+            "projects/p2/locations/EU",
+        )
+        for suffix in ("/1", "/2")
+    )
+
+
+def test_fan_out_list_assignments_parent():
+    client = ReservationServiceClient(credentials=credentials.AnonymousCredentials,)
+
+    # Mock the actual call within the gRPC stub, and fake the request.
+    with mock.patch.object(type(client.transport.list_assignments), "__call__") as call:
+        call.return_value = reservation.ListAssignmentsResponse(
+            assignments=[reservation.Assignment(name="a")],
+        )
+        results = list(
+            client.fan_out_list("list_assignments", projects=["p1"], locations=["US"])
+        )
+
+    assert results == [("projects/p1/locations/US/reservations/-", results[0].item)]
+
+
+def test_fan_out_list_error():
+    client = ReservationServiceClient(credentials=credentials.AnonymousCredentials,)
+
+    with pytest.raises(ValueError):
+        client.fan_out_list("get_reservation", projects=["p1"], locations=["US"])
+
+    # Mock the actual call within the gRPC stub, and fake the request.
+    with mock.patch.object(
+        type(client.transport.list_capacity_commitments), "__call__"
+    ) as call:
+        call.side_effect = exceptions.PermissionDenied("denied")
+        with pytest.raises(exceptions.PermissionDenied):
+            list(
+                client.fan_out_list(
+                    "list_capacity_commitments",
+                    projects=["p1", "p2"],
+                    locations=["US"],
+                )
+            )
+
+
+@pytest.mark.asyncio
+async def test_fan_out_list_async():
+    client = ReservationServiceAsyncClient(
+        credentials=credentials.AnonymousCredentials,
+    )
+
+    # Mock the actual call within the gRPC stub, and fake the request.
+    with mock.patch.object(
+        type(client.transport.list_reservations),
+        "__call__",
+        new_callable=mock.AsyncMock,
+    ) as call:
+        call.side_effect = _fan_out_pages
+        results = []
+        async for result in client.fan_out_list(
+            "list_reservations",
+            projects=["p1"],
+            locations=["US", "EU"],
+            max_concurrency=1,
+        ):
+            results.append((result.parent, result.item.name))
+
+    assert call.call_count == 4
+    assert sorted(results) == [
+        ("projects/p1/locations/EU", "projects/p1/locations/EU/1"),
+        ("projects/p1/locations/EU", "projects/p1/locations/EU/2"),
+        ("projects/p1/locations/US", "projects/p1/locations/US/1"),
+        ("projects/p1/locations/US", "projects/p1/locations/US/2"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_fan_out_list_async_abandoned():
+    client = ReservationServiceAsyncClient(
+        credentials=credentials.AnonymousCredentials,
+    )
+
+    async def pages(request, **kwargs):
+        # The second pages never arrive.
+        if request.page_token:
+            await asyncio.Event().wait()
+        return _fan_out_pages(request)
+
+    # Mock the actual call within the gRPC stub, and fake the request.
+    with mock.patch.object(
+        type(client.transport.list_reservations),
+        "__call__",
+        new_callable=mock.AsyncMock,
+    ) as call:
+        call.side_effect = pages
+        results = client.fan_out_list(
+            "list_reservations", projects=["p1", "p2"], locations=["US", "EU"],
+        )
+        await results.__anext__()
+        await results.aclose()
+
+    # The walks have stopped, rather than being left pending.
+    current = asyncio.current_task()
+    assert all(task.done() for task in asyncio.all_tasks() if task is not current)
+
+
+def test_resource_cache_ttl_and_eviction():
+    now = [0.0]
+    resource_cache = cache.ResourceCache(ttl=10.0, max_size=2, clock=lambda: now[0])
+    resource_cache.put(reservation.Reservation(name="a", slot_capacity=1))
+    resource_cache.put(reservation.Reservation(name="b", slot_capacity=2))
+
+    # Cached resources are copies.
+    cached = resource_cache.get("a")
+    cached.slot_capacity = 100
+    assert resource_cache.get("a").slot_capacity == 1
+
+    # "b" is now the least recently used entry.
+    resource_cache.put(reservation.Reservation(name="c", slot_capacity=3))
+    assert resource_cache.get("b") is None
+    assert len(resource_cache) == 2
+
+    now[0] = 10.0
+    assert resource_cache.get("a") is None
+    assert resource_cache.get("c") is None
+    assert len(resource_cache) == 0
+
+
+def test_get_reservation_cached():
+    resource_cache = cache.ResourceCache()
+    client = ReservationServiceClient(
+        credentials=credentials.AnonymousCredentials, cache=resource_cache,
+    )
+
+    # Mock the actual call within the gRPC stub, and fake the request.
+    with mock.patch.object(type(client.transport.get_reservation), "__call__") as call:
+        call.return_value = reservation.Reservation(name="name_value", slot_capacity=1)
+        assert client.get_reservation(name="name_value").slot_capacity == 1
+        assert client.get_reservation(name="name_value").slot_capacity == 1
+
+    assert call.call_count == 1
+
+    # A write through the same client invalidates the entry.
+    with mock.patch.object(
+        type(client.transport.update_reservation), "__call__"
+    ) as call:
+        call.return_value = gcbr_reservation.Reservation(name="name_value")
+        client.update_reservation(
+            reservation=gcbr_reservation.Reservation(name="name_value"),
+        )
+
+    assert resource_cache.get("name_value") is None
+
+
+def test_resource_cache_generation():
+    resource_cache = cache.ResourceCache(max_size=2)
+    generation = resource_cache.generation()
+    resource_cache.invalidate("a")
+
+    # A read taken before the invalidation is not cached; other names are.
+    resource_cache.put(reservation.Reservation(name="a"), generation)
+    resource_cache.put(reservation.Reservation(name="b"), generation)
+    assert resource_cache.get("a") is None
+    assert resource_cache.get("b") is not None
+    resource_cache.put(reservation.Reservation(name="a"), resource_cache.generation())
+    assert resource_cache.get("a") is not None
+
+    # Names whose invalidation was forgotten still count as invalidated.
+    generation = resource_cache.generation()
+    resource_cache.invalidate("c", "d", "e")
+    resource_cache.put(reservation.Reservation(name="c"), generation)
+    assert resource_cache.get("c") is None
+
+    generation = resource_cache.generation()
+    resource_cache.clear()
+    resource_cache.put(reservation.Reservation(name="f"), generation)
+    assert len(resource_cache) == 0
+
+
+def test_get_reservation_cache_read_your_writes():
+    resource_cache = cache.ResourceCache()
+    client = ReservationServiceClient(
+        credentials=credentials.AnonymousCredentials, cache=resource_cache,
+    )
+    entered = threading.Event()
+    release = threading.Event()
+
+    def stub(request, **kwargs):
+        if isinstance(request, reservation.GetReservationRequest):
+            # The read is answered before the write, but returns after it.
+            entered.set()
+            release.wait(5)
+            return reservation.Reservation(name="name_value", slot_capacity=1)
+        return gcbr_reservation.Reservation(name="name_value", slot_capacity=2)
+
+    with mock.patch.object(type(client.transport.get_reservation), "__call__") as call:
+        call.side_effect = stub
+        reads = []
+        reader = threading.Thread(
+            target=lambda: reads.append(client.get_reservation(name="name_value"))
+        )
+        reader.start()
+        assert entered.wait(5)
+        client.update_reservation(
+            reservation=gcbr_reservation.Reservation(name="name_value"),
+        )
+        release.set()
+        reader.join()
+
+        assert reads[0].slot_capacity == 1
+        assert resource_cache.get("name_value") is None
+
+        # The next read is sent, rather than served the stale response.
+        client.get_reservation(name="name_value")
+
+    assert call.call_count == 3
+
+
+def test_list_capacity_commitments_populates_cache():
+    resource_cache = cache.ResourceCache()
+    client = ReservationServiceClient(
+        credentials=credentials.AnonymousCredentials, cache=resource_cache,
+    )
+
+    # Mock the actual call within the gRPC stub, and fake the request.
+    with mock.patch.object(
+        type(client.transport.list_capacity_commitments), "__call__"
+    ) as call:
+        call.side_effect = (
+            reservation.ListCapacityCommitmentsResponse(
+                capacity_commitments=[
+                    reservation.CapacityCommitment(name="p/l/capacityCommitments/a")
+                ],
+                next_page_token="abc",
+            ),
+            reservation.ListCapacityCommitmentsResponse(
+                capacity_commitments=[
+                    reservation.CapacityCommitment(name="p/l/capacityCommitments/b")
+                ],
+            ),
+        )
+        list(client.list_capacity_commitments(parent="p/l"))
+
+    assert len(resource_cache) == 2
+
+    with mock.patch.object(
+        type(client.transport.merge_capacity_commitments), "__call__"
+    ) as call:
+        call.return_value = reservation.CapacityCommitment()
+        client.merge_capacity_commitments(
+            parent="p/l", capacity_commitment_ids=["a", "b"],
+        )
+
+    assert len(resource_cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_get_bi_reservation_cached_async():
+    resource_cache = cache.ResourceCache()
+    client = ReservationServiceAsyncClient(
+        credentials=credentials.AnonymousCredentials, cache=resource_cache,
+    )
+
+    # Mock the actual call within the gRPC stub, and fake the request.
+    with mock.patch.object(
+        type(client.transport.get_bi_reservation), "__call__"
+    ) as call:
+        call.return_value = grpc_helpers_async.FakeUnaryUnaryCall(
+            reservation.BiReservation(name="name_value", size=42)
+        )
+        assert (await client.get_bi_reservation(name="name_value")).size == 42
+        assert (await client.get_bi_reservation(name="name_value")).size == 42
+
+    assert call.call_count == 1
+
+    with mock.patch.object(
+        type(client.transport.update_bi_reservation), "__call__"
+    ) as call:
+        call.return_value = grpc_helpers_async.FakeUnaryUnaryCall(
+            reservation.BiReservation()
+        )
+        await client.update_bi_reservation(
+            bi_reservation=reservation.BiReservation(name="name_value"),
+        )
+
+    assert resource_cache.get("name_value") is None
+
+
+def _wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def test_get_reservation_coalesced():
+    client = ReservationServiceClient(
+        credentials=credentials.AnonymousCredentials, coalesce_reads=True,
+    )
+    release = threading.Event()
+
+    def get_reservation(request, **kwargs):
+        release.wait(5)
+        return reservation.Reservation(name=request.name)
+
+    # Mock the actual call within the gRPC stub, and fake the request.
+    with mock.patch.object(type(client.transport.get_reservation), "__call__") as call:
+        call.side_effect = get_reservation
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(client.get_reservation(name="name_value"))
+            )
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        # Release the call once every other thread waits for it.
+        _wait_until(lambda: client._single_flight.waiting == 7)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert call.call_count == 1
+        assert [r.name for r in results] == ["name_value"] * 8
+
+        # Calls that do not overlap are sent separately, and so are calls
+        # for a different resource.
+        client.get_reservation(name="name_value")
+        client.get_reservation(name="other_value")
+        assert call.call_count == 3
+
+
+def test_single_flight_shares_errors():
+    single_flight = coalescing.SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fail():
+        calls.append(None)
+        release.wait(5)
+        raise exceptions.NotFound("gone")
+
+    errors = []
+
+    def call():
+        try:
+            single_flight.do("key", fail)
+        except exceptions.NotFound as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=call) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    _wait_until(lambda: single_flight.waiting == 3)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(errors) == 4
+    assert single_flight.waiting == 0
+
+
+def test_get_reservation_coalesced_timeout():
+    client = ReservationServiceClient(
+        credentials=credentials.AnonymousCredentials, coalesce_reads=True,
+    )
+    release = threading.Event()
+
+    def get_reservation(request, **kwargs):
+        release.wait(5)
+        return reservation.Reservation(name=request.name)
+
+    # Mock the actual call within the gRPC stub, and fake the request.
+    with mock.patch.object(type(client.transport.get_reservation), "__call__") as call:
+        call.side_effect = get_reservation
+        leader = threading.Thread(
+            target=lambda: client.get_reservation(name="name_value")
+        )
+        leader.start()
+        _wait_until(lambda: call.call_count == 1)
+
+        # A caller waiting for the call in flight keeps to its own timeout.
+        with pytest.raises(exceptions.DeadlineExceeded):
+            client.get_reservation(name="name_value", timeout=0.01)
+        release.set()
+        leader.join()
+
+    assert call.call_count == 1
+    assert client._single_flight.waiting == 0
+
+
+def test_list_assignments_coalesced_compression():
+    client = ReservationServiceClient(
+        credentials=credentials.AnonymousCredentials, coalesce_reads=True,
+    )
+    release = threading.Event()
+
+    def list_assignments(request, **kwargs):
+        release.wait(5)
+        return reservation.ListAssignmentsResponse()
+
+    # Mock the actual call within the gRPC stub, and fake the request.
+    with mock.patch.object(type(client.transport.list_assignments), "__call__") as call:
+        call.side_effect = list_assignments
+        threads = [
+            threading.Thread(
+                target=client.list_assignments, args=(None,), kwargs=kwargs,
+            )
+            for kwargs in ({}, {"compression": grpc.Compression.Gzip})
+        ]
+        for thread in threads:
+            thread.start()
+
+        # Calls with different options are not coalesced.
+        _wait_until(lambda: call.call_count == 2)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+    assert client._single_flight.waiting == 0
+
+
+@pytest.mark.asyncio
+async def test_async_single_flight_timeout():
+    single_flight = coalescing.AsyncSingleFlight()
+    release = asyncio.Event()
+
+    async def call():
+        await release.wait()
+        return "result"
+
+    shared = asyncio.ensure_future(single_flight.do("key", call))
+    with pytest.raises(exceptions.DeadlineExceeded):
+        await single_flight.do("key", call, timeout=0.01)
+
+    # The call goes on for the callers still waiting for it.
+    release.set()
+    assert await shared == "result"
+
+
+@pytest.mark.asyncio
+async def test_search_assignments_coalesced_async():
+    client = ReservationServiceAsyncClient(
+        credentials=credentials.AnonymousCredentials, coalesce_reads=True,
+    )
+
+    # Mock the actual call within the gRPC stub, and fake the request.
+    with mock.patch.object(
+        type(client.transport.search_assignments), "__call__"
+    ) as call:
+        call.return_value = grpc_helpers_async.FakeUnaryUnaryCall(
+            reservation.SearchAssignmentsResponse(
+                assignments=[reservation.Assignment(name="name_value")],
+            )
+        )
+        pagers_ = await asyncio.gather(
+            *(
+                client.search_assignments(parent="parent_value", query="query_value")
+                for _ in range(5)
+            )
+        )
+
+    assert call.call_count == 1
+    assert all(p.assignments[0].name == "name_value" for p in pagers_)
+
+
+def _topology_resources():
+    res_a = "projects/admin/locations/US/reservations/a"
+    res_b = "projects/admin/locations/EU/reservations/b"
+    reservations = [
+        reservation.Reservation(name=res_a, slot_capacity=100),
+        reservation.Reservation(name=res_b, slot_capacity=50),
+    ]
+    assignments = [
+        reservation.Assignment(
+            name=res_a + "/assignments/1",
+            assignee="projects/p1",
+            job_type=reservation.Assignment.JobType.QUERY,
+        ),
+        reservation.Assignment(
+            name=res_a + "/assignments/2",
+            assignee="projects/p1",
+            job_type=reservation.Assignment.JobType.PIPELINE,
+        ),
+        reservation.Assignment(
+            name=res_b + "/assignments/3",
+            assignee="folders/123",
+            job_type=reservation.Assignment.JobType.QUERY,
+        ),
+    ]
+    commitments = [
+        reservation.CapacityCommitment(
+            name="projects/admin/locations/US/capacityCommitments/c", slot_count=100
+        ),
+    ]
+    return reservations, assignments, commitments
+
+
+def test_reservation_topology_indexes():
+    reservations, assignments, commitments = _topology_resources()
+    snapshot = topology.ReservationTopology(
+        reservations=reservations,
+        assignments=assignments,
+        capacity_commitments=commitments,
+    )
+    query = reservation.Assignment.JobType.QUERY
+    res_a, res_b = (r.name for r in reservations)
+
+    assert len(snapshot.assignments) == 3
+    assert len(snapshot.capacity_commitments) == 1
+    assert [a.name for a in snapshot.assignments_for_assignee("projects/p1")] == [
+        res_a + "/assignments/1",
+        res_a + "/assignments/2",
+    ]
+    assert [
+        a.name for a in snapshot.assignments_for_assignee("projects/p1", query)
+    ] == [res_a + "/assignments/1"]
+    assert [a.name for a in snapshot.assignments_for_reservation(res_b)] == [
+        res_b + "/assignments/3"
+    ]
+    assert len(snapshot.assignments_for_job_type(query)) == 2
+    assert snapshot.assignments_for_assignee("projects/unknown") == []
+
+    assert snapshot.reservation_for("projects/p1").name == res_a
+    assert snapshot.reservation_for("projects/p1", location="EU") is None
+    assert (
+        snapshot.reservation_for("projects/p2", ancestors=["folders/123"]).name == res_b
+    )
+    assert snapshot.reservation_for("projects/p2") is None
+
+
+def _topology_pages(request, **kwargs):
+    # All stubs share one callable type, so a single mock answers every list.
+    reservations, assignments, commitments = _topology_resources()
+    if isinstance(request, reservation.ListAssignmentsRequest):
+        location = request.parent.split("/")[3]
+        return reservation.ListAssignmentsResponse(
+            assignments=[a for a in assignments if "/" + location + "/" in a.name],
+        )
+    if isinstance(request, reservation.ListReservationsRequest):
+        return reservation.ListReservationsResponse(reservations=reservations)
+    return reservation.ListCapacityCommitmentsResponse(
+        capacity_commitments=commitments,
+    )
+
+
+def test_reservation_topology_from_client():
+    client = ReservationServiceClient(credentials=credentials.AnonymousCredentials,)
+
+    with mock.patch.object(type(client.transport.list_assignments), "__call__") as call:
+        call.side_effect = _topology_pages
+        snapshot = topology.ReservationTopology.from_client(
+            client, projects=["admin"], locations=["US", "EU"],
+        )
+
+    # Assignments are listed once per location, not once per reservation.
+    parents = sorted(
+        args[0].parent
+        for _, args, _ in call.mock_calls
+        if isinstance(args[0], reservation.ListAssignmentsRequest)
+    )
+    assert parents == [
+        "projects/admin/locations/EU/reservations/-",
+        "projects/admin/locations/US/reservations/-",
+    ]
+    reservations, assignments, _ = _topology_resources()
+    assert sorted(snapshot.assignments) == sorted(a.name for a in assignments)
+    assert len(snapshot.capacity_commitments) == 1
+    assert snapshot.reservation_for("projects/p1").name == reservations[0].name
+
+
+@pytest.mark.asyncio
+async def test_reservation_topology_from_async_client():
+    client = ReservationServiceAsyncClient(
+        credentials=credentials.AnonymousCredentials,
+    )
+
+    with mock.patch.object(
+        type(client.transport.list_assignments), "__call__", new_callable=mock.AsyncMock
+    ) as call:
+        call.side_effect = _topology_pages
+        snapshot = await topology.ReservationTopology.from_async_client(
+            client, projects=["admin"], locations=["US", "EU"],
+        )
+
+    assert call.call_count == 6
+    assert len(snapshot.assignments) == 3
+    assert (
+        snapshot.reservation_for("folders/123", location="EU").name
+        == "projects/admin/locations/EU/reservations/b"
+    )
+
+
+def test_reservation_topology_update():
+    reservations, assignments, commitments = _topology_resources()
+    snapshot = topology.ReservationTopology(reservations, assignments, commitments)
+    assert snapshot.update(reservations, assignments, commitments).empty
+
+    resized = reservation.Reservation(reservations[0])
+    resized.slot_capacity = 200
+    moved = reservation.Assignment(assignments[0])
+    moved.assignee = "projects/p2"
+    added = reservation.Assignment(
+        name=reservations[1].name + "/assignments/4",
+        assignee="projects/p3",
+        job_type=reservation.Assignment.JobType.PIPELINE,
+    )
+    changes = snapshot.update(
+        [resized, reservations[1]], [moved, assignments[1], added], [],
+    )
+
+    assert changes.added == (added,)
+    assert changes.removed == (commitments[0], assignments[2])
+    assert changes.modified == (resized, moved)
+    assert not changes.empty
+
+    # The indexes follow the changes without being rebuilt.
+    assert snapshot.reservations[resized.name].slot_capacity == 200
+    assert [a.name for a in snapshot.assignments_for_assignee("projects/p1")] == [
+        assignments[1].name
+    ]
+    assert snapshot.reservation_for("projects/p2").name == resized.name
+    assert snapshot.assignments_for_assignee("folders/123") == []
+    assert [
+        a.name for a in snapshot.assignments_for_reservation(reservations[1].name)
+    ] == [added.name]
+    assert len(snapshot.capacity_commitments) == 0
+
+
+def test_reservation_topology_refresh():
+    client = ReservationServiceClient(credentials=credentials.AnonymousCredentials,)
+    snapshot = topology.ReservationTopology()
+
+    with mock.patch.object(type(client.transport.list_assignments), "__call__") as call:
+        call.side_effect = _topology_pages
+        changes = snapshot.refresh(client, projects=["admin"], locations=["US", "EU"])
+        assert len(changes.added) == 6
+        assert snapshot.refresh(
+            client, projects=["admin"], locations=["US", "EU"]
+        ).empty
+
+
+@pytest.mark.asyncio
+async def test_reservation_topology_refresh_async():
+    client = ReservationServiceAsyncClient(
+        credentials=credentials.AnonymousCredentials,
+    )
+    reservations, assignments, commitments = _topology_resources()
+    snapshot = topology.ReservationTopology(reservations, assignments[:2], [])
+
+    with mock.patch.object(
+        type(client.transport.list_assignments), "__call__", new_callable=mock.AsyncMock
+    ) as call:
+        call.side_effect = _topology_pages
+        changes = await snapshot.refresh_async(
+            client, projects=["admin"], locations=["US", "EU"],
+        )
+
+    assert changes == polling.ResourceChanges(added=(commitments[0], assignments[2]),)
+
+
+def test_adaptive_interval():
+    interval = polling.AdaptiveInterval(minimum=1.0, maximum=5.0, multiplier=2.0)
+    assert interval.current == 1.0
+    assert [interval.record(False) for _ in range(4)] == [2.0, 4.0, 5.0, 5.0]
+    assert interval.record(True) == 1.0
+
+    with pytest.raises(ValueError):
+        polling.AdaptiveInterval(minimum=2.0, maximum=1.0)
+    with pytest.raises(ValueError):
+        polling.AdaptiveInterval(multiplier=0.5)
+
+
+def _watch_responses():
+    parent = "projects/p/locations/US"
+    first = reservation.Reservation(name=parent + "/reservations/a", slot_capacity=1)
+    second = reservation.Reservation(name=parent + "/reservations/b")
+    resized = reservation.Reservation(first)
+    resized.slot_capacity = 2
+    return [
+        reservation.ListReservationsResponse(reservations=[first]),
+        reservation.ListReservationsResponse(reservations=[first]),
+        reservation.ListReservationsResponse(reservations=[first]),
+        reservation.ListReservationsResponse(reservations=[resized, second]),
+        reservation.ListReservationsResponse(reservations=[second]),
+    ]
+
+
+def test_watch():
+    client = ReservationServiceClient(credentials=credentials.AnonymousCredentials,)
+    responses = _watch_responses()
+
+    # Mock the actual call within the gRPC stub, and fake the request.
+    with mock.patch.object(
+        type(client.transport.list_reservations), "__call__"
+    ) as call, mock.patch.object(polling.time, "sleep") as sleep:
+        call.side_effect = responses
+        watcher = client.watch(
+            "list_reservations",
+            "projects/p/locations/US",
+            interval=polling.AdaptiveInterval(minimum=1.0, maximum=60.0),
+        )
+        changes = [next(watcher) for _ in range(3)]
+        watcher.close()
+
+    assert changes[0] == polling.ResourceChanges(added=tuple(responses[0].reservations))
+    assert changes[1] == polling.ResourceChanges(
+        added=(responses[3].reservations[1],), modified=(responses[3].reservations[0],),
+    )
+    assert changes[2] == polling.ResourceChanges(
+        removed=(responses[3].reservations[0],),
+    )
+    # Quiet polls back off; a change resets the interval.
+    assert [c[0][0] for c in sleep.call_args_list] == [1.0, 2.0, 4.0, 1.0]
+
+
+def test_watch_rejects_unknown_method():
+    client = ReservationServiceClient(credentials=credentials.AnonymousCredentials,)
+    with pytest.raises(ValueError):
+        client.watch("search_assignments", "projects/p/locations/US")
+
+
+@pytest.mark.asyncio
+async def test_watch_async():
+    client = ReservationServiceAsyncClient(
+        credentials=credentials.AnonymousCredentials,
+    )
+    responses = _watch_responses()
+
+    with mock.patch.object(
+        type(client.transport.list_reservations),
+        "__call__",
+        new_callable=mock.AsyncMock,
+    ) as call, mock.patch.object(
+        polling.asyncio, "sleep", new_callable=mock.AsyncMock
+    ) as sleep:
+        call.side_effect = responses
+        watcher = client.watch("list_reservations", "projects/p/locations/US")
+        changes = [await watcher.__anext__() for _ in range(3)]
+        await watcher.aclose()
+
+    assert [len(c.added) for c in changes] == [1, 1, 0]
+    assert [len(c.removed) for c in changes] == [0, 0, 1]
+    assert [c[0][0] for c in sleep.call_args_list] == [1.0, 2.0, 4.0, 1.0]
+
+
+def _create_assignment_echo(request, **kwargs):
+    # Fail the assignments of one project; echo the others back, named.
+    if request.assignment.assignee == "projects/bad":
+        raise exceptions.PermissionDenied("denied")
+    return reservation.Assignment(
+        name=request.parent + "/assignments/" + request.assignment.assignee[9:],
+        assignee=request.assignment.assignee,
+    )
+
+
+def test_bulk_create_assignments():
+    client = ReservationServiceClient(credentials=credentials.AnonymousCredentials,)
+    parent = "projects/admin/locations/US/reservations/r"
+    assignees = ["projects/p{}".format(i) for i in range(20)]
+    assignees[7] = "projects/bad"
+
+    # Mock the actual call within the gRPC stub, and fake the request.
+    with mock.patch.object(
+        type(client.transport.create_assignment), "__call__"
+    ) as call:
+        call.side_effect = _create_assignment_echo
+        results = list(
+            client.bulk_create_assignments(
+                ((parent, reservation.Assignment(assignee=a)) for a in assignees),
+                max_workers=4,
+            )
+        )
+
+    assert call.call_count == 20
+    assert [r.index for r in results] == list(range(20))
+    assert [r.ok for r in results].count(False) == 1
+    assert isinstance(results[7].error, exceptions.PermissionDenied)
+    assert results[7].item[1].assignee == "projects/bad"
+    assert results[3].result.name == parent + "/assignments/p3"
+
+
+def test_bulk_run_bounds_concurrency():
+    lock = threading.Lock()
+    in_flight = []
+    peak = []
+
+    def call(item):
+        with lock:
+            in_flight.append(item)
+            peak.append(len(in_flight))
+        time.sleep(0.01)
+        with lock:
+            in_flight.remove(item)
+        return item * 2
+
+    results = list(bulk.run(call, range(12), max_workers=3, ordered=False))
+
+    assert max(peak) <= 3
+    assert sorted(r.result for r in results) == [i * 2 for i in range(12)]
+
+
+def test_adaptive_concurrency():
+    concurrency = bulk.AdaptiveConcurrency(4, minimum=2, maximum=5)
+
+    # Additive increase: about one more slot per limit-full of successes.
+    for _ in range(4):
+        concurrency.record(concurrency.start())
+    assert concurrency.limit == 4
+    concurrency.record(concurrency.start())
+    assert concurrency.limit == 5
+    for _ in range(20):
+        concurrency.record(concurrency.start())
+    assert concurrency.limit == 5
+
+    # Multiplicative decrease, once per round of calls.
+    tokens = [concurrency.start() for _ in range(3)]
+    for token in tokens:
+        concurrency.record(token, exceptions.ResourceExhausted("slow down"))
+    assert concurrency.limit == 2
+    concurrency.record(concurrency.start(), exceptions.ServiceUnavailable("down"))
+    assert concurrency.limit == 2
+
+    # Other errors do not signal overload.
+    concurrency.record(concurrency.start(), exceptions.NotFound("gone"))
+    assert concurrency.limit == 2
+
+    with pytest.raises(ValueError):
+        bulk.AdaptiveConcurrency(8, maximum=4)
+
+
+def test_bulk_run_adaptive_concurrency():
+    concurrency = bulk.AdaptiveConcurrency(8, maximum=8)
+    lock = threading.Lock()
+    in_flight = []
+    peak = []
+
+    def call(item):
+        if item == 0:
+            raise exceptions.ResourceExhausted("slow down")
+        with lock:
+            in_flight.append(item)
+            if item >= 8:
+                peak.append(len(in_flight))
+        time.sleep(0.01)
+        with lock:
+            in_flight.remove(item)
+        return item
+
+    results = list(bulk.run(call, range(12), concurrency=concurrency))
+
+    assert [r.index for r in results] == list(range(12))
+    assert isinstance(results[0].error, exceptions.ResourceExhausted)
+    assert all(r.ok for r in results[1:])
+    # Calls started after the cut stay within the reduced limit.
+    assert max(peak) <= 6
+    assert concurrency.limit == 6
+
+
+@pytest.mark.asyncio
+async def test_bulk_run_async_adaptive_concurrency():
+    concurrency = bulk.AdaptiveConcurrency(4)
+    in_flight = []
+    peak = []
+
+    async def call(item):
+        in_flight.append(item)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0)
+        in_flight.remove(item)
+        if item < 2:
+            raise exceptions.ResourceExhausted("slow down")
+        return item
+
+    results = [
+        result
+        async for result in bulk.run_async(call, range(6), concurrency=concurrency)
+    ]
+
+    assert [r.ok for r in results] == [False, False, True, True, True, True]
+    assert peak[:4] == [1, 2, 3, 4]
+    assert max(peak[4:]) <= 2
+    assert concurrency.limit == 3
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_assignments_async():
+    client = ReservationServiceAsyncClient(
+        credentials=credentials.AnonymousCredentials,
+    )
+    parent = "projects/admin/locations/US/reservations/r"
+    assignees = ["projects/bad", "projects/p1", "projects/p2"]
+
+    with mock.patch.object(
+        type(client.transport.create_assignment),
+        "__call__",
+        new_callable=mock.AsyncMock,
+    ) as call:
+        call.side_effect = _create_assignment_echo
+        results = [
+            result
+            async for result in client.bulk_create_assignments(
+                [(parent, reservation.Assignment(assignee=a)) for a in assignees],
+                max_concurrency=2,
+            )
+        ]
+
+    assert [r.index for r in results] == [0, 1, 2]
+    assert isinstance(results[0].error, exceptions.PermissionDenied)
+    assert [r.result.assignee for r in results[1:]] == assignees[1:]
+
+
+def test_bulk_delete_assignments():
+    client = ReservationServiceClient(credentials=credentials.AnonymousCredentials,)
+    names = [
+        "projects/admin/locations/US/reservations/a/assignments/1",
+        "projects/admin/locations/US/reservations/b/assignments/2",
+        "projects/admin/locations/US/reservations/a/assignments/3",
+    ]
+
+    def delete(request, **kwargs):
+        if request.name.endswith("/2"):
+            raise exceptions.NotFound("gone")
+
+    # Mock the actual call within the gRPC stub, and fake the request.
+    with mock.patch.object(
+        type(client.transport.delete_assignment), "__call__"
+    ) as call:
+        call.side_effect = delete
+        report = client.bulk_delete_assignments(names, max_workers=2)
+
+    assert call.call_count == 3
+    assert list(report) == [
+        "projects/admin/locations/US/reservations/a",
+        "projects/admin/locations/US/reservations/b",
+    ]
+    grouped = report["projects/admin/locations/US/reservations/a"]
+    assert [r.item for r in grouped] == [names[0], names[2]]
+    assert all(r.ok for r in grouped)
+    (failed,) = report["projects/admin/locations/US/reservations/b"]
+    assert isinstance(failed.error, exceptions.NotFound)
+
+
+def test_bulk_delete_assignments_invalid_name():
+    client = ReservationServiceClient(credentials=credentials.AnonymousCredentials,)
+
+    with mock.patch.object(
+        type(client.transport.delete_assignment), "__call__"
+    ) as call:
+        with pytest.raises(ValueError):
+            client.bulk_delete_assignments(
+                [
+                    "projects/admin/locations/US/reservations/a/assignments/1",
+                    "projects/admin/locations/US/reservations/a",
+                ]
+            )
+
+    call.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_bulk_move_assignments_async():
+    client = ReservationServiceAsyncClient(
+        credentials=credentials.AnonymousCredentials,
+    )
+    destination = "projects/admin/locations/US/reservations/c"
+    names = [
+        "projects/admin/locations/US/reservations/a/assignments/1",
+        "projects/admin/locations/US/reservations/b/assignments/2",
+    ]
+
+    async def move(request, **kwargs):
+        return reservation.Assignment(
+            name=request.destination_id + "/assignments/" + request.name[-1],
+        )
+
+    with mock.patch.object(
+        type(client.transport.move_assignment), "__call__", new_callable=mock.AsyncMock,
+    ) as call:
+        call.side_effect = move
+        report = await client.bulk_move_assignments(names, destination)
+
+    _, args, _ = call.mock_calls[0]
+    assert args[0].destination_id == destination
+    assert [
+        result.result.name for results in report.values() for result in results
+    ] == [destination + "/assignments/1", destination + "/assignments/2"]
+
+
+def _reconcile_current():
+    res = "projects/admin/locations/US/reservations/"
+    return topology.ReservationTopology(
+        reservations=[
+            reservation.Reservation(name=res + "keep", slot_capacity=100),
+            reservation.Reservation(name=res + "old", slot_capacity=50),
+        ],
+        assignments=[
+            reservation.Assignment(
+                name=res + "old/assignments/1",
+                assignee="projects/p1",
+                job_type=reservation.Assignment.JobType.QUERY,
+            ),
+            reservation.Assignment(
+                name=res + "old/assignments/2",
+                assignee="projects/p2",
+                job_type=reservation.Assignment.JobType.QUERY,
+            ),
+            reservation.Assignment(
+                name=res + "keep/assignments/3",
+                assignee="projects/p3",
+                job_type=reservation.Assignment.JobType.QUERY,
+            ),
+        ],
+        capacity_commitments=[
+            reservation.CapacityCommitment(
+                name="projects/admin/locations/US/capacityCommitments/c",
+                slot_count=100,
+                plan=reservation.CapacityCommitment.CommitmentPlan.FLEX,
+            ),
+        ],
+    )
+
+
+def _reconcile_desired():
+    res = "projects/admin/locations/US/reservations/"
+    return reconcile.DesiredState.from_dict(
+        {
+            "reservations": [
+                {"name": res + "keep", "slot_capacity": 200},
+                {"name": res + "new", "slot_capacity": 50},
+            ],
+            "assignments": [
+                {
+                    "reservation": res + "new",
+                    "assignee": "projects/p1",
+                    "job_type": "QUERY",
+                },
+                {
+                    "reservation": res + "keep",
+                    "assignee": "projects/p3",
+                    "job_type": "QUERY",
+                },
+                {
+                    "reservation": res + "new",
+                    "assignee": "projects/p4",
+                    "job_type": "PIPELINE",
+                },
+            ],
+            "capacity_commitments": [
+                {
+                    "name": "projects/admin/locations/US/capacityCommitments/c",
+                    "plan": "FLEX",
+                    "renewal_plan": "MONTHLY",
+                },
+            ],
+        }
+    )
+
+
+def test_compute_plan():
+    res = "projects/admin/locations/US/reservations/"
+    commitment = "projects/admin/locations/US/capacityCommitments/c"
+    plan = reconcile.compute_plan(
+        _reconcile_current(), _reconcile_desired(), prune=True
+    )
+    by_key = {op.key: op for op in plan.operations}
+
+    assert sorted((op.method, op.key) for op in plan.operations) == sorted(
+        [
+            ("update_reservation", res + "keep"),
+            ("create_reservation", res + "new"),
+            ("update_capacity_commitment", commitment),
+            ("move_assignment", res + "old/assignments/1"),
+            ("create_assignment", res + "new/assignments/projects/p4#PIPELINE"),
+            ("delete_assignment", res + "old/assignments/2"),
+            ("delete_reservation", res + "old"),
+        ]
+    )
+    assert list(by_key[res + "keep"].request.update_mask.paths) == ["slot_capacity"]
+    assert list(by_key[commitment].request.update_mask.paths) == ["renewal_plan"]
+    assert by_key[res + "new"].request.reservation_id == "new"
+    assert by_key[res + "old/assignments/1"].request.destination_id == res + "new"
+
+    waves = [sorted(op.method for op in wave) for wave in plan.waves()]
+    assert waves == [
+        [
+            "create_reservation",
+            "delete_assignment",
+            "update_capacity_commitment",
+            "update_reservation",
+        ],
+        ["create_assignment", "move_assignment"],
+        ["delete_reservation"],
+    ]
+
+
+def test_compute_plan_without_prune_or_changes():
+    current = _reconcile_current()
+    plan = reconcile.compute_plan(current, _reconcile_desired())
+    assert "delete_reservation" not in [op.method for op in plan.operations]
+    assert "delete_assignment" not in [op.method for op in plan.operations]
+
+    unchanged = reconcile.DesiredState(
+        reservations=list(current.reservations.values()),
+        assignments=[
+            (a.name.rsplit("/assignments/", 1)[0], a)
+            for a in current.assignments.values()
+        ],
+    )
+    assert reconcile.compute_plan(current, unchanged, prune=True).empty
+
+    with pytest.raises(ValueError):
+        reconcile.compute_plan(
+            current,
+            reconcile.DesiredState(
+                capacity_commitments=[
+                    reservation.CapacityCommitment(
+                        name="projects/admin/locations/US/capacityCommitments/x"
+                    )
+                ]
+            ),
+        )
+
+
+def test_compute_plan_prune_keeps_assignment_parents():
+    res = "projects/admin/locations/US/reservations/"
+    desired = reconcile.DesiredState.from_dict(
+        {
+            "assignments": [
+                {
+                    "reservation": res + "keep",
+                    "assignee": "projects/p3",
+                    "job_type": "QUERY",
+                },
+                {
+                    "reservation": res + "keep",
+                    "assignee": "projects/p5",
+                    "job_type": "QUERY",
+                },
+            ],
+        }
+    )
+    plan = reconcile.compute_plan(_reconcile_current(), desired, prune=True)
+
+    # "keep" is not listed, but the desired assignments need it.
+    assert sorted((op.method, op.key) for op in plan.operations) == [
+        ("create_assignment", res + "keep/assignments/projects/p5#QUERY"),
+        ("delete_assignment", res + "old/assignments/1"),
+        ("delete_assignment", res + "old/assignments/2"),
+        ("delete_reservation", res + "old"),
+    ]
+
+
+def test_reconciler_apply():
+    client = ReservationServiceClient(credentials=credentials.AnonymousCredentials,)
+    current = _reconcile_current()
+    methods = []
+
+    def respond(request, **kwargs):
+        if isinstance(request, reservation.ListReservationsRequest):
+            return reservation.ListReservationsResponse(
+                reservations=list(current.reservations.values()),
+            )
+        if isinstance(request, reservation.ListAssignmentsRequest):
+            return reservation.ListAssignmentsResponse(
+                assignments=list(current.assignments.values()),
+            )
+        if isinstance(request, reservation.ListCapacityCommitmentsRequest):
+            return reservation.ListCapacityCommitmentsResponse(
+                capacity_commitments=list(current.capacity_commitments.values()),
+            )
+        methods.append(type(request).__name__)
+        if isinstance(request, reservation.CreateReservationRequest):
+            raise exceptions.ResourceExhausted("no slots")
+        if isinstance(request, reservation.DeleteAssignmentRequest):
+            return None
+        return reservation.Reservation()
+
+    # Mock the actual call within the gRPC stub, and fake the request.
+    with mock.patch.object(
+        type(client.transport.list_reservations), "__call__"
+    ) as call:
+        call.side_effect = respond
+        reconciler = reconcile.Reconciler(client, max_workers=2)
+        plan = reconciler.plan(_reconcile_desired(), prune=True)
+        result = reconciler.apply(plan)
+
+    # The failed first wave stops the waves that depend on it.
+    assert sorted(methods) == [
+        "CreateReservationRequest",
+        "DeleteAssignmentRequest",
+        "UpdateCapacityCommitmentRequest",
+        "UpdateReservationRequest",
+    ]
+    assert not result.ok
+    assert len(result.results) == 4
+    assert sorted(op.method for op in result.skipped) == [
+        "create_assignment",
+        "delete_reservation",
+        "move_assignment",
+    ]
+    (failed,) = [r for r in result.results if not r.ok]
+    assert failed.item.method == "create_reservation"
+
+
+def test_minimal_field_mask():
+    current = reservation.CapacityCommitment(
+        name="projects/p/locations/US/capacityCommitments/c",
+        slot_count=100,
+        plan=reservation.CapacityCommitment.CommitmentPlan.ANNUAL,
+        state=reservation.CapacityCommitment.State.ACTIVE,
+    )
+    desired = reservation.CapacityCommitment(
+        name=current.name,
+        slot_count=500,
+        plan=reservation.CapacityCommitment.CommitmentPlan.ANNUAL,
+        renewal_plan=reservation.CapacityCommitment.CommitmentPlan.FLEX,
+    )
+
+    # Output-only and immutable fields are never named.
+    assert masks.minimal_field_mask(current, desired).paths == ["renewal_plan"]
+    assert masks.minimal_field_mask(current, current).paths == []
+
+    with pytest.raises(ValueError):
+        masks.minimal_field_mask(current, reservation.Reservation())
+    with pytest.raises(ValueError):
+        masks.minimal_field_mask(reservation.Assignment(), reservation.Assignment())
+
+
+def test_update_reservation_if_changed():
+    client = ReservationServiceClient(credentials=credentials.AnonymousCredentials,)
+    current = gcbr_reservation.Reservation(
+        name="projects/p/locations/US/reservations/r",
+        slot_capacity=100,
+        ignore_idle_slots=True,
+    )
+
+    # Mock the actual call within the gRPC stub, and fake the request.
+    with mock.patch.object(
+        type(client.transport.update_reservation), "__call__"
+    ) as call:
+        call.return_value = gcbr_reservation.Reservation(name=current.name)
+        unchanged = client.update_reservation_if_changed(
+            current, gcbr_reservation.Reservation(current)
+        )
+        call.assert_not_called()
+        assert unchanged is current
+
+        desired = gcbr_reservation.Reservation(current)
+        desired.slot_capacity = 200
+        client.update_reservation_if_changed(current, desired)
+
+    _, args, _ = call.mock_calls[0]
+    assert args[0].reservation == desired
+    assert args[0].update_mask.paths == ["slot_capacity"]
+
+
+@pytest.mark.asyncio
+async def test_update_bi_reservation_if_changed_async():
+    client = ReservationServiceAsyncClient(
+        credentials=credentials.AnonymousCredentials,
+    )
+    current = reservation.BiReservation(
+        name="projects/p/locations/US/bireservation", size=100
+    )
+
+    with mock.patch.object(
+        type(client.transport.update_bi_reservation), "__call__"
+    ) as call:
+        call.return_value = grpc_helpers_async.FakeUnaryUnaryCall(
+            reservation.BiReservation(name=current.name, size=200)
+        )
+        assert (
+            await client.update_bi_reservation_if_changed(current, current)
+        ) is current
+        assert not call.mock_calls
+
+        response = await client.update_bi_reservation_if_changed(
+            current, reservation.BiReservation(name=current.name, size=200)
+        )
+
+    assert response.size == 200
+    _, args, _ = call.mock_calls[0]
+    assert args[0].update_mask.paths == ["size"]
+
+
+def test_update_queue_merges_updates():
+    client = ReservationServiceClient(credentials=credentials.AnonymousCredentials,)
+    name = "projects/p/locations/US/reservations/r"
+
+    # Mock the actual call within the gRPC stub, and fake the request.
+    with mock.patch.object(
+        type(client.transport.update_reservation), "__call__"
+    ) as call:
+        call.side_effect = lambda request, **kwargs: request.reservation
+        with write_behind.UpdateQueue(client, delay=60) as queue:
+            first = queue.submit(
+                gcbr_reservation.Reservation(name=name, slot_capacity=100),
+                field_mask.FieldMask(paths=["slot_capacity"]),
+            )
+            second = queue.submit(
+                gcbr_reservation.Reservation(name=name, ignore_idle_slots=True),
+                field_mask.FieldMask(paths=["ignore_idle_slots"]),
+            )
+            third = queue.submit(
+                gcbr_reservation.Reservation(name=name, slot_capacity=200),
+                field_mask.FieldMask(paths=["slot_capacity"]),
+            )
+            assert not first.done()
+
+    call.assert_called_once()
+    _, args, _ = call.mock_calls[0]
+    assert args[0].update_mask.paths == ["slot_capacity", "ignore_idle_slots"]
+    assert args[0].reservation == gcbr_reservation.Reservation(
+        name=name, slot_capacity=200, ignore_idle_slots=True
+    )
+    assert first.result() == second.result() == third.result()
+
+    with pytest.raises(ValueError):
+        queue.submit(
+            gcbr_reservation.Reservation(name=name),
+            field_mask.FieldMask(paths=["slot_capacity"]),
+        )
+
+
+def test_update_queue_sends_after_delay():
+    client = ReservationServiceClient(credentials=credentials.AnonymousCredentials,)
+
+    with mock.patch.object(
+        type(client.transport.update_capacity_commitment), "__call__"
+    ) as call:
+        call.side_effect = exceptions.FailedPrecondition("in commitment period")
+        queue = write_behind.UpdateQueue(client, delay=0.01)
+        future = queue.submit(
+            reservation.CapacityCommitment(
+                name="projects/p/locations/US/capacityCommitments/c",
+                plan=reservation.CapacityCommitment.CommitmentPlan.FLEX,
+            ),
+            field_mask.FieldMask(paths=["plan"]),
+        )
+        with pytest.raises(exceptions.FailedPrecondition):
+            future.result(timeout=5)
+
+    call.assert_called_once()
+
+    with pytest.raises(ValueError):
+        queue.submit(
+            reservation.Assignment(name="projects/p/locations/US/reservations/r"),
+            field_mask.FieldMask(paths=["assignee"]),
+        )
+
+
+@pytest.mark.asyncio
+async def test_async_update_queue():
+    client = ReservationServiceAsyncClient(
+        credentials=credentials.AnonymousCredentials,
+    )
+    name = "projects/p/locations/US/bireservation"
+
+    with mock.patch.object(
+        type(client.transport.update_bi_reservation),
+        "__call__",
+        new_callable=mock.AsyncMock,
+    ) as call:
+        call.side_effect = lambda request, **kwargs: request.bi_reservation
+        queue = write_behind.AsyncUpdateQueue(client, delay=0.01)
+        futures = [
+            queue.submit(
+                reservation.BiReservation(name=name, size=size),
+                field_mask.FieldMask(paths=["size"]),
+            )
+            for size in (100, 200)
+        ]
+        responses = await asyncio.gather(*futures)
+
+    call.assert_called_once()
+    assert [r.size for r in responses] == [200, 200]
+
+
+def test_update_queue_flush_waits_for_sends_in_flight():
+    client = ReservationServiceClient(credentials=credentials.AnonymousCredentials,)
+    name = "projects/p/locations/US/reservations/r"
+    entered = threading.Event()
+    release = threading.Event()
+
+    def update(request, **kwargs):
+        entered.set()
+        release.wait(5)
+        return request.reservation
+
+    with mock.patch.object(
+        type(client.transport.update_reservation), "__call__"
+    ) as call:
+        call.side_effect = update
+        queue = write_behind.UpdateQueue(client, delay=0.01)
+        future = queue.submit(
+            gcbr_reservation.Reservation(name=name, slot_capacity=100),
+            field_mask.FieldMask(paths=["slot_capacity"]),
+        )
+        # The timer has taken the update; close() must still wait for it.
+        assert entered.wait(5)
+        later = queue.submit(
+            gcbr_reservation.Reservation(name=name, slot_capacity=200),
+            field_mask.FieldMask(paths=["slot_capacity"]),
+        )
+        closer = threading.Thread(target=queue.close)
+        closer.start()
+        closer.join(0.05)
+        assert closer.is_alive()
+        release.set()
+        closer.join(5)
+
+    # The later update is sent after the first one.
+    assert future.result(0).slot_capacity == 100
+    assert later.result(0).slot_capacity == 200
+    assert call.call_count == 2
+    assert queue._sending == {}
+
+
+@pytest.mark.asyncio
+async def test_async_update_queue_flush_waits_for_sends_in_flight():
+    client = ReservationServiceAsyncClient(
+        credentials=credentials.AnonymousCredentials,
+    )
+    name = "projects/p/locations/US/bireservation"
+    entered = asyncio.Event()
+    release = asyncio.Event()
+
+    async def update(request, **kwargs):
+        entered.set()
+        await release.wait()
+        return request.bi_reservation
+
+    with mock.patch.object(
+        type(client.transport.update_bi_reservation),
+        "__call__",
+        new_callable=mock.AsyncMock,
+    ) as call:
+        call.side_effect = update
+        queue = write_behind.AsyncUpdateQueue(client, delay=0.01)
+        future = queue.submit(
+            reservation.BiReservation(name=name, size=100),
+            field_mask.FieldMask(paths=["size"]),
+        )
+        await asyncio.wait_for(entered.wait(), 5)
+        closing = asyncio.ensure_future(queue.close())
+        await asyncio.sleep(0)
+        assert not closing.done()
+        release.set()
+        await asyncio.wait_for(closing, 5)
+
+    assert future.done()
+    assert queue._sending == {}
+    assert queue._tasks == set()
+
+
+def test_update_queue_flush_sends_concurrently():
+    client = ReservationServiceClient(credentials=credentials.AnonymousCredentials,)
+    names = ["projects/p/locations/US/reservations/{}".format(i) for i in range(3)]
+    barrier = threading.Barrier(len(names), timeout=5)
+
+    def update(request, **kwargs):
+        # Only returns once every update is in flight at the same time.
+        barrier.wait()
+        return request.reservation
+
+    with mock.patch.object(
+        type(client.transport.update_reservation), "__call__"
+    ) as call:
+        call.side_effect = update
+        queue = write_behind.UpdateQueue(client, delay=60)
+        futures_ = [
+            queue.submit(
+                gcbr_reservation.Reservation(name=name, slot_capacity=100),
+                field_mask.FieldMask(paths=["slot_capacity"]),
+            )
+            for name in names
+        ]
+        queue.flush()
+
+    assert [f.result(0).name for f in futures_] == names
+
+
+def test_update_queue_cancelled_future():
+    client = ReservationServiceClient(credentials=credentials.AnonymousCredentials,)
+    name = "projects/p/locations/US/reservations/r"
+    submitted = []
+
+    def update(request, **kwargs):
+        # Too late to cancel: the update is being sent.
+        assert not submitted[1].cancel()
+        return request.reservation
+
+    with mock.patch.object(
+        type(client.transport.update_reservation), "__call__"
+    ) as call:
+        call.side_effect = update
+        queue = write_behind.UpdateQueue(client, delay=60)
+        for capacity in (100, 200):
+            submitted.append(
+                queue.submit(
+                    gcbr_reservation.Reservation(name=name, slot_capacity=capacity),
+                    field_mask.FieldMask(paths=["slot_capacity"]),
+                )
+            )
+        submitted[0].cancel()
+        queue.flush()
+
+    assert submitted[0].cancelled()
+    assert submitted[1].result(0).slot_capacity == 200
+
+
+def _layout_commitments(
+    *sizes, plan=reservation.CapacityCommitment.CommitmentPlan.FLEX
+):
+    return [
+        reservation.CapacityCommitment(
+            name="projects/p/locations/US/capacityCommitments/{}".format(i),
+            slot_count=size,
+            plan=plan,
+            state=reservation.CapacityCommitment.State.ACTIVE,
+        )
+        for i, size in enumerate(sizes)
+    ]
+
+
+def test_plan_layout():
+    flex = reservation.CapacityCommitment.CommitmentPlan.FLEX
+    base = "projects/p/locations/US/capacityCommitments/"
+
+    # Exact matches are kept and a single split covers the rest.
+    plan = commitment_layout.plan_layout(
+        _layout_commitments(500, 100, 300, 200), {flex: [100, 200, 200, 100, 500]},
+    )
+    assert plan.parent == "projects/p/locations/US"
+    assert plan.steps == (
+        commitment_layout.LayoutStep(
+            "split_capacity_commitment", (base + "2",), ("$1", "$2"), slot_count=200
+        ),
+    )
+
+    # Pieces that add up to a target are merged in one call.
+    plan = commitment_layout.plan_layout(
+        _layout_commitments(100, 100, 100), {flex: [300]}
+    )
+    assert [step.method for step in plan.steps] == ["merge_capacity_commitments"]
+    assert len(plan.steps[0].sources) == 3
+
+    # Otherwise everything is merged and split again, halving in parallel.
+    plan = commitment_layout.plan_layout(
+        _layout_commitments(300, 700), {flex: [250, 250, 250, 250]}
+    )
+    assert [len(wave) for wave in plan.waves()] == [1, 1, 2]
+    assert [step.method for step in plan.waves()[0]] == ["merge_capacity_commitments"]
+
+    # Commitments of other plans and inactive ones are left alone.
+    pending = _layout_commitments(100)[0]
+    pending.state = reservation.CapacityCommitment.State.PENDING
+    annual = _layout_commitments(
+        100, plan=reservation.CapacityCommitment.CommitmentPlan.ANNUAL
+    )
+    assert not commitment_layout.plan_layout([pending] + annual, {flex: []}).steps
+
+
+def test_plan_layout_invalid_target():
+    flex = reservation.CapacityCommitment.CommitmentPlan.FLEX
+    with pytest.raises(ValueError):
+        commitment_layout.plan_layout(_layout_commitments(100), {flex: [50]})
+    with pytest.raises(ValueError):
+        commitment_layout.plan_layout(_layout_commitments(100), {flex: [100, 0]})
+
+    other = _layout_commitments(100)[0]
+    other.name = "projects/q/locations/US/capacityCommitments/9"
+    with pytest.raises(ValueError):
+        commitment_layout.plan_layout(
+            _layout_commitments(100) + [other], {flex: [100, 100]}
+        )
+
+
+def test_apply_layout():
+    client = ReservationServiceClient(credentials=credentials.AnonymousCredentials,)
+    flex = reservation.CapacityCommitment.CommitmentPlan.FLEX
+    base = "projects/p/locations/US/capacityCommitments/"
+    plan = commitment_layout.plan_layout(
+        _layout_commitments(300, 700), {flex: [250, 250, 250, 250]}
+    )
+    created = itertools.count(10)
+
+    def respond(request, **kwargs):
+        if isinstance(request, reservation.MergeCapacityCommitmentsRequest):
+            assert request.parent == "projects/p/locations/US"
+            return reservation.CapacityCommitment(name=base + "merged")
+        return reservation.SplitCapacityCommitmentResponse(
+            first=reservation.CapacityCommitment(name=request.name),
+            second=reservation.CapacityCommitment(name=base + str(next(created))),
+        )
+
+    # Mock the actual call within the gRPC stub, and fake the request.
+    with mock.patch.object(
+        type(client.transport.split_capacity_commitment), "__call__"
+    ) as call:
+        call.side_effect = respond
+        result = commitment_layout.apply_layout(client, plan)
+
+    assert result.ok
+    assert call.call_count == 4
+    _, args, _ = call.mock_calls[0]
+    assert list(args[0].capacity_commitment_ids) == ["0", "1"]
+    _, args, _ = call.mock_calls[1]
+    assert args[0].name == base + "merged"
+    assert args[0].slot_count == 500
+    assert result.names["$1"] == base + "merged"
+
+
+def test_token_bucket():
+    now = [0.0]
+    bucket = rate_limit.TokenBucket(rate=2.0, capacity=2, clock=lambda: now[0])
+
+    # A full bucket lets a burst through, then paces callers in order.
+    assert [bucket.reserve() for _ in range(4)] == [0.0, 0.0, 0.5, 1.0]
+    now[0] = 10.0
+    assert bucket.reserve() == 0.0
+
+    with pytest.raises(ValueError):
+        rate_limit.TokenBucket(rate=0)
+
+
+def test_rate_limiter_per_kind():
+    read = rate_limit.TokenBucket(rate=10)
+    write = rate_limit.TokenBucket(rate=1)
+    limiter = rate_limit.RateLimiter.per_kind(read=read, write=write)
+
+    assert limiter.bucket_for("list_reservations") is read
+    assert limiter.bucket_for("search_assignments") is read
+    assert limiter.bucket_for("update_reservation") is write
+    assert rate_limit.RateLimiter().bucket_for("get_reservation") is None
+
+
+def test_rate_limited_transport():
+    bucket = rate_limit.TokenBucket(rate=100)
+    transport = transports.ReservationServiceGrpcTransport(
+        credentials=credentials.AnonymousCredentials(),
+        rate_limiter=rate_limit.RateLimiter({"get_reservation": bucket}),
+    )
+    client = ReservationServiceClient(transport=transport)
+
+    # Mock the actual call within the gRPC stub, and fake the request.
+    with mock.patch.object(
+        type(client.transport.get_reservation), "__call__"
+    ) as call, mock.patch.object(bucket, "acquire") as acquire:
+        call.side_effect = [
+            exceptions.ServiceUnavailable("try again"),
+            reservation.Reservation(name="name_value"),
+        ]
+        client.get_reservation(
+            name="name_value", retry=retries.Retry(initial=0.01, maximum=0.01)
+        )
+        # Methods without a bucket are not paced.
+        call.side_effect = None
+        call.return_value = reservation.ListReservationsResponse()
+        client.list_reservations(parent="parent_value")
+
+    # Every attempt, including the retry, takes a token.
+    assert acquire.call_count == 2
+    assert call.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_transport_async():
+    bucket = rate_limit.TokenBucket(rate=100)
+    transport = transports.ReservationServiceGrpcAsyncIOTransport(
+        credentials=credentials.AnonymousCredentials(),
+        rate_limiter=rate_limit.RateLimiter(default=bucket),
+    )
+    client = ReservationServiceAsyncClient(transport=transport)
+
+    with mock.patch.object(
+        type(client.transport.get_bi_reservation), "__call__"
+    ) as call, mock.patch.object(
+        bucket, "acquire_async", new_callable=mock.AsyncMock
+    ) as acquire:
+        call.return_value = grpc_helpers_async.FakeUnaryUnaryCall(
+            reservation.BiReservation(name="name_value")
+        )
+        response = await client.get_bi_reservation(name="name_value")
+
+    assert response.name == "name_value"
+    acquire.assert_awaited_once()
+
+
+def test_retry_budget():
+    now = [0.0]
+    budget = retry_budget.RetryBudget(
+        ratio=0.5, min_per_second=0.1, window=10, clock=lambda: now[0]
+    )
+
+    assert budget.try_retry()
+    assert not budget.try_retry()
+    budget.record_success()
+    budget.record_success()
+    assert budget.available == 1
+    assert budget.try_retry()
+    assert not budget.try_retry()
+
+    # Retries and successes age out of the window.
+    now[0] = 10.5
+    assert budget.available == 1
+
+    with pytest.raises(ValueError):
+        retry_budget.RetryBudget(window=0)
+
+
+def test_budgeted_retry_refunds_retry_cut_by_deadline():
+    budget = retry_budget.RetryBudget(ratio=0, min_per_second=0.1, window=10)
+    retry = retry_budget.BudgetedRetry(
+        budget,
+        predicate=retries.if_exception_type(exceptions.ServiceUnavailable),
+        deadline=0,
+    )
+    func = mock.Mock(side_effect=exceptions.ServiceUnavailable("try again"))
+
+    # The deadline has passed after the first attempt, so no retry is made.
+    with pytest.raises(exceptions.RetryError):
+        retry(func)()
+
+    func.assert_called_once()
+    assert budget.available == 1
+
+
+@pytest.mark.asyncio
+async def test_async_budgeted_retry_refunds_only_withdrawn_retries():
+    budget = retry_budget.RetryBudget(ratio=0, min_per_second=0.1, window=10)
+    assert budget.try_retry()
+    retry = retry_budget.AsyncBudgetedRetry(
+        budget,
+        predicate=retries.if_exception_type(exceptions.ServiceUnavailable),
+        deadline=0.01,
+    )
+
+    async def func():
+        await asyncio.sleep(1)
+
+    # The attempt times out without a retry being withdrawn for it.
+    with pytest.raises(exceptions.RetryError):
+        await retry(func)()
+
+    assert budget.available == 0
+
+
+def test_full_jitter():
+    with mock.patch.object(random, "uniform", side_effect=lambda low, high: high):
+        delays = list(
+            itertools.islice(retry_budget.full_jitter(0.1, 0.5, multiplier=2), 5)
+        )
+
+    assert delays == [0.1, 0.2, 0.4, 0.5, 0.5]
+
+
+def test_retry_budget_transport():
+    budget = retry_budget.RetryBudget(ratio=0, min_per_second=0.1, window=10)
+    transport = transports.ReservationServiceGrpcTransport(
+        credentials=credentials.AnonymousCredentials(), retry_budget=budget,
+    )
+    client = ReservationServiceClient(transport=transport)
+
+    # Mock the actual call within the gRPC stub, and fake the request.
+    with mock.patch.object(
+        type(client.transport.get_reservation), "__call__"
+    ) as call, mock.patch.object(time, "sleep"):
+        call.side_effect = [
+            exceptions.ServiceUnavailable("try again"),
+            reservation.Reservation(name="name_value"),
+        ]
+        response = client.get_reservation(name="name_value")
+        assert response.name == "name_value"
+
+        # The budget is spent, so the default retry gives up at once.
+        call.side_effect = exceptions.ServiceUnavailable("try again")
+        with pytest.raises(exceptions.ServiceUnavailable):
+            client.get_reservation(name="name_value")
+
+    assert call.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_retry_budget_transport_async():
+    budget = retry_budget.RetryBudget(ratio=0, min_per_second=0.1, window=10)
+    transport = transports.ReservationServiceGrpcAsyncIOTransport(
+        credentials=credentials.AnonymousCredentials(), retry_budget=budget,
+    )
+    client = ReservationServiceAsyncClient(transport=transport)
+
+    with mock.patch.object(
+        type(client.transport.list_assignments), "__call__"
+    ) as call, mock.patch.object(asyncio, "sleep", new_callable=mock.AsyncMock):
+        call.side_effect = [
+            exceptions.ServiceUnavailable("try again"),
+            grpc_helpers_async.FakeUnaryUnaryCall(
+                reservation.ListAssignmentsResponse()
+            ),
+            exceptions.ServiceUnavailable("try again"),
+        ]
+        await client.list_assignments(parent="parent_value")
+        with pytest.raises(exceptions.ServiceUnavailable):
+            await client.list_assignments(parent="parent_value")
+
+    assert call.call_count == 3
+    assert budget.available == 0
+
+
+def test_hedging_policy():
+    policy = hedging.HedgingPolicy(
+        90, initial_delay=0.5, min_delay=0.05, max_ratio=0.5, burst=1, min_samples=10
+    )
+
+    assert policy.hedges("get_reservation")
+    assert not policy.hedges("list_reservations")
+    assert policy.delay("get_reservation") == 0.5
+    for latency in range(1, 11):
+        policy.record("get_reservation", latency / 100)
+    assert policy.delay("get_reservation") == pytest.approx(0.09)
+    assert policy.delay("get_bi_reservation") == 0.5
+
+    # Each call earns half a hedge, up to one.
+    assert policy.try_hedge()
+    assert not policy.try_hedge()
+    policy.record("get_reservation", 0.01)
+    assert not policy.try_hedge()
+    policy.record("get_reservation", 0.01)
+    assert policy.try_hedge()
+
+    with pytest.raises(ValueError):
+        hedging.HedgingPolicy(methods=["update_reservation"])
+
+
+class _FakeRpcFuture(futures.Future):
+    def result(self, timeout=None):
+        try:
+            return super().result(timeout)
+        except futures.TimeoutError:
+            raise grpc.FutureTimeoutError()
+
+
+def _rpc_future(response=None):
+    future = _FakeRpcFuture()
+    if response is not None:
+        future.set_result(response)
+    return future
+
+
+def test_hedged_transport():
+    policy = hedging.HedgingPolicy(initial_delay=0.01, burst=1, max_ratio=0)
+    transport = transports.ReservationServiceGrpcTransport(
+        credentials=credentials.AnonymousCredentials(), hedging_policy=policy,
+    )
+    client = ReservationServiceClient(transport=transport)
+    slow = _rpc_future()
+
+    # Mock the actual call within the gRPC stub, and fake the request.
+    with mock.patch.object(type(client.transport.get_reservation), "future") as call:
+        call.side_effect = [
+            slow,
+            _rpc_future(reservation.Reservation(name="hedged")),
+        ]
+        response = client.get_reservation(name="name_value")
+
+    assert response.name == "hedged"
+    assert call.call_count == 2
+    assert slow.cancelled()
+
+    # The hedge rate is capped, so a second slow call is not hedged.
+    with mock.patch.object(type(client.transport.get_reservation), "future") as call:
+        slow = _rpc_future()
+        call.return_value = slow
+        threading.Timer(
+            0.05, slow.set_result, (reservation.Reservation(name="slow"),)
+        ).start()
+        response = client.get_reservation(name="name_value")
+
+    assert response.name == "slow"
+    call.assert_called_once()
+
+
+def test_hedged_transport_fast_call():
+    policy = hedging.HedgingPolicy(initial_delay=1.0)
+    transport = transports.ReservationServiceGrpcTransport(
+        credentials=credentials.AnonymousCredentials(), hedging_policy=policy,
+    )
+    client = ReservationServiceClient(transport=transport)
+
+    # Mock the actual call within the gRPC stub, and fake the request.
+    with mock.patch.object(type(client.transport.get_reservation), "future") as call:
+        call.return_value = _rpc_future(reservation.Reservation(name="name_value"))
+        response = client.get_reservation(name="name_value")
+
+    assert response.name == "name_value"
+    call.assert_called_once()
+    _, args, kwargs = call.mock_calls[0]
+    assert args[0].name == "name_value"
+    assert ("x-goog-request-params", "name=name_value",) in kwargs["metadata"]
+
+
+class _FakeAioCall:
+    def __init__(self, response=None):
+        self._future = asyncio.get_event_loop().create_future()
+        if response is not None:
+            self._future.set_result(response)
+
+    def cancel(self):
+        return self._future.cancel()
+
+    def add_done_callback(self, callback):
+        self._future.add_done_callback(lambda _: callback(self))
+
+    def __await__(self):
+        return self._future.__await__()
+
+
+@pytest.mark.asyncio
+async def test_hedged_transport_async():
+    policy = hedging.HedgingPolicy(initial_delay=0.01)
+    transport = transports.ReservationServiceGrpcAsyncIOTransport(
+        credentials=credentials.AnonymousCredentials(), hedging_policy=policy,
+    )
+    client = ReservationServiceAsyncClient(transport=transport)
+    slow = _FakeAioCall()
+
+    with mock.patch.object(
+        type(client.transport.get_capacity_commitment), "__call__"
+    ) as call:
+        call.side_effect = [
+            slow,
+            _FakeAioCall(reservation.CapacityCommitment(name="hedged")),
+        ]
+        response = await client.get_capacity_commitment(name="name_value")
+
+    assert response.name == "hedged"
+    assert call.call_count == 2
+    assert slow._future.cancelled()
+
+
+def test_hedged_transport_uses_first_success():
+    policy = hedging.HedgingPolicy(initial_delay=0.01)
+    transport = transports.ReservationServiceGrpcTransport(
+        credentials=credentials.AnonymousCredentials(), hedging_policy=policy,
+    )
+    client = ReservationServiceClient(transport=transport)
+
+    def calls(backup_error=None):
+        primary = _rpc_future()
+        backup = _rpc_future()
+
+        def start_backup():
+            # The primary fails once the backup is on its way.
+            primary.set_exception(exceptions.NotFound("primary"))
+            if backup_error is None:
+                result = reservation.Reservation(name="hedged")
+                threading.Timer(0.05, backup.set_result, (result,)).start()
+            else:
+                threading.Timer(0.05, backup.set_exception, (backup_error,)).start()
+            return backup
+
+        starts = iter([lambda: primary, start_backup])
+        return lambda *args, **kwargs: next(starts)()
+
+    with mock.patch.object(type(client.transport.get_reservation), "future") as call:
+        call.side_effect = calls()
+        response = client.get_reservation(name="name_value")
+
+    assert response.name == "hedged"
+    assert call.call_count == 2
+
+    # The call only fails once both calls have.
+    with mock.patch.object(type(client.transport.get_reservation), "future") as call:
+        call.side_effect = calls(exceptions.NotFound("backup"))
+        with pytest.raises(exceptions.NotFound, match="backup"):
+            client.get_reservation(name="name_value")
+
+    assert call.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_hedged_transport_async_uses_first_success():
+    policy = hedging.HedgingPolicy(initial_delay=0.01)
+    transport = transports.ReservationServiceGrpcAsyncIOTransport(
+        credentials=credentials.AnonymousCredentials(), hedging_policy=policy,
+    )
+    client = ReservationServiceAsyncClient(transport=transport)
+    primary = _FakeAioCall()
+    backup = _FakeAioCall()
+
+    def start_backup():
+        # The primary fails once the backup is on its way.
+        primary._future.set_exception(exceptions.NotFound("primary"))
+        asyncio.get_event_loop().call_later(
+            0.05,
+            backup._future.set_result,
+            reservation.CapacityCommitment(name="hedged"),
+        )
+        return backup
+
+    with mock.patch.object(
+        type(client.transport.get_capacity_commitment), "__call__"
+    ) as call:
+        starts = iter([lambda: primary, start_backup])
+        call.side_effect = lambda *args, **kwargs: next(starts)()
+        response = await client.get_capacity_commitment(name="name_value")
+
+    assert response.name == "hedged"
+    assert call.call_count == 2
+
+
+def test_channel_pool_round_robin():
+    channels = [mock.Mock() for _ in range(3)]
+    channel_pool = pool.ChannelPool(channels)
+
+    stub = channel_pool.unary_unary("/Service/Method", request_serializer=str)
+    channel_pool.unary_unary("/Service/Method", request_serializer=str)
+    for _ in range(4):
+        stub("request")
+
+    # Each channel keeps its own stub, and calls take turns.
+    for channel in channels:
+        channel.unary_unary.assert_called_once_with(
+            "/Service/Method", request_serializer=str
+        )
+    assert [c.unary_unary.return_value.call_count for c in channels] == [2, 1, 1]
+    assert channel_pool.outstanding == (0, 0, 0)
+
+    with pytest.raises(ValueError):
+        pool.ChannelPool(channels, dispatch="random")
+
+
+def test_channel_pool_least_outstanding():
+    channels = [mock.Mock(), mock.Mock()]
+    for channel in channels:
+        channel.unary_unary.return_value.future.side_effect = (
+            lambda *args, **kwargs: _rpc_future()
+        )
+    channel_pool = pool.ChannelPool(channels, dispatch=pool.LEAST_OUTSTANDING)
+    stub = channel_pool.unary_unary("/Service/Method")
+
+    first = stub.future("request")
+    second = stub.future("request")
+    assert channel_pool.outstanding == (1, 1)
+    second.set_result("response")
+    assert channel_pool.outstanding == (1, 0)
+
+    # The channel with fewer calls in flight is picked, out of turn.
+    stub.future("request")
+    assert channel_pool.outstanding == (1, 1)
+    assert channels[1].unary_unary.return_value.future.call_count == 2
+    first.set_result("response")
+    assert channel_pool.outstanding == (0, 1)
+
+
+def test_pooled_transport():
+    channels = [mock.Mock() for _ in range(3)]
+    for channel in channels:
+        channel.unary_unary.return_value.return_value = reservation.Reservation(
+            name="name_value"
+        )
+
+    with mock.patch.object(
+        transports.ReservationServicePooledGrpcTransport, "create_channel"
+    ) as create_channel:
+        create_channel.side_effect = channels
+        transport = transports.ReservationServicePooledGrpcTransport(
+            credentials=credentials.AnonymousCredentials(), pool_size=3,
+        )
+
+    assert create_channel.call_count == 3
+    _, _, kwargs = create_channel.mock_calls[0]
+    assert ("grpc.use_local_subchannel_pool", 1) in kwargs["options"]
+    assert transport.channel_pool.channels == tuple(channels)
+
+    client = ReservationServiceClient(transport=transport)
+    for _ in range(3):
+        response = client.get_reservation(name="name_value")
+        assert response.name == "name_value"
+
+    for channel in channels:
+        channel.unary_unary.return_value.assert_called_once()
+
+    with pytest.raises(ValueError):
+        transports.ReservationServicePooledGrpcTransport(
+            credentials=credentials.AnonymousCredentials(), pool_size=0,
+        )
+
+
+@pytest.mark.parametrize(
+    "client_class,transport_name,transport_class",
+    [
+        (
+            ReservationServiceClient,
+            "grpc_pool",
+            transports.ReservationServicePooledGrpcTransport,
+        ),
+        (
+            ReservationServiceAsyncClient,
+            "grpc_asyncio_pool",
+            transports.ReservationServicePooledGrpcAsyncIOTransport,
+        ),
+    ],
+)
+def test_pooled_transport_by_name(client_class, transport_name, transport_class):
+    assert ReservationServiceClient.get_transport_class(transport_name) is (
+        transport_class
+    )
+
+    with mock.patch.object(transport_class, "create_channel") as create_channel:
+        client = client_class(
+            credentials=credentials.AnonymousCredentials(), transport=transport_name,
+        )
+
+    assert isinstance(client.transport, transport_class)
+    assert create_channel.call_count == 4
+
+
+@pytest.mark.parametrize(
+    "transport_class",
+    [
+        transports.ReservationServicePooledGrpcTransport,
+        transports.ReservationServicePooledGrpcAsyncIOTransport,
+    ],
+)
+def test_pooled_transport_channel_args(transport_class):
+    with mock.patch.object(transport_class, "create_channel", autospec=True):
+        transport = transport_class(
+            credentials=credentials.AnonymousCredentials(), pool_size=2,
+        )
+
+    # The arguments are recorded without the pool's own options.
+    host, kwargs = transport._channel_args
+    assert host == "bigqueryreservation.googleapis.com:443"
+    assert "options" not in kwargs
+
+
+@pytest.mark.asyncio
+async def test_pooled_transport_async():
+    def call(*args, **kwargs):
+        return _FakeAioCall(reservation.BiReservation(name="name_value"))
+
+    channels = [mock.Mock(), mock.Mock()]
+    for channel in channels:
+        channel.unary_unary.return_value.side_effect = call
+    channel_pool = pool.AsyncChannelPool(channels)
+    transport = transports.ReservationServicePooledGrpcAsyncIOTransport(
+        channel=channel_pool,
+    )
+    client = ReservationServiceAsyncClient(transport=transport)
+
+    responses = await asyncio.gather(
+        *(client.get_bi_reservation(name="name_value") for _ in range(4))
+    )
+    await asyncio.sleep(0)
+
+    assert [r.name for r in responses] == ["name_value"] * 4
+    assert [c.unary_unary.return_value.call_count for c in channels] == [2, 2]
+    assert channel_pool.outstanding == (0, 0)
+
+
+def test_channel_registry():
+    registry = channel_registry.ChannelRegistry()
+    channel = mock.Mock()
+    factory = mock.Mock(return_value=channel)
+
+    assert registry.acquire("key", factory) is channel
+    assert registry.acquire("key", factory) is channel
+    factory.assert_called_once()
+    assert len(registry) == 1
+
+    registry.release("key")
+    channel.close.assert_not_called()
+    registry.release("key")
+    channel.close.assert_called_once()
+    assert len(registry) == 0
+
+
+@pytest.mark.parametrize("get_running_loop", [True, False])
+def test_channel_registry_close_async_channel(get_running_loop):
+    registry = channel_registry.ChannelRegistry()
+    channel = mock.Mock()
+    closed = []
+
+    async def close():
+        closed.append(channel)
+
+    channel.close.side_effect = close
+    loop = asyncio.new_event_loop()
+    try:
+        with mock.patch.object(
+            channel_registry, "asyncio", wraps=asyncio
+        ) as patched_asyncio:
+            patched_asyncio.iscoroutine = asyncio.iscoroutine
+            patched_asyncio.get_event_loop.return_value = loop
+            if not get_running_loop:
+                # Python 3.6 has no asyncio.get_running_loop.
+                del patched_asyncio.get_running_loop
+
+            # Without a running loop, the channel is left to its finalizer.
+            registry.acquire("key", lambda: channel)
+            registry.release("key")
+            assert closed == []
+
+            async def release():
+                registry.acquire("key", lambda: channel)
+                registry.release("key")
+                await asyncio.sleep(0)
+
+            # With one, its close() is awaited there.
+            loop.run_until_complete(release())
+            assert closed == [channel]
+    finally:
+        loop.close()
+
+
+def test_channel_registry_key():
+    creds = credentials.AnonymousCredentials()
+    key, pinned = channel_registry.ChannelRegistry.key(
+        transports.ReservationServiceGrpcTransport,
+        "squid.clam.whelk:443",
+        credentials=creds,
+        scopes=["scope"],
+    )
+    same, _ = channel_registry.ChannelRegistry.key(
+        transports.ReservationServiceGrpcTransport,
+        "squid.clam.whelk:443",
+        credentials=creds,
+        scopes=("scope",),
+    )
+    other, _ = channel_registry.ChannelRegistry.key(
+        transports.ReservationServiceGrpcTransport,
+        "squid.clam.whelk:443",
+        credentials=credentials.AnonymousCredentials(),
+        scopes=["scope"],
+    )
+
+    assert key == same
+    assert key != other
+    assert pinned == (creds, None)
+
+
+def test_shared_channel_transport():
+    registry = channel_registry.ChannelRegistry()
+    channel = mock.Mock()
+
+    with mock.patch.object(
+        transports.ReservationServiceGrpcTransport, "create_channel"
+    ) as create_channel, mock.patch.object(auth, "default") as adc:
+        create_channel.return_value = channel
+        adc.return_value = (credentials.AnonymousCredentials(), None)
+        first = transports.ReservationServiceGrpcTransport(channel_registry=registry)
+        second = transports.ReservationServiceGrpcTransport(channel_registry=registry)
+
+    # Default credentials are looked up once, and the channel is shared.
+    adc.assert_called_once()
+    create_channel.assert_called_once()
+    assert first.grpc_channel is second.grpc_channel is channel
+
+    del first
+    gc.collect()
+    channel.close.assert_not_called()
+    del second
+    gc.collect()
+    channel.close.assert_called_once()
+    assert len(registry) == 0
+
+
+@pytest.mark.asyncio
+async def test_shared_channel_transport_async():
+    registry = channel_registry.ChannelRegistry()
+    channel = mock.Mock()
+    channel.close = mock.AsyncMock()
+    creds = credentials.AnonymousCredentials()
+
+    with mock.patch.object(
+        transports.ReservationServiceGrpcAsyncIOTransport, "create_channel"
+    ) as create_channel:
+        create_channel.return_value = channel
+        transport = transports.ReservationServiceGrpcAsyncIOTransport(
+            credentials=creds, channel_registry=registry,
+        )
+        other = transports.ReservationServiceGrpcAsyncIOTransport(
+            credentials=credentials.AnonymousCredentials(), channel_registry=registry,
+        )
+
+    # Transports with other credentials get a channel of their own.
+    assert create_channel.call_count == 2
+    assert len(registry) == 2
+
+    del transport, other
+    gc.collect()
+    await asyncio.sleep(0)
+    assert channel.close.await_count == 2
+    assert len(registry) == 0
+
+
+def _named_channels(count):
+    channels = [mock.Mock() for _ in range(count)]
+    for index, channel in enumerate(channels):
+        channel.unary_unary.return_value.return_value = reservation.Reservation(
+            name="channel{}".format(index)
+        )
+    return channels
+
+
+def test_transport_reopens_channel_after_fork():
+    channels = _named_channels(2)
+
+    with mock.patch.object(
+        transports.ReservationServiceGrpcTransport, "create_channel"
+    ) as create_channel:
+        create_channel.side_effect = channels
+        client = ReservationServiceClient(
+            transport=transports.ReservationServiceGrpcTransport(
+                credentials=credentials.AnonymousCredentials(),
+            )
+        )
+        assert client.get_reservation(name="name_value").name == "channel0"
+
+        # Simulate running in a child process.
+        lock = client.transport._fork_lock
+        transports.base._after_fork_in_child()
+        assert client.transport._fork_lock is not lock
+        with mock.patch.object(os, "getpid", return_value=os.getpid() + 1):
+            assert client.get_reservation(name="name_value").name == "channel1"
+            assert client.get_reservation(name="name_value").name == "channel1"
+
+    assert create_channel.call_count == 2
+    _, args, kwargs = create_channel.mock_calls[1]
+    assert args == ("bigqueryreservation.googleapis.com:443",)
+    assert kwargs["credentials"] is client.transport._credentials
+    assert client.transport.grpc_channel is channels[1]
+    channels[0].close.assert_not_called()
+
+
+def test_transport_keeps_explicit_channel_after_fork():
+    (channel,) = _named_channels(1)
+    client = ReservationServiceClient(
+        transport=transports.ReservationServiceGrpcTransport(channel=channel)
+    )
+
+    with mock.patch.object(os, "getpid", return_value=os.getpid() + 1):
+        assert client.get_reservation(name="name_value").name == "channel0"
+
+    assert client.transport.grpc_channel is channel
+
+
+def test_shared_channel_transport_after_fork():
+    registry = channel_registry.ChannelRegistry()
+    channels = _named_channels(2)
+
+    with mock.patch.object(
+        transports.ReservationServiceGrpcTransport, "create_channel"
+    ) as create_channel:
+        create_channel.side_effect = channels
+        client = ReservationServiceClient(
+            transport=transports.ReservationServiceGrpcTransport(
+                credentials=credentials.AnonymousCredentials(),
+                channel_registry=registry,
+            )
+        )
+
+        # Simulate running in a child process.
+        channel_registry._after_fork_in_child()
+        assert len(registry) == 0
+        with mock.patch.object(os, "getpid", return_value=os.getpid() + 1):
+            assert client.get_reservation(name="name_value").name == "channel1"
+            assert len(registry) == 1
+            del client
+            gc.collect()
+
+    assert len(registry) == 0
+    channels[0].close.assert_not_called()
+    channels[1].close.assert_called_once()
+
+
+def test_warm_up():
+    channel = mock.Mock()
+    creds = mock.Mock(spec=credentials.Credentials, valid=False)
+    client = ReservationServiceClient(
+        transport=transports.ReservationServiceGrpcTransport(channel=channel)
+    )
+    client.transport._credentials = creds
+
+    with mock.patch.object(grpc, "channel_ready_future") as ready:
+        client.warm_up(timeout=5.0)
+        creds.refresh.assert_not_called()
+        client.warm_up(fetch_token=True)
+
+    assert len(client.transport._stubs) == 19
+    ready.assert_called_with(channel)
+    ready.return_value.result.assert_has_calls(
+        [mock.call(timeout=5.0), mock.call(timeout=None)]
+    )
+    creds.refresh.assert_called_once()
+
+
+def test_warm_up_timeout():
+    client = ReservationServiceClient(
+        transport=transports.ReservationServiceGrpcTransport(channel=mock.Mock())
+    )
+
+    with mock.patch.object(grpc, "channel_ready_future") as ready:
+        ready.return_value.result.side_effect = grpc.FutureTimeoutError()
+        with pytest.raises(exceptions.DeadlineExceeded):
+            client.warm_up(timeout=0.01)
+
+    ready.return_value.cancel.assert_called_once()
+
+
+def test_warm_up_pooled_transport():
+    channels = [mock.Mock(), mock.Mock()]
+    transport = transports.ReservationServicePooledGrpcTransport(
+        channel=pool.ChannelPool(channels)
+    )
+
+    with mock.patch.object(grpc, "channel_ready_future") as ready:
+        transport.warm_up()
+
+    assert ready.call_args_list == [mock.call(channels[0]), mock.call(channels[1])]
+
+
+@pytest.mark.asyncio
+async def test_warm_up_async():
+    channel = mock.Mock()
+    channel.channel_ready = mock.AsyncMock()
+    creds = mock.Mock(spec=credentials.Credentials, valid=False)
+    client = ReservationServiceAsyncClient(
+        transport=transports.ReservationServiceGrpcAsyncIOTransport(channel=channel)
+    )
+    client.transport._credentials = creds
+
+    await client.warm_up(timeout=5.0, fetch_token=True)
+
+    assert len(client.transport._stubs) == 19
+    channel.channel_ready.assert_awaited_once()
+    creds.refresh.assert_called_once()
+
+    async def never_ready():
+        await asyncio.sleep(60)
+
+    channel.channel_ready = never_ready
+    with pytest.raises(exceptions.DeadlineExceeded):
+        await client.warm_up(timeout=0.01)
+
+
+def test_lazy_client():
+    def slow_init(self, **kwargs):
+        time.sleep(0.05)
+
+    with mock.patch.object(
+        transports.ReservationServiceGrpcTransport, "__init__", autospec=True
+    ) as init:
+        init.side_effect = slow_init
+        client = ReservationServiceClient(
+            credentials=credentials.AnonymousCredentials(), lazy=True
+        )
+        init.assert_not_called()
+
+        # Concurrent first uses create the transport once.
+        seen = []
+        threads = [
+            threading.Thread(target=lambda: seen.append(client.transport))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    init.assert_called_once()
+    _, kwargs = init.call_args
+    assert kwargs["host"] == client.DEFAULT_ENDPOINT
+    assert len(set(map(id, seen))) == 1
+    assert isinstance(seen[0], transports.ReservationServiceGrpcTransport)
+
+
+def test_lazy_client_defers_errors():
+    with mock.patch.dict(os.environ, {"GOOGLE_API_USE_MTLS_ENDPOINT": "Unsupported"}):
+        client = ReservationServiceClient(
+            credentials=credentials.AnonymousCredentials(), lazy=True
+        )
+        with pytest.raises(MutualTLSChannelError):
+            client.get_reservation(name="name_value")
+
+    # Creation is retried on the next use.
+    with mock.patch.object(type(client.transport.get_reservation), "__call__") as call:
+        call.return_value = reservation.Reservation(name="name_value")
+        assert client.get_reservation(name="name_value").name == "name_value"
+
+
+@pytest.mark.asyncio
+async def test_lazy_async_client():
+    client = ReservationServiceAsyncClient(
+        credentials=credentials.AnonymousCredentials(), lazy=True
+    )
+    assert client._client._transport_factory is not None
+
+    with mock.patch.object(
+        type(client.transport.get_bi_reservation), "__call__"
+    ) as call:
+        call.return_value = grpc_helpers_async.FakeUnaryUnaryCall(
+            reservation.BiReservation(name="name_value")
+        )
+        response = await client.get_bi_reservation(name="name_value")
+
+    assert response.name == "name_value"
+    assert isinstance(
+        client.transport, transports.ReservationServiceGrpcAsyncIOTransport
+    )
+
+
+def test_channel_options():
+    options = channel_options.ChannelOptions(
+        keepalive_time=30,
+        keepalive_timeout=2.5,
+        keepalive_permit_without_calls=True,
+        max_pings_without_data=0,
+        max_receive_message_length=-1,
+        compression=grpc.Compression.Gzip,
+        options=[("grpc.keepalive_time_ms", 60000), ("grpc.primary_user_agent", "a")],
+    )
+
+    assert options.channel_kwargs() == {
+        "options": [
+            ("grpc.keepalive_timeout_ms", 2500),
+            ("grpc.keepalive_permit_without_calls", 1),
+            ("grpc.http2.max_pings_without_data", 0),
+            ("grpc.max_receive_message_length", -1),
+            ("grpc.keepalive_time_ms", 60000),
+            ("grpc.primary_user_agent", "a"),
+        ],
+        "compression": grpc.Compression.Gzip,
+    }
+    assert channel_options.ChannelOptions().channel_kwargs() == {}
+
+    with pytest.raises(ValueError):
+        channel_options.ChannelOptions(keepalive_time=0)
+
+
+@pytest.mark.parametrize(
+    "transport_class",
+    [
+        transports.ReservationServiceGrpcTransport,
+        transports.ReservationServiceGrpcAsyncIOTransport,
+    ],
+)
+def test_transport_channel_options(transport_class):
+    options = channel_options.ChannelOptions(
+        keepalive_time=30, compression=grpc.Compression.Deflate
+    )
+    with mock.patch.object(
+        transport_class, "create_channel", autospec=True
+    ) as create_channel:
+        transport_class(
+            credentials=credentials.AnonymousCredentials(), channel_options=options
+        )
+
+    _, kwargs = create_channel.call_args
+    assert kwargs["options"] == [("grpc.keepalive_time_ms", 30000)]
+    assert kwargs["compression"] == grpc.Compression.Deflate
+
+
+def test_pooled_transport_channel_options():
+    options = channel_options.ChannelOptions(max_send_message_length=1 << 20)
+    with mock.patch.object(
+        transports.ReservationServicePooledGrpcTransport,
+        "create_channel",
+        autospec=True,
+    ) as create_channel:
+        transports.ReservationServicePooledGrpcTransport(
+            credentials=credentials.AnonymousCredentials(),
+            channel_options=options,
+            pool_size=2,
+        )
+
+    assert create_channel.call_count == 2
+    for _, kwargs in create_channel.call_args_list:
+        assert kwargs["options"] == [
+            ("grpc.max_send_message_length", 1 << 20),
+            pool._LOCAL_SUBCHANNEL_POOL,
+        ]
+
+
+def test_client_channel_options():
+    options = channel_options.ChannelOptions(keepalive_time=30)
+    with mock.patch.object(
+        transports.ReservationServiceGrpcTransport, "__init__"
+    ) as init:
+        init.return_value = None
+        ReservationServiceClient(channel_options=options)
+
+    _, kwargs = init.call_args
+    assert kwargs["channel_options"] is options
+
+    transport = transports.ReservationServiceGrpcTransport(
+        credentials=credentials.AnonymousCredentials(),
+    )
+    with pytest.raises(ValueError):
+        ReservationServiceClient(transport=transport, channel_options=options)
+
+
+@pytest.mark.parametrize("method", ["list_assignments", "search_assignments"])
+def test_assignments_compression(method):
+    client = ReservationServiceClient(credentials=credentials.AnonymousCredentials())
+    response_type = {
+        "list_assignments": reservation.ListAssignmentsResponse,
+        "search_assignments": reservation.SearchAssignmentsResponse,
+    }[method]
+
+    with mock.patch.object(type(getattr(client.transport, method)), "__call__") as call:
+        call.side_effect = (
+            response_type(assignments=[reservation.Assignment()], next_page_token="a"),
+            response_type(assignments=[reservation.Assignment()]),
+        )
+        pager = getattr(client, method)(request={}, compression=grpc.Compression.Gzip)
+        assert len(list(pager)) == 2
+
+    assert call.call_count == 2
+    for _, kwargs in call.call_args_list:
+        assert kwargs["compression"] == grpc.Compression.Gzip
+
+
+@pytest.mark.asyncio
+async def test_list_assignments_compression_async():
+    client = ReservationServiceAsyncClient(
+        credentials=credentials.AnonymousCredentials(),
+    )
+
+    with mock.patch.object(
+        type(client.transport.list_assignments), "__call__", new_callable=mock.Mock
+    ) as call:
+        call.side_effect = (
+            grpc_helpers_async.FakeUnaryUnaryCall(
+                reservation.ListAssignmentsResponse(
+                    assignments=[reservation.Assignment()], next_page_token="a"
+                )
+            ),
+            grpc_helpers_async.FakeUnaryUnaryCall(
+                reservation.ListAssignmentsResponse(
+                    assignments=[reservation.Assignment()]
+                )
+            ),
+        )
+        pager = await client.list_assignments(
+            request={}, compression=grpc.Compression.Gzip
+        )
+        assert len([item async for item in pager]) == 2
+
+    assert call.call_count == 2
+    for _, kwargs in call.call_args_list:
+        assert kwargs["compression"] == grpc.Compression.Gzip